@@ -0,0 +1,6 @@
+"""
+Benchmarks für den WSB Stock Analyzer.
+Die Skripte erzeugen synthetische Daten (benchmarks.corpus) und werden als Modul gestartet, z.B.:
+    python -m benchmarks.bench_suite --scale small
+    python -m benchmarks.bench_session_loading
+"""
@@ -0,0 +1,60 @@
+"""
+Benchmark: Laden und Parsen vieler Session-Ergebnisse.
+Erzeugt einen synthetischen Ergebnisbaum (Standard: 10.000 Sessions) in einem
+temporären Verzeichnis und vergleicht serielles, Thread- und Prozess-paralleles
+Laden, jeweils mit json und (falls installiert) orjson.
+
+    python -m benchmarks.bench_session_loading --sessions 10000
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+import session_loader
+from data_analyzer import WSBDataAnalyzer
+from benchmarks.corpus import generate_tree
+
+def run(storage, keys, executor, use_orjson):
+    """Lädt alle Sessions und baut den kombinierten DataFrame. Gibt die Laufzeiten zurück."""
+    orjson_module = session_loader.orjson
+    if not use_orjson:
+        session_loader.orjson = None
+    try:
+        started = time.perf_counter()
+        results = session_loader.load_sessions(keys, storage, executor=executor)
+        loaded = time.perf_counter()
+        frame = WSBDataAnalyzer._build_combined_frame(list(results.values()))
+        built = time.perf_counter()
+    finally:
+        session_loader.orjson = orjson_module
+    return {'load_s': round(loaded - started, 3), 'build_s': round(built - loaded, 3), 'rows': len(frame)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=10000)
+    parser.add_argument('--symbols', type=int, default=150, help="Symbole je Session")
+    parser.add_argument('--encoding', default='gzip', choices=['none', 'gzip', 'zstd'])
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='wsb_bench_')
+    try:
+        started = time.perf_counter()
+        storage, keys = generate_tree(root, args.sessions, args.symbols, encoding=args.encoding)
+        print(f"{len(keys)} Sessions erzeugt in {time.perf_counter() - started:.1f}s ({root})")
+
+        decoders = [False, True] if session_loader.orjson is not None else [False]
+        for executor in ('serial', 'thread', 'process'):
+            if args.workers:
+                session_loader.LOADER_CONFIG['max_workers'] = args.workers
+            for use_orjson in decoders:
+                timings = run(storage, keys, executor, use_orjson)
+                decoder = 'orjson' if use_orjson else 'json'
+                print(f"{executor:8s} {decoder:7s} laden {timings['load_s']:7.3f}s  "
+                      f"DataFrame {timings['build_s']:6.3f}s  ({timings['rows']} Zeilen)")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Benchmark-Suite über die zentralen Pfade von Crawler und Analyse.
+Alle Eingaben stammen aus dem seed-basierten synthetischen Korpus (benchmarks.corpus);
+die Ergebnisse werden als JSON geschrieben, um Regressionen zwischen Releases zu
+erkennen. Mit --baseline werden die Laufzeiten mit einer früheren Ergebnisdatei verglichen.
+
+    python -m benchmarks.bench_suite --scale small
+    python -m benchmarks.bench_suite --scale medium --baseline benchmarks/results/bench_v1.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+import matplotlib
+import numpy as np
+import pandas as pd
+from config import CRAWLER_CONFIG
+from storage import LocalStorageBackend, MemoryStorageBackend, get_storage_backend, set_storage_backend
+from reddit_crawler import WSBStockCrawler
+from data_analyzer import WSBDataAnalyzer
+from plot_rendering import get_plot_worker, render_spec
+from benchmarks.corpus import SyntheticCorpus, ReplayReddit, generate_tree
+
+SCALES = {
+    'small': {'texts': 20000, 'posts': 20, 'comments_per_post': 50, 'universe': 2000,
+              'days': 14, 'sessions_per_day': 6, 'symbols_per_session': 150},
+    'medium': {'texts': 200000, 'posts': 100, 'comments_per_post': 50, 'universe': 3000,
+               'days': 90, 'sessions_per_day': 6, 'symbols_per_session': 150},
+    'large': {'texts': 1000000, 'posts': 100, 'comments_per_post': 200, 'universe': 5000,
+              'days': 365, 'sessions_per_day': 24, 'symbols_per_session': 200}
+}
+
+# Ab dieser relativen Verlangsamung gegenüber der Baseline wird eine Regression gemeldet
+REGRESSION_THRESHOLD = 0.10
+
+def measure(fn, repeat=3, setup=None):
+    """
+    Führt fn repeat-mal aus und misst die Laufzeit. setup() wird vor jedem Lauf
+    außerhalb der Messung aufgerufen, sein Ergebnis wird an fn übergeben.
+
+    :return: (Messwerte, Rückgabewert des letzten Laufs)
+    """
+    timings = []
+    result = None
+    for _ in range(repeat):
+        state = setup() if setup else None
+        started = time.perf_counter()
+        result = fn(state)
+        timings.append(time.perf_counter() - started)
+    return {'median_s': round(statistics.median(timings), 6), 'min_s': round(min(timings), 6),
+            'runs': len(timings)}, result
+
+def _with_throughput(timing, items):
+    timing['items'] = items
+    timing['items_per_s'] = round(items / timing['median_s'], 1) if timing['median_s'] else None
+    return timing
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def bench_extract(crawler, corpus, params, repeat):
+    texts = corpus.texts(params['texts'])
+
+    def _run(_):
+        return sum(len(crawler.extract_symbols_from_text(text)) for text in texts)
+
+    timing, matched = measure(_run, repeat)
+    timing = _with_throughput(timing, len(texts))
+    timing['symbols_matched'] = matched
+    return timing
+
+def bench_crawl(crawler, corpus, params, repeat):
+    posts = corpus.posts(params['posts'], params['comments_per_post'])
+    texts = sum(1 + len(post.comments.list()) + bool(post.selftext) for post in posts)
+    limits = {key: CRAWLER_CONFIG[key] for key in ('post_limit', 'comment_limit')}
+    CRAWLER_CONFIG['post_limit'] = len(posts)
+    CRAWLER_CONFIG['comment_limit'] = max(len(post.comments.list()) for post in posts)
+    crawler.reddit = ReplayReddit(posts)
+    try:
+        timing, success = measure(lambda _: crawler.crawl_subreddit(), repeat)
+    finally:
+        CRAWLER_CONFIG.update(limits)
+    if not success:
+        raise RuntimeError("crawl_subreddit ist fehlgeschlagen")
+    timing = _with_throughput(timing, texts)
+    timing['unique_symbols'] = len(crawler.results)
+    return timing
+
+def bench_save(crawler, repeat):
+    timing, (json_key, _) = measure(lambda _: crawler.save_results(), repeat)
+    if json_key is None:
+        raise RuntimeError("save_results ist fehlgeschlagen")
+    return _with_throughput(timing, len(crawler.results))
+
+def bench_load(repeat):
+    def _run(_):
+        analyzer = WSBDataAnalyzer()
+        analyzer.load_all_results()
+        return analyzer
+
+    timing, analyzer = measure(_run, repeat)
+    return _with_throughput(timing, len(analyzer.all_results)), analyzer
+
+def bench_combine(analyzer, repeat):
+    timing, _ = measure(lambda _: analyzer.create_combined_dataframe(), repeat)
+    return _with_throughput(timing, len(analyzer.combined_df))
+
+def bench_visualizations(analyzer, repeat):
+    # Render-Prozesse vorab starten, damit deren Start nicht in die erste Messung fällt
+    get_plot_worker().render({'panels': []}, dpi=10)
+    storage = get_storage_backend()
+
+    def _cold_storage():
+        # Frisches Backend je Lauf: der Render-Cache ist leer
+        backend = MemoryStorageBackend()
+        set_storage_backend(backend)
+        return backend
+
+    try:
+        cold, _ = measure(lambda _: analyzer.create_visualizations(save_plots=False), repeat, setup=_cold_storage)
+        warm, _ = measure(lambda _: analyzer.create_visualizations(save_plots=False), repeat)
+    finally:
+        set_storage_backend(storage)
+    spec = analyzer.build_plot_spec()
+    full, _ = measure(lambda _: render_spec(spec, 300), max(1, repeat // 2))
+    return {'cold': cold, 'cached': warm, 'full_resolution_render': full}
+
+def run_suite(scale='small', seed=42, repeat=3, root=None):
+    """Führt alle Benchmarks aus und gibt das Ergebnis-Dict zurück."""
+    params = SCALES[scale]
+    root = root or tempfile.mkdtemp(prefix='wsb_bench_')
+    previous_storage = get_storage_backend()
+    results = {}
+    try:
+        crawler = WSBStockCrawler()
+        corpus = SyntheticCorpus(seed=seed, universe=params['universe'])
+        crawler.stock_symbols = set(corpus.symbols)
+
+        results['extract_symbols_from_text'] = bench_extract(crawler, corpus, params, repeat)
+        results['crawl_subreddit'] = bench_crawl(crawler, corpus, params, repeat)
+
+        set_storage_backend(LocalStorageBackend(os.path.join(root, 'crawl')))
+        results['save_results'] = bench_save(crawler, repeat)
+
+        sessions = params['days'] * params['sessions_per_day']
+        storage, _ = generate_tree(os.path.join(root, 'history'), sessions, params['symbols_per_session'],
+                                   params['universe'], seed=seed, sessions_per_day=params['sessions_per_day'])
+        set_storage_backend(storage)
+        results['load_all_results'], analyzer = bench_load(repeat)
+        results['create_combined_dataframe'] = bench_combine(analyzer, repeat)
+        results['create_visualizations'] = bench_visualizations(analyzer, repeat)
+    finally:
+        set_storage_backend(previous_storage)
+        shutil.rmtree(root, ignore_errors=True)
+
+    return {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(),
+            'revision': _git_revision(),
+            'scale': scale,
+            'seed': seed,
+            'repeat': repeat,
+            'params': params,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'versions': {'pandas': pd.__version__, 'numpy': np.__version__, 'matplotlib': matplotlib.__version__}
+        },
+        'results': results
+    }
+
+def _flatten(results, prefix=''):
+    """Benchmark-Name -> Messwerte, verschachtelte Varianten als 'name.variante'."""
+    flat = {}
+    for name, value in results.items():
+        if 'median_s' in value:
+            flat[prefix + name] = value
+        else:
+            flat.update(_flatten(value, f"{prefix}{name}."))
+    return flat
+
+def compare(current, baseline):
+    """Vergleicht zwei Ergebnis-Dicts; gibt je Benchmark (aktuell, Baseline, Verhältnis) zurück."""
+    current, baseline = _flatten(current['results']), _flatten(baseline['results'])
+    return {name: (timing['median_s'], baseline[name]['median_s'], timing['median_s'] / baseline[name]['median_s'])
+            for name, timing in current.items() if baseline.get(name, {}).get('median_s')}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', default='small', choices=list(SCALES))
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help="Ergebnisdatei (Standard: benchmarks/results/bench_<Zeitstempel>.json)")
+    parser.add_argument('--baseline', help="Frühere Ergebnisdatei zum Vergleich")
+    parser.add_argument('--verbose', action='store_true', help="Log-Ausgaben von Crawler und Analyse anzeigen")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.disable(logging.INFO)
+
+    report = run_suite(args.scale, args.seed, args.repeat)
+    output = args.output or os.path.join(
+        'benchmarks', 'results', f"bench_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    for name, timing in _flatten(report['results']).items():
+        throughput = f"  {timing['items_per_s']:>12,.0f}/s" if timing.get('items_per_s') else ''
+        print(f"{name:45s} {timing['median_s']:9.4f}s{throughput}")
+    print(f"Ergebnisse gespeichert: {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = 0
+        print(f"\nVergleich mit {args.baseline} (Revision {baseline['meta'].get('revision')}):")
+        for name, (current, previous, ratio) in compare(report, baseline).items():
+            flag = ''
+            if ratio > 1 + REGRESSION_THRESHOLD:
+                flag = '  REGRESSION'
+                regressions += 1
+            print(f"{name:45s} {previous:9.4f}s -> {current:9.4f}s  ({ratio:5.2f}x){flag}")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Synthetischer WSB-Korpus für Benchmarks.
+Alle Generatoren sind über einen Seed reproduzierbar:
+- Texte mit log-normal verteilter Länge, Zipf-verteilten Tickern und Rauschen aus
+  ausgeschlossenen Wörtern (YOLO, CALLS, ...) und großgeschriebenen Nicht-Tickern
+- Posts mit Kommentaren als Ersatz für die Reddit-API (ReplayReddit), sodass
+  crawl_subreddit offline gegen aufgezeichnete Daten läuft
+- Session-Bäume (wsb_mentions.json) über N Tage
+"""
+
+import json
+import math
+import random
+import string
+from datetime import datetime, timedelta, timezone
+import compression
+from config import CRAWLER_CONFIG, DATA_PATHS
+from storage import LocalStorageBackend
+
+FILLER_WORDS = (
+    "the this is going to print tomorrow i just bought more shares and my wife is not happy "
+    "calls puts earnings guidance bag holding dip buy sell tendies moon rocket diamond hands "
+    "paper loss porn gain retail hedge fund short squeeze options chain expiry friday market "
+    "open close red green bleeding pump dump idk lol lmao bro trust me dd inside"
+).split()
+
+class SyntheticCorpus:
+    def __init__(self, seed=42, universe=3000, symbols=None, ticker_density=0.03, noise_density=0.04,
+                 median_words=14, sigma=1.0, zipf_exponent=1.1):
+        """
+        :param seed: Seed aller Zufallsentscheidungen
+        :param universe: Anzahl synthetischer Ticker (wenn symbols nicht angegeben)
+        :param symbols: Vorgegebene Ticker, z.B. aus stock_symbols.csv
+        :param ticker_density: Anteil der Wörter, die Ticker sind
+        :param noise_density: Anteil großgeschriebener Nicht-Ticker (ausgeschlossene Wörter, Zufallswörter)
+        :param median_words: Median der Textlänge in Wörtern (log-normal verteilt)
+        :param sigma: Streuung der log-normalen Textlänge
+        :param zipf_exponent: Exponent der Ticker-Popularität (wenige Ticker dominieren)
+        """
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.symbols = sorted(symbols) if symbols else self._generate_symbols(universe)
+        self.excluded_words = sorted(set(CRAWLER_CONFIG['excluded_words']))
+        self.ticker_density = ticker_density
+        self.noise_density = noise_density
+        self.mu = math.log(median_words)
+        self.sigma = sigma
+        weights = [1 / (rank + 1) ** zipf_exponent for rank in range(len(self.symbols))]
+        popularity = self.symbols[:]
+        self.rng.shuffle(popularity)
+        self._popular_symbols = popularity
+        self._cumulative_weights = []
+        total = 0.0
+        for weight in weights:
+            total += weight
+            self._cumulative_weights.append(total)
+
+    def _generate_symbols(self, universe):
+        """Eindeutige Ticker mit 1-5 Buchstaben, darunter einige ausgeschlossene Wörter."""
+        rng = random.Random(self.seed + 1)
+        symbols = set(rng.sample(CRAWLER_CONFIG['excluded_words'], min(20, universe // 50)))
+        while len(symbols) < universe:
+            length = rng.choices([1, 2, 3, 4, 5], weights=[1, 6, 30, 40, 8])[0]
+            symbols.add(''.join(rng.choices(string.ascii_uppercase, k=length)))
+        return sorted(symbols)
+
+    def _ticker(self):
+        return self.rng.choices(self._popular_symbols, cum_weights=self._cumulative_weights)[0]
+
+    def text(self):
+        """Erzeugt einen Kommentar- oder Posttext."""
+        rng = self.rng
+        length = max(1, int(rng.lognormvariate(self.mu, self.sigma)))
+        words = []
+        for _ in range(length):
+            roll = rng.random()
+            if roll < self.ticker_density:
+                ticker = self._ticker()
+                words.append(rng.choice((ticker, f"${ticker}", f"{ticker}!")))
+            elif roll < self.ticker_density + self.noise_density:
+                words.append(rng.choice(self.excluded_words) if rng.random() < 0.7
+                             else ''.join(rng.choices(string.ascii_uppercase, k=rng.randint(2, 6))))
+            else:
+                words.append(rng.choice(FILLER_WORDS))
+        return ' '.join(words)
+
+    def texts(self, count):
+        return [self.text() for _ in range(count)]
+
+    def posts(self, count, comments_per_post=50):
+        """Erzeugt Posts mit Kommentaren (Anzahl je Post um comments_per_post gestreut)."""
+        posts = []
+        for i in range(count):
+            comment_count = max(0, int(self.rng.gauss(comments_per_post, comments_per_post / 4)))
+            posts.append(ReplayPost(
+                post_id=f"p{i:06d}",
+                title=self.text(),
+                selftext=self.text() if self.rng.random() < 0.6 else '',
+                comments=[ReplayComment(self.text()) for _ in range(comment_count)]
+            ))
+        return posts
+
+class ReplayComment:
+    def __init__(self, body):
+        self.body = body
+
+class ReplayCommentForest:
+    def __init__(self, comments):
+        self._comments = comments
+
+    def replace_more(self, limit=0):
+        return []
+
+    def list(self):
+        return list(self._comments)
+
+class ReplayPost:
+    def __init__(self, post_id, title, selftext, comments):
+        self.id = post_id
+        self.title = title
+        self.selftext = selftext
+        self.comments = ReplayCommentForest(comments)
+
+class ReplaySubreddit:
+    def __init__(self, posts):
+        self._posts = posts
+
+    def hot(self, limit=None):
+        return iter(self._posts[:limit])
+
+class ReplayReddit:
+    """Ersatz für praw.Reddit, der aufgezeichnete oder synthetische Posts ausliefert."""
+
+    def __init__(self, posts):
+        self._posts = posts
+
+    def subreddit(self, name):
+        return ReplaySubreddit(self._posts)
+
+def generate_tree(root, sessions, symbols_per_session=150, universe=3000, encoding='gzip', seed=42,
+                  sessions_per_day=24):
+    """
+    Schreibt synthetische wsb_mentions.json-Artefakte und gibt (Speicher-Backend, Schlüssel) zurück.
+    Die Sessions sind gleichmäßig über sessions / sessions_per_day Tage verteilt.
+    """
+    rng = random.Random(seed)
+    storage = LocalStorageBackend(root)
+    symbols = [f"S{i:04d}" for i in range(universe)]
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    interval = timedelta(days=1) / sessions_per_day
+    keys = []
+    for i in range(sessions):
+        crawl_dt = (start + i * interval).replace(microsecond=0)
+        results = {s: rng.randint(1, 60) for s in rng.sample(symbols, symbols_per_session)}
+        result = {
+            'timestamp': crawl_dt.strftime("%Y%m%d_%H%M%S"),
+            'crawl_date': crawl_dt.isoformat(),
+            'total_symbols_found': len(results),
+            'total_mentions': sum(results.values()),
+            'subreddit': 'wallstreetbets',
+            'results': dict(sorted(results.items(), key=lambda x: x[1], reverse=True))
+        }
+        key = (f"{DATA_PATHS['results_dir']}{crawl_dt.strftime('%Y-%m-%d/%H%M%S')}/"
+               f"{compression.artifact_name('wsb_mentions.json', encoding)}")
+        storage.put(key, compression.compress(json.dumps(result, separators=(',', ':')).encode('utf-8'), encoding))
+        keys.append(key)
+    return storage, keys
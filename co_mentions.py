@@ -0,0 +1,162 @@
+"""
+Gemeinsame Erwähnungen (Co-Mentions) von Symbolen in Posts und Kommentaren.
+Die Paare werden als dünn besetzte, symmetrische Symbol x Symbol-Matrix geführt:
+neue Paare werden als COO-Einträge gesammelt und blockweise in eine CSR-Matrix
+(indptr, indices, data) eingerechnet. Es wird nie eine dichte Matrix angelegt.
+"""
+
+import io
+import logging
+from array import array
+import numpy as np
+import pandas as pd
+from config import CO_MENTION_CONFIG
+from topk import top_indices
+
+logger = logging.getLogger(__name__)
+
+class CoMentionGraph:
+    def __init__(self):
+        """Initialisiert einen leeren Graphen."""
+        self.symbols = []
+        self._positions = {}
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.zeros(0, dtype=np.int32)
+        self.data = np.zeros(0, dtype=np.int64)
+        # Noch nicht eingerechnete COO-Einträge (nur obere Dreiecksmatrix)
+        self._rows = array('q')
+        self._cols = array('q')
+        self.documents = 0
+
+    def __len__(self):
+        return len(self.symbols)
+
+    @property
+    def empty(self):
+        return not len(self.data) and not len(self._rows)
+
+    def _position(self, symbol):
+        position = self._positions.get(symbol)
+        if position is None:
+            position = self._positions[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return position
+
+    def add_document(self, symbols):
+        """
+        Übernimmt die Symbole eines Posts oder Kommentars. Jedes Paar verschiedener
+        Symbole zählt einmal pro Dokument, unabhängig von der Anzahl der Erwähnungen.
+        """
+        unique = set(symbols)
+        if len(unique) < 2:
+            return
+        if len(unique) > CO_MENTION_CONFIG['max_symbols_per_text']:
+            # Listen und Spam-Kommentare würden quadratisch viele Paare erzeugen
+            return
+        unique = sorted(self._position(s) for s in unique)
+        self.documents += 1
+        for i, row in enumerate(unique):
+            for col in unique[i + 1:]:
+                self._rows.append(row)
+                self._cols.append(col)
+        if len(self._rows) >= CO_MENTION_CONFIG['flush_threshold']:
+            self.flush()
+
+    def flush(self):
+        """Rechnet die gesammelten COO-Einträge in die CSR-Matrix ein."""
+        if not len(self._rows):
+            return
+        rows = np.frombuffer(self._rows, dtype=np.int64).copy()
+        cols = np.frombuffer(self._cols, dtype=np.int64).copy()
+        self._rows = array('q')
+        self._cols = array('q')
+        self._merge(rows, cols, np.ones(len(rows), dtype=np.int64))
+
+    def _coo(self):
+        """Gibt die CSR-Matrix als COO-Tripel (rows, cols, data) zurück."""
+        rows = np.repeat(np.arange(len(self.indptr) - 1, dtype=np.int64), np.diff(self.indptr))
+        return rows, self.indices.astype(np.int64), self.data
+
+    def _merge(self, rows, cols, weights):
+        """Addiert Einträge der oberen Dreiecksmatrix (beide Richtungen werden gespeichert)."""
+        size = len(self.symbols)
+        old_rows, old_cols, old_data = self._coo()
+        keys = np.concatenate([old_rows * size + old_cols, rows * size + cols, cols * size + rows])
+        values = np.concatenate([old_data, weights, weights])
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        self.data = np.bincount(inverse, weights=values).astype(np.int64)
+        self.indices = (unique_keys % size).astype(np.int32)
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(unique_keys // size, minlength=size))])
+
+    def merge(self, other):
+        """Addiert einen anderen Graphen (z.B. einer weiteren Session)."""
+        other.flush()
+        self.flush()
+        if not len(other.data):
+            return
+        mapping = np.fromiter((self._position(s) for s in other.symbols), dtype=np.int64, count=len(other.symbols))
+        rows, cols, data = other._coo()
+        rows, cols = mapping[rows], mapping[cols]
+        # Nur eine Richtung übernehmen, _merge ergänzt die Gegenrichtung
+        upper = rows < cols
+        self._merge(rows[upper], cols[upper], data[upper])
+        self.documents += other.documents
+
+    def top_pairs(self, limit=20):
+        """Die am häufigsten gemeinsam erwähnten Symbolpaare."""
+        self.flush()
+        columns = ['Symbol1', 'Symbol2', 'CoMentions']
+        rows, cols, data = self._coo()
+        upper = np.flatnonzero(rows < cols)
+        if not len(upper):
+            return pd.DataFrame(columns=columns)
+        # Bei Gleichstand in Zeilen-/Spaltenreihenfolge, damit das Ergebnis stabil ist
+        upper = upper[top_indices(data[upper], limit)]
+        return pd.DataFrame({
+            'Symbol1': [self.symbols[i] for i in rows[upper]],
+            'Symbol2': [self.symbols[i] for i in cols[upper]],
+            'CoMentions': data[upper]
+        }, columns=columns)
+
+    def neighbours(self, symbol, limit=10):
+        """Symbole, die am häufigsten zusammen mit dem Symbol erwähnt wurden."""
+        self.flush()
+        columns = ['Symbol', 'CoMentions']
+        position = self._positions.get(symbol.upper())
+        if position is None or position + 1 >= len(self.indptr):
+            return pd.DataFrame(columns=columns)
+        start, end = self.indptr[position], self.indptr[position + 1]
+        cols, data = self.indices[start:end], self.data[start:end]
+        order = top_indices(data, limit)
+        return pd.DataFrame({
+            'Symbol': [self.symbols[i] for i in cols[order]],
+            'CoMentions': data[order]
+        }, columns=columns)
+
+    def to_bytes(self, **extra):
+        """Serialisiert den Graphen (npz); zusätzliche Arrays werden mitgespeichert."""
+        self.flush()
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            symbols=np.array(self.symbols, dtype=str),
+            indptr=self.indptr,
+            indices=self.indices,
+            data=self.data,
+            documents=np.array([self.documents], dtype=np.int64),
+            **extra
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Stellt einen mit to_bytes gespeicherten Graphen wieder her."""
+        graph = cls()
+        with np.load(io.BytesIO(data)) as state:
+            graph.symbols = state['symbols'].tolist()
+            graph._positions = {symbol: i for i, symbol in enumerate(graph.symbols)}
+            graph.indptr = state['indptr'].astype(np.int64)
+            graph.indices = state['indices'].astype(np.int32)
+            graph.data = state['data'].astype(np.int64)
+            graph.documents = int(state['documents'][0])
+        return graph
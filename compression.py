@@ -0,0 +1,141 @@
+"""
+Kompression von Session- und Analyse-Artefakten.
+Unterstützt gzip und optional zstd (Paket 'zstandard'). Leser erkennen das
+Format anhand der Magic Bytes, sodass komprimierte und unkomprimierte
+Artefakte transparent gelesen werden können.
+"""
+
+import gzip
+import io
+import logging
+import os
+from config import ARTIFACT_CONFIG
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+SUFFIXES = {
+    'none': '',
+    'gzip': '.gz',
+    'zstd': '.zst'
+}
+
+def get_encoding():
+    """Gibt das konfigurierte Kompressionsverfahren zurück ('none', 'gzip' oder 'zstd')."""
+    encoding = ARTIFACT_CONFIG.get('compression', 'gzip')
+    if encoding not in SUFFIXES:
+        logger.warning(f"Unbekannte Kompression '{encoding}', verwende gzip.")
+        return 'gzip'
+    if encoding == 'zstd' and zstandard is None:
+        logger.warning("Paket 'zstandard' nicht installiert, verwende gzip.")
+        return 'gzip'
+    return encoding
+
+def artifact_name(filename, encoding=None):
+    """Hängt die Dateiendung des Kompressionsverfahrens an einen Dateinamen an."""
+    return filename + SUFFIXES[encoding or get_encoding()]
+
+def candidate_names(filename):
+    """Alle Dateinamen, unter denen ein Artefakt gespeichert sein kann."""
+    return [filename + suffix for suffix in SUFFIXES.values()]
+
+def matches(path, filename):
+    """Prüft, ob ein Pfad auf ein (ggf. komprimiertes) Artefakt verweist."""
+    return os.path.basename(path.replace('\\', '/')) in candidate_names(filename)
+
+def encoding_from_name(path):
+    """Leitet das Kompressionsverfahren aus der Dateiendung ab."""
+    for encoding, suffix in SUFFIXES.items():
+        if suffix and path.endswith(suffix):
+            return encoding
+    return 'none'
+
+def strip_suffix(path):
+    """Entfernt eine Kompressions-Endung vom Dateinamen."""
+    for suffix in SUFFIXES.values():
+        if suffix and path.endswith(suffix):
+            return path[:-len(suffix)]
+    return path
+
+def compress(data, encoding=None):
+    """Komprimiert Bytes mit dem angegebenen oder konfigurierten Verfahren."""
+    encoding = encoding or get_encoding()
+    level = ARTIFACT_CONFIG.get('compression_level')
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=level or 6, mtime=0)
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=level or 3).compress(data)
+    return data
+
+def decompress(data):
+    """Dekomprimiert Bytes anhand der Magic Bytes. Unkomprimierte Daten bleiben unverändert."""
+    if data[:2] == GZIP_MAGIC:
+        return gzip.decompress(data)
+    if data[:4] == ZSTD_MAGIC:
+        if zstandard is None:
+            raise ImportError("Paket 'zstandard' wird zum Lesen von .zst-Artefakten benötigt.")
+        # decompressobj benötigt keine Inhaltsgröße im Frame-Header
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    return data
+
+class _OwningGzipFile(gzip.GzipFile):
+    """GzipFile, das beim Schließen auch den zugrundeliegenden Stream schließt."""
+    def __init__(self, source):
+        super().__init__(fileobj=source, mode='rb')
+        self._source = source
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self._source.close()
+
+def open_decompressed(fileobj):
+    """
+    Umhüllt einen binären Stream und dekomprimiert ihn beim Lesen anhand der Magic Bytes.
+    Der zurückgegebene Stream schließt beim Schließen auch den Quell-Stream.
+    """
+    buffered = fileobj if hasattr(fileobj, 'peek') else io.BufferedReader(fileobj)
+    magic = buffered.peek(4)[:4]
+    if magic[:2] == GZIP_MAGIC:
+        return _OwningGzipFile(buffered)
+    if magic == ZSTD_MAGIC:
+        if zstandard is None:
+            raise ImportError("Paket 'zstandard' wird zum Lesen von .zst-Artefakten benötigt.")
+        return zstandard.ZstdDecompressor().stream_reader(buffered, closefd=True)
+    return buffered
+
+def open_text(fileobj):
+    """Öffnet einen binären, ggf. komprimierten Stream als zeilenweise lesbaren Text-Stream."""
+    return io.TextIOWrapper(open_decompressed(fileobj), encoding='utf-8', errors='ignore')
+
+def open_local(path, binary=False):
+    """Öffnet eine lokale, ggf. komprimierte Datei als Stream, ohne sie vollständig einzulesen."""
+    f = open(path, 'rb')
+    return open_decompressed(f) if binary else open_text(f)
+
+def decode_text(data):
+    """Dekomprimiert Bytes und dekodiert sie als UTF-8."""
+    return decompress(data).decode('utf-8', errors='ignore')
+
+def read_text(path):
+    """Liest eine lokale, ggf. komprimierte Textdatei."""
+    with open(path, 'rb') as f:
+        return decode_text(f.read())
+
+def s3_extra_args(encoding=None, content_type=None):
+    """ExtraArgs für den S3-Upload mit Content-Encoding-Metadaten."""
+    encoding = encoding or get_encoding()
+    extra_args = {}
+    if encoding != 'none':
+        extra_args['ContentEncoding'] = encoding
+    if content_type:
+        extra_args['ContentType'] = content_type
+    return extra_args
@@ -32,12 +32,34 @@ DATA_PATHS = {
     'stock_symbols': 'data/stock_symbols.csv',
     'results_dir': 'data/results/',
     'analysis_dir': 'data/analysis/',
+    'history_dir': 'data/history/',
+    'analysis_state_dir': 'data/analysis/state/',
     'logs_dir': 'logs/'
 }
 
 # Speicher-Konfiguration
 STORAGE_CONFIG = {
-    'type': os.getenv('STORAGE_TYPE', 'local')  # 'local' oder 's3'
+    'type': os.getenv('STORAGE_TYPE', 'local'),  # 'local', 's3' oder 'memory'
+    'local_root': os.getenv('STORAGE_LOCAL_ROOT', '.'),  # Basisverzeichnis für lokale Schlüssel
+    'max_workers': 8  # Parallele Anfragen bei Batch-Operationen
+}
+
+# Paralleles Laden der Session-Ergebnisse
+LOADER_CONFIG = {
+    'executor': os.getenv('LOADER_EXECUTOR', 'serial'),  # 'serial', 'thread' oder 'process' (Worker-Prozesse per spawn)
+    'max_workers': int(os.getenv('LOADER_MAX_WORKERS', '0')) or None,  # None = Anzahl CPUs
+    'chunksize': 64,  # Dateien je Aufgabe im Prozess-Pool
+    'min_parallel': 32,  # Unterhalb dieser Anzahl wird seriell geladen
+    'chunk_sessions': int(os.getenv('STREAMING_CHUNK_SESSIONS', '500')),  # Sessions je Block im Streaming-Modus
+    'history_days': int(os.getenv('ANALYSIS_HISTORY_DAYS', '0')) or None,  # Nur die letzten N Tage aus dem Parquet-Verlauf analysieren; None = alle Sessions
+    'state_compact_parts': int(os.getenv('ANALYSIS_STATE_COMPACT_PARTS', '16'))  # Teile des Analyse-Zustands, ab denen zusammengefasst wird
+}
+
+# Artefakt-Einstellungen
+ARTIFACT_CONFIG = {
+    'compression': os.getenv('ARTIFACT_COMPRESSION', 'gzip'),  # 'none', 'gzip' oder 'zstd' (benötigt zstandard)
+    'compression_level': None,  # None = Standard des jeweiligen Verfahrens
+    'session_csv': os.getenv('WRITE_SESSION_CSV', 'false').lower() == 'true'  # Redundante CSV je Session
 }
 
 # S3 Konfiguration (nur relevant wenn STORAGE_TYPE = 's3')
@@ -45,7 +67,67 @@ S3_CONFIG = {
     'aws_access_key_id': os.getenv('AWS_ACCESS_KEY_ID'),
     'aws_secret_access_key': os.getenv('AWS_SECRET_ACCESS_KEY'),
     'region_name': os.getenv('AWS_REGION', 'eu-central-1'),
-    'bucket_name': os.getenv('S3_BUCKET_NAME')
+    'bucket_name': os.getenv('S3_BUCKET_NAME'),
+    # Transferprofil für Multipart-Uploads und -Downloads
+    'transfer': {
+        'multipart_threshold': int(os.getenv('S3_MULTIPART_THRESHOLD_MB', '8')) * 1024 * 1024,
+        'multipart_chunksize': int(os.getenv('S3_MULTIPART_CHUNKSIZE_MB', '8')) * 1024 * 1024,
+        'max_concurrency': int(os.getenv('S3_MAX_CONCURRENCY', '10')),
+        'use_threads': True
+    }
+}
+
+# Lokaler Cache für S3-Artefakte
+CACHE_CONFIG = {
+    'enabled': os.getenv('S3_CACHE_ENABLED', 'true').lower() == 'true',
+    'cache_dir': os.getenv('S3_CACHE_DIR', '.cache/s3/'),
+    'max_bytes': int(os.getenv('S3_CACHE_MAX_MB', '512')) * 1024 * 1024,
+    # Session-Artefakte werden nur einmal geschrieben und müssen nicht revalidiert werden
+    'immutable_prefixes': [DATA_PATHS['results_dir']]
+}
+
+# Eingebettete SQL-Abfrageschicht (SQLite) über die Session-Historie
+QUERY_CONFIG = {
+    'db_path': os.getenv('QUERY_DB_PATH', 'data/wsb_history.sqlite'),  # Immer lokal, auch bei S3-Speicher
+    'batch_size': 500  # Sessions je Ingest-Transaktion
+}
+
+# Trend-Erkennung
+TRENDING_CONFIG = {
+    'method': os.getenv('TRENDING_METHOD', 'sum'),  # 'sum' (Summe der letzten Tage) oder 'zscore' (Abweichung von der EWMA-Baseline)
+    'halflife': 12,  # Halbwertszeit der Baseline in Sessions
+    'min_mentions': 3,  # Mindestanzahl Erwähnungen in der letzten Session
+    'min_std': 1.0  # Untergrenze der Standardabweichung, verhindert Ausreißer bei neuen Symbolen
+}
+
+# Gemeinsame Erwähnungen (Co-Mentions) je Post/Kommentar
+CO_MENTION_CONFIG = {
+    'enabled': os.getenv('CO_MENTIONS_ENABLED', 'true').lower() == 'true',
+    'max_symbols_per_text': 25,  # Texte mit mehr Symbolen (Listen, Spam) werden übersprungen
+    'flush_threshold': 1_000_000  # Gesammelte Paare, ab denen in die CSR-Matrix eingerechnet wird
+}
+
+# Metrics-Endpunkt im Prometheus-Textformat (für Dauerbetrieb)
+METRICS_CONFIG = {
+    'enabled': os.getenv('METRICS_ENABLED', 'false').lower() == 'true',
+    'host': os.getenv('METRICS_HOST', '127.0.0.1'),  # Standardmäßig nur lokal erreichbar
+    'port': int(os.getenv('METRICS_PORT', '9108'))
+}
+
+# Speicher-Profiling (tracemalloc, nur für Messläufe)
+MEMORY_PROFILE_CONFIG = {
+    'enabled': os.getenv('PROFILE_MEMORY', 'false').lower() == 'true',
+    'frames': int(os.getenv('PROFILE_MEMORY_FRAMES', '1')),  # Tiefe der Tracebacks je Allokation
+    'top_allocators': 20  # Größte Allokatoren je Messpunkt
+}
+
+# Diagramme
+PLOT_CONFIG = {
+    'dpi': 300,  # Auflösung des exportierten Diagramms
+    'preview_dpi': 60,  # Schnelle Vorschau für die Oberflächen
+    'gui_dpi': 80,  # Auflösung der Diagramme in der Desktop-GUI
+    'background_export': os.getenv('PLOT_BACKGROUND_EXPORT', 'true').lower() == 'true',  # Export im Hintergrund-Thread
+    'workers': int(os.getenv('PLOT_WORKERS', '2'))  # Render-Prozesse; 0 = im aufrufenden Thread rendern
 }
 
 # GUI Einstellungen
@@ -4,25 +4,58 @@ Erstellt tabellarische Übersichten und Analysen der Crawling-Ergebnisse
 """
 
 import pandas as pd
+import numpy as np
 import json
 import os
-import glob
 import io
 from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-import seaborn as sns
 from collections import defaultdict
 import logging
-from config import DATA_PATHS, STORAGE_CONFIG
-import s3_handler
+import threading
+import time
+from config import DATA_PATHS, TRENDING_CONFIG, LOADER_CONFIG, PLOT_CONFIG, MEMORY_PROFILE_CONFIG
+import compression
+from storage import get_storage_backend
+from history_store import HistoryStore, parse_crawl_date
+from pandas.api.types import union_categoricals
+from rollups import SymbolRollups
+from trending import TrendingEngine
+from query_engine import SessionQueryEngine
+from session_loader import load_sessions
+from plot_rendering import render_cached
+from co_mentions import CoMentionGraph
+from metrics import SessionMetrics, activate_metrics, bind_metrics, start_metrics_server
+
+# Fakt-Tabelle: eine Zeile je Session und Symbol, Session-Summen liegen in sessions_df
+FACT_COLUMNS = ['Date', 'DateTime', 'Timestamp', 'Symbol', 'Mentions']
+CATEGORICAL_COLUMNS = ['Timestamp', 'Symbol']
+# Spalten der exportierten combined_analysis.csv
+EXPORT_COLUMNS = ['Date', 'DateTime', 'Timestamp', 'Symbol', 'Mentions', 'TotalMentions', 'UniqueSymbols']
 
 class WSBDataAnalyzer:
     def __init__(self):
         """Initialisiert den Datenanalyzer"""
+        # Vollständige Session-Ergebnisse (nur load_all_results) und Kopfdaten aller Sessions
         self.all_results = []
+        self.session_headers = []
         self.combined_df = None
+        self.sessions_df = None
+        # Vorberechnete Aggregate zum combined_df
+        self.rollups = None
+        self.trending_engine = None
+        self._symbol_index = None
+        self.query_engine = None
+        # Timelines der Watchlist-Symbole aus dem Streaming-Modus
+        self.watchlist_timelines = {}
+        self._export_threads = []
+        self.co_mention_graph = None
+        self._co_mention_sessions = set()
+        self.metrics = SessionMetrics('analysis')
+        start_metrics_server()
         self.log_file_path = None
         self.session_path_for_saving = None
+        # Zuletzt inkrementell aufgebauter Zustand (DataFrame, Session-Kopfdaten)
+        self._state = None
         self.logger = logging.getLogger(__name__)
         if not self.logger.handlers:
             self.setup_logging() # Grundkonfiguration
@@ -61,46 +94,29 @@ class WSBDataAnalyzer:
         Sonst werden alle Ergebnisse geladen.
         """
         self.all_results = []
+        self.session_headers = []
         self.session_path_for_saving = session_path
         try:
-            if STORAGE_CONFIG['type'] == 's3':
-                self.logger.info("Lade Ergebnisse von S3...")
-                prefix = f"{DATA_PATHS['results_dir']}{session_path if session_path else ''}"
-                s3_files = s3_handler.list_files(prefix=prefix)
-                if s3_files is None: return False
-                
-                json_files = [f for f in s3_files if f.endswith('wsb_mentions.json')]
-                if not json_files:
-                    self.logger.warning(f"Keine 'wsb_mentions.json' Dateien auf S3 im Pfad '{prefix}' gefunden.")
-                    return False
-                
-                for s3_file_key in json_files:
-                    try:
-                        content = s3_handler.get_file_content(s3_file_key)
-                        if content:
-                            data = json.loads(content)
-                            # Speichere den Pfad für das spätere Speichern der Analyse
-                            if not session_path:
-                                self.session_path_for_saving = os.path.dirname(s3_file_key.replace(DATA_PATHS['results_dir'], '')) + '/'
-                            self.all_results.append(data)
-                    except Exception as e:
-                        self.logger.error(f"Fehler beim Laden von {s3_file_key} von S3: {e}")
-            else:
-                self.logger.info("Lade Ergebnisse vom lokalen Dateisystem...")
-                search_path = os.path.join(DATA_PATHS['results_dir'], session_path if session_path else '**')
-                local_json_files = glob.glob(f"{search_path}/wsb_mentions.json", recursive=True)
-                if not local_json_files:
-                    self.logger.warning(f"Keine 'wsb_mentions.json' Dateien lokal im Pfad '{search_path}' gefunden.")
-                    return False
-                
-                for json_file in local_json_files:
-                    try:
-                        if not session_path:
-                             self.session_path_for_saving = os.path.dirname(json_file).replace(DATA_PATHS['results_dir'], '').replace('\\', '/') + '/'
-                        with open(json_file, 'r', encoding='utf-8') as f:
-                            self.all_results.append(json.load(f))
-                    except Exception as e:
-                        self.logger.error(f"Fehler beim Laden von {json_file}: {e}")
+            storage = get_storage_backend()
+            self.logger.info(f"Lade Ergebnisse ({storage.name})...")
+            prefix = f"{DATA_PATHS['results_dir']}{session_path if session_path else ''}"
+            keys = storage.list(prefix=prefix)
+            if keys is None: return False
+
+            json_keys = sorted(k for k in keys if compression.matches(k, 'wsb_mentions.json'))
+            if not json_keys:
+                self.logger.warning(f"Keine 'wsb_mentions.json' Dateien im Pfad '{prefix}' gefunden.")
+                return False
+
+            # Dateien parallel lesen und parsen
+            loaded = load_sessions(json_keys, storage)
+            self.all_results = list(loaded.values())
+            results_dir = DATA_PATHS['results_dir']
+            self.session_headers = [self._session_header(key[len(results_dir):].rsplit('/', 1)[0] + '/', result)
+                                    for key, result in loaded.items()]
+            # Speichere den Pfad der neuesten Session für das spätere Speichern der Analyse
+            if loaded and not session_path:
+                self.session_path_for_saving = list(loaded)[-1][len(DATA_PATHS['results_dir']):].rsplit('/', 1)[0] + '/'
 
             self.logger.info(f"{len(self.all_results)} Ergebnisdateien geladen.")
             return len(self.all_results) > 0
@@ -109,6 +125,84 @@ class WSBDataAnalyzer:
             self.logger.error(f"Fehler beim Laden der Ergebnisse: {e}")
             return False
             
+    @staticmethod
+    def _build_combined_frame(results):
+        """
+        Erstellt die Fakt-Tabelle (eine Zeile je Session und Symbol) für die übergebenen
+        Session-Ergebnisse. Der DataFrame wird spaltenweise aufgebaut: Symbole und Erwähnungen
+        werden je Session als Arrays übernommen, Session-Felder per Wiederholung verteilt.
+        Session-Summen stehen in der separaten Session-Tabelle (siehe _build_session_table).
+        """
+        symbols, mentions, lengths, crawl_dates, timestamps = [], [], [], [], []
+        for result in results:
+            session_results = result.get('results', {})
+            symbols.append(np.array(list(session_results.keys()), dtype=object))
+            mentions.append(np.fromiter(session_results.values(), dtype=np.int32, count=len(session_results)))
+            lengths.append(len(session_results))
+            crawl_dates.append(parse_crawl_date(result))
+            timestamps.append(result.get('timestamp', ''))
+
+        if not sum(lengths):
+            # Leere Tabelle mit Schema, damit sie als Analyse-Zustand gespeichert und wieder geladen werden kann
+            return WSBDataAnalyzer._compact_dtypes(pd.DataFrame(columns=FACT_COLUMNS))
+
+        lengths = np.array(lengths)
+        date_times = pd.DatetimeIndex(pd.to_datetime(crawl_dates, utc=True))
+        return pd.DataFrame({
+            'Date': date_times.tz_convert(None).normalize().repeat(lengths),
+            'DateTime': date_times.repeat(lengths),
+            'Timestamp': pd.Categorical(np.repeat(np.array(timestamps, dtype=object), lengths)),
+            'Symbol': pd.Categorical(np.concatenate(symbols)),
+            'Mentions': np.concatenate(mentions)
+        })
+
+    @staticmethod
+    def _build_session_table(results):
+        """Erstellt die Session-Tabelle (eine Zeile je Session) aus Ergebnissen oder Kopfdaten."""
+        crawl_dates = pd.DatetimeIndex(pd.to_datetime([parse_crawl_date(r) for r in results], utc=True))
+        return pd.DataFrame({
+            'Timestamp': [r.get('timestamp', '') for r in results],
+            'Date': crawl_dates.tz_convert(None).normalize(),
+            'DateTime': crawl_dates,
+            'TotalMentions': np.array([r.get('total_mentions', 0) for r in results], dtype=np.int64),
+            'UniqueSymbols': np.array([r.get('total_symbols_found', 0) for r in results], dtype=np.int32)
+        })
+
+    @staticmethod
+    def _compact_dtypes(frame):
+        """Stellt die kompakten Datentypen der Fakt-Tabelle her (z.B. nach dem Lesen aus Parquet)."""
+        frame = frame.copy()
+        frame['Date'] = pd.to_datetime(frame['Date']).astype('datetime64[ns]')
+        frame['DateTime'] = frame['DateTime'].astype('datetime64[ns, UTC]')
+        for column in CATEGORICAL_COLUMNS:
+            frame[column] = frame[column].astype('category')
+        frame['Mentions'] = frame['Mentions'].astype(np.int32)
+        return frame
+
+    @staticmethod
+    def _concat_facts(frames):
+        """Verkettet Fakt-Tabellen, ohne die kategorialen Spalten in Strings zurückzuwandeln."""
+        frames = [frame for frame in frames if not frame.empty]
+        if len(frames) > 1:
+            for column in CATEGORICAL_COLUMNS:
+                categories = union_categoricals([frame[column] for frame in frames]).categories
+                frames = [frame.assign(**{column: frame[column].cat.set_categories(categories)})
+                          for frame in frames]
+        return pd.concat(frames, ignore_index=True)
+
+    def get_export_dataframe(self):
+        """
+        Gibt den kombinierten DataFrame im bisherigen Exportformat zurück: eine Zeile je
+        Session und Symbol inklusive der Session-Summen, Date als 'YYYY-MM-DD'.
+        """
+        if self.combined_df is None or self.combined_df.empty:
+            return pd.DataFrame(columns=EXPORT_COLUMNS)
+        session_totals = self.sessions_df[['Timestamp', 'TotalMentions', 'UniqueSymbols']]
+        export_df = self.combined_df.astype({'Timestamp': str, 'Symbol': str}).merge(
+            session_totals.drop_duplicates('Timestamp'), on='Timestamp', how='left')
+        export_df['Date'] = export_df['Date'].dt.strftime('%Y-%m-%d')
+        return export_df[EXPORT_COLUMNS]
+
     def create_combined_dataframe(self):
         """Erstellt einen kombinierten DataFrame aus allen Ergebnissen"""
         if not self.all_results:
@@ -116,35 +210,10 @@ class WSBDataAnalyzer:
             return False
             
         try:
-            combined_data = []
-            
-            for result in self.all_results:
-                timestamp = result.get('timestamp', '')
-                crawl_date = result.get('crawl_date', '')
-                
-                # Konvertiere Datum
-                try:
-                    if crawl_date:
-                        date_obj = datetime.fromisoformat(crawl_date.replace('Z', '+00:00'))
-                    else:
-                        # Fallback: Parse aus Timestamp
-                        date_obj = datetime.strptime(timestamp, "%Y%m%d_%H%M%S")
-                except:
-                    date_obj = datetime.now()
-                    
-                # Füge jeden Symbol-Mention als Zeile hinzu
-                for symbol, mentions in result.get('results', {}).items():
-                    combined_data.append({
-                        'Date': date_obj.date(),
-                        'DateTime': date_obj,
-                        'Timestamp': timestamp,
-                        'Symbol': symbol,
-                        'Mentions': mentions,
-                        'TotalMentions': result.get('total_mentions', 0),
-                        'UniqueSymbols': result.get('total_symbols_found', 0)
-                    })
-                    
-            self.combined_df = pd.DataFrame(combined_data)
+            self.combined_df = self._build_combined_frame(self.all_results)
+            self.sessions_df = self._build_session_table(self.all_results)
+            self.rollups = SymbolRollups.from_frame(self.combined_df)
+            self.trending_engine = None
             
             if not self.combined_df.empty:
                 # Sortiere nach Datum
@@ -158,76 +227,572 @@ class WSBDataAnalyzer:
         except Exception as e:
             self.logger.error(f"Error creating combined dataframe: {e}")
             return False
-            
+
+    @staticmethod
+    def _session_header(session, result):
+        """Kopfdaten einer Session ohne die einzelnen Symbol-Ergebnisse."""
+        return {
+            'session': session,
+            'timestamp': result.get('timestamp', ''),
+            'crawl_date': result.get('crawl_date', ''),
+            'total_mentions': result.get('total_mentions', 0),
+            'total_symbols_found': result.get('total_symbols_found', 0)
+        }
+
+    @staticmethod
+    def _state_keys(part):
+        """Schlüssel der Fakt-Tabelle und Präfix der Rollups eines Zustands-Teils."""
+        state_dir = DATA_PATHS['analysis_state_dir']
+        return f"{state_dir}facts/{part}.parquet", f"{state_dir}rollups/{part}/"
+
+    def _load_state(self, storage):
+        """
+        Lädt den gespeicherten Analyse-Zustand: Fakt-Tabelle und Rollups aus allen Teilen,
+        die Kopfdaten der übernommenen Sessions, die Liste der Teile und den Trend-Zustand.
+        """
+        state_dir = DATA_PATHS['analysis_state_dir']
+        manifest_data = storage.get(f"{state_dir}sessions.json")
+        if manifest_data is None:
+            return None, [], [], SymbolRollups(), TrendingEngine()
+        try:
+            manifest = json.loads(compression.decompress(manifest_data))
+            sessions, parts = manifest['sessions'], manifest['parts']
+            fact_keys = [self._state_keys(part)[0] for part in parts]
+            contents = storage.get_many(fact_keys) if fact_keys else {}
+            missing = [key for key in fact_keys if contents.get(key) is None]
+            if missing:
+                raise ValueError(f"Teile fehlen: {', '.join(missing)}")
+            frames = [self._compact_dtypes(pd.read_parquet(io.BytesIO(contents[key]))) for key in fact_keys]
+            if any(not frame.empty for frame in frames):
+                # Nachgereichte ältere Sessions liegen in späteren Teilen
+                frame = self._concat_facts(frames).sort_values('DateTime', kind='stable').reset_index(drop=True)
+            else:
+                frame = self._build_combined_frame([])
+
+            rollups = SymbolRollups()
+            for part in parts:
+                part_rollups = SymbolRollups.load(storage, self._state_keys(part)[1])
+                if part_rollups is None:
+                    rollups = SymbolRollups.from_frame(frame)
+                    break
+                rollups.merge(part_rollups)
+            engine_data = storage.get(f"{state_dir}trending.npz")
+            engine = TrendingEngine.from_bytes(engine_data) if engine_data is not None else None
+            # Bei geänderter Konfiguration wird der Trend-Zustand neu aufgebaut
+            if engine is None or engine.halflife != TRENDING_CONFIG['halflife']:
+                engine = TrendingEngine.from_frame(frame)
+            return frame, sessions, parts, rollups, engine
+        except Exception as e:
+            self.logger.warning(f"Gespeicherter Analyse-Zustand unlesbar, baue neu auf: {e}")
+            return None, [], [], SymbolRollups(), TrendingEngine()
+
+    def _save_state(self, storage, state, new_frame=None, new_rollups=None):
+        """
+        Schreibt neue Fakten als eigenen Parquet-Teil (mit den Rollups dieses Teils) in den
+        Analyse-Zustand; bestehende Teile bleiben unverändert. Ab
+        LOADER_CONFIG['state_compact_parts'] Teilen werden alle Teile zu einem zusammengefasst.
+
+        :param state: (frame, sessions, parts, rollups, engine) nach dem Anhängen
+        :return: Liste der Teile nach dem Speichern oder None bei einem Fehler
+        """
+        frame, sessions, parts, rollups, engine = state
+        state_dir = DATA_PATHS['analysis_state_dir']
+        new_parts = list(parts)
+        compact = False
+        if new_frame is not None and not new_frame.empty:
+            part = f"{int(parts[-1]) + 1 if parts else 0:06d}"
+            compact = len(parts) + 1 >= LOADER_CONFIG['state_compact_parts']
+            if compact:
+                new_frame, new_rollups = frame, rollups
+            facts_key, rollups_prefix = self._state_keys(part)
+            buffer = io.BytesIO()
+            new_frame.to_parquet(buffer, index=False)
+            if not storage.put(facts_key, buffer.getvalue()) or not new_rollups.save(storage, rollups_prefix):
+                self.logger.error("Fehler beim Speichern des Analyse-Zustands.")
+                return None
+            new_parts = [part] if compact else new_parts + [part]
+
+        # Die Session-Liste zuletzt schreiben, damit sie nie vorauseilt
+        manifest = json.dumps({'sessions': sessions, 'parts': new_parts}).encode('utf-8')
+        if not storage.put(f"{state_dir}trending.npz", engine.to_bytes()) or \
+                not storage.put(f"{state_dir}sessions.json", manifest):
+            self.logger.error("Fehler beim Speichern des Analyse-Zustands.")
+            return None
+        if compact:
+            self._prune_state(storage, new_parts)
+            self.logger.info(f"Analyse-Zustand aus {len(parts) + 1} Teilen zusammengefasst.")
+        return new_parts
+
+    def _prune_state(self, storage, parts):
+        """Löscht Fakt- und Rollup-Dateien, die zu keinem der angegebenen Teile gehören."""
+        state_dir = DATA_PATHS['analysis_state_dir']
+        keep = set(parts)
+        for prefix in (f"{state_dir}facts/", f"{state_dir}rollups/"):
+            for key in storage.list(prefix=prefix) or []:
+                name = key[len(prefix):].split('/', 1)[0]
+                if name.split('.', 1)[0] not in keep:
+                    storage.delete(key)
+
+    @staticmethod
+    def _append_sorted(frame, new_frame):
+        """Hängt neue Zeilen an und sortiert nur den Bereich ab dem frühesten neuen Zeitpunkt."""
+        new_frame = new_frame.sort_values('DateTime', kind='stable')
+        if frame is None or frame.empty:
+            return new_frame.reset_index(drop=True)
+        pos = frame['DateTime'].searchsorted(new_frame['DateTime'].iloc[0], side='right')
+        tail = WSBDataAnalyzer._concat_facts([frame.iloc[pos:], new_frame]).sort_values('DateTime', kind='stable')
+        return WSBDataAnalyzer._concat_facts([frame.iloc[:pos], tail])
+
+    def update_combined_dataframe(self):
+        """
+        Aktualisiert den kombinierten DataFrame inkrementell über alle Sessions.
+        Der DataFrame und die Liste der übernommenen Sessions werden im Speicher-Backend
+        abgelegt; bei jedem Lauf werden nur neue Sessions geladen und angehängt.
+        """
+        if not HistoryStore.is_available():
+            # Ohne pyarrow kann der Zustand nicht gespeichert werden
+            return self.load_all_results() and self.create_combined_dataframe()
+
+        try:
+            storage = get_storage_backend()
+            results_dir = DATA_PATHS['results_dir']
+            keys = storage.list(prefix=results_dir)
+            if keys is None: return False
+
+            session_keys = {}
+            for key in sorted(k for k in keys if compression.matches(k, 'wsb_mentions.json')):
+                session_keys[key[len(results_dir):].rsplit('/', 1)[0] + '/'] = key
+            if not session_keys:
+                self.logger.warning(f"Keine 'wsb_mentions.json' Dateien im Pfad '{results_dir}' gefunden.")
+                return False
+
+            frame, sessions, parts, rollups, engine = self._state or self._load_state(storage)
+            known = {header['session'] for header in sessions}
+            new_keys = {session_keys[s]: s for s in sorted(session_keys) if s not in known}
+
+            loaded = load_sessions(new_keys, storage)
+            new_results = list(loaded.values())
+            new_headers = [self._session_header(new_keys[key], result) for key, result in loaded.items()]
+
+            if new_results:
+                new_frame = self._build_combined_frame(new_results)
+                new_rollups = SymbolRollups.from_frame(new_frame)
+                if not new_frame.empty:
+                    frame = self._append_sorted(frame, new_frame)
+                    rollups.merge(new_rollups)
+                    # Nachgereichte ältere Sessions erfordern einen Neuaufbau des Trend-Zustands
+                    if not engine.update_frame(new_frame):
+                        engine = TrendingEngine.from_frame(frame)
+                if frame is None:
+                    frame = new_frame
+                sessions = sessions + new_headers
+                parts = self._save_state(storage, (frame, sessions, parts, rollups, engine),
+                                         new_frame, new_rollups)
+
+            self.logger.info(f"{len(new_results)} neue von {len(sessions)} Sessions übernommen.")
+            # Nach einem Fehler beim Speichern wird der Zustand beim nächsten Lauf neu geladen
+            self._state = (frame, sessions, parts, rollups, engine) if parts is not None else None
+            # Nur Kopfdaten: die vollständigen Ergebnisse werden im inkrementellen Modus nicht geladen
+            self.all_results = []
+            self.session_headers = sessions
+            self.combined_df = frame
+            self.sessions_df = self._build_session_table(sessions)
+            self.rollups = rollups
+            self.trending_engine = engine
+            self.session_path_for_saving = max(session_keys)
+            if self.combined_df is None or self.combined_df.empty:
+                self.logger.warning("Combined dataframe is empty")
+                return False
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Fehler beim inkrementellen Aktualisieren: {e}")
+            return False
+
+    def aggregate_in_chunks(self, chunk_size=None, watchlist=None):
+        """
+        Streaming-Modus für große Historien: Die Sessions werden blockweise geladen und nur
+        die Teilaggregate (Rollups, Trend-Zustand, Watchlist-Timelines) zusammengeführt.
+        Es werden weder die vollständigen Ergebnisse noch combined_df im Speicher gehalten;
+        Zusammenfassungsbericht und Rollups entsprechen dem In-Memory-Pfad.
+
+        :param chunk_size: Sessions je Block (Standard: LOADER_CONFIG['chunk_sessions'])
+        :param watchlist: Symbole, deren vollständige Timeline gesammelt wird
+        """
+        chunk_size = chunk_size or LOADER_CONFIG['chunk_sessions']
+        watchlist = [symbol.upper() for symbol in (watchlist or [])]
+        try:
+            storage = get_storage_backend()
+            results_dir = DATA_PATHS['results_dir']
+            keys = storage.list(prefix=results_dir)
+            if keys is None: return False
+            json_keys = sorted(k for k in keys if compression.matches(k, 'wsb_mentions.json'))
+            if not json_keys:
+                self.logger.warning(f"Keine 'wsb_mentions.json' Dateien im Pfad '{results_dir}' gefunden.")
+                return False
+
+            rollups, engine = SymbolRollups(), TrendingEngine()
+            headers, timelines = [], {symbol: [] for symbol in watchlist}
+            for start in range(0, len(json_keys), chunk_size):
+                loaded = load_sessions(json_keys[start:start + chunk_size], storage)
+                chunk = self._build_combined_frame(list(loaded.values()))
+                headers.extend(self._session_header(key[len(results_dir):].rsplit('/', 1)[0] + '/', result)
+                               for key, result in loaded.items())
+                del loaded
+                if chunk.empty:
+                    continue
+                chunk = chunk.sort_values('DateTime', kind='stable')
+                rollups.add(chunk)
+                if not engine.update_frame(chunk):
+                    self.logger.warning("Sessions nicht in zeitlicher Reihenfolge, Trend-Zustand unvollständig.")
+                if watchlist:
+                    chunk = chunk[chunk['Symbol'].isin(watchlist)]
+                    for symbol, rows in chunk.groupby('Symbol', observed=True):
+                        timelines[symbol].append(rows)
+                self.logger.info(f"{min(start + chunk_size, len(json_keys))}/{len(json_keys)} Sessions aggregiert.")
+
+            self.all_results = []
+            self.session_headers = headers
+            self.combined_df = None
+            self.sessions_df = self._build_session_table(headers)
+            self.rollups = rollups
+            self.trending_engine = engine
+            self.watchlist_timelines = {
+                symbol: self._concat_facts(parts) if parts else pd.DataFrame(columns=FACT_COLUMNS)
+                for symbol, parts in timelines.items()
+            }
+            self.session_path_for_saving = json_keys[-1][len(results_dir):].rsplit('/', 1)[0] + '/'
+            return not rollups.empty
+
+        except Exception as e:
+            self.logger.error(f"Fehler bei der blockweisen Aggregation: {e}")
+            return False
+
+    def load_history(self, days=None, start_date=None, end_date=None, symbols=None):
+        """
+        Lädt den kombinierten DataFrame aus dem Parquet-Verlauf statt aus den JSON-Sessions.
+        Es werden nur die Datumspartitionen des angefragten Zeitraums gelesen.
+
+        :param days: Nur die letzten N Tage laden (hat Vorrang vor start_date/end_date)
+        :param symbols: Optionale Liste von Symbolen
+        """
+        history = HistoryStore()
+        if not history.is_available():
+            self.logger.error("Verlauf nicht verfügbar (pyarrow fehlt).")
+            return False
+
+        try:
+            if days is not None:
+                df = history.read_last_days(days, symbols=symbols)
+            else:
+                df = history.read(start_date=start_date, end_date=end_date, symbols=symbols)
+            if df.empty:
+                self.logger.warning("Keine Daten im Verlauf für den angefragten Zeitraum.")
+                return False
+
+            df = df.sort_values('DateTime', kind='stable')
+            self.combined_df = self._compact_dtypes(df[FACT_COLUMNS]).reset_index(drop=True)
+
+            # Session-Kopfdaten für den Zusammenfassungsbericht
+            sessions = df.drop_duplicates('Timestamp')
+            self.all_results = []
+            self.session_headers = [
+                {'session': f"{row.DateTime.strftime('%Y-%m-%d')}/{row.DateTime.strftime('%H%M%S')}/",
+                 'timestamp': row.Timestamp, 'crawl_date': row.DateTime.isoformat(),
+                 'total_mentions': row.TotalMentions, 'total_symbols_found': row.UniqueSymbols}
+                for row in sessions.itertuples()
+            ]
+            self.sessions_df = self._build_session_table(self.session_headers)
+            self.rollups = SymbolRollups.from_frame(self.combined_df)
+            self.trending_engine = None
+            if not self.session_path_for_saving:
+                latest = self.combined_df['DateTime'].iloc[-1]
+                self.session_path_for_saving = f"{latest.strftime('%Y-%m-%d')}/{latest.strftime('%H%M%S')}/"
+            self.logger.info(f"{len(self.combined_df)} Zeilen aus {len(self.session_headers)} Sessions aus dem Verlauf geladen.")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Fehler beim Laden des Verlaufs: {e}")
+            return False
+
+    def backfill_history(self):
+        """Übernimmt alle JSON-Sessions, die noch nicht im Parquet-Verlauf liegen."""
+        history = HistoryStore()
+        if not history.is_available():
+            self.logger.error("Verlauf nicht verfügbar (pyarrow fehlt).")
+            return 0
+        if not self.load_all_results():
+            return 0
+
+        existing = set(history.list_partition_keys())
+        added = 0
+        for result in self.all_results:
+            if history.partition_key(parse_crawl_date(result)) in existing:
+                continue
+            if history.append(result):
+                added += 1
+        self.logger.info(f"{added} Sessions in den Verlauf übernommen.")
+        return added
+
+    def _has_data(self):
+        """True, wenn ein kombinierter DataFrame oder (im Streaming-Modus) Rollups vorliegen."""
+        if self.combined_df is not None and not self.combined_df.empty:
+            return True
+        return self.rollups is not None and not self.rollups.empty
+
+    def _get_rollups(self):
+        """Gibt die Rollups zum aktuellen combined_df zurück und erstellt sie bei Bedarf."""
+        if self.rollups is None:
+            self.rollups = SymbolRollups.from_frame(self.combined_df)
+        return self.rollups
+
     def get_top_symbols_overall(self, limit=20):
         """Gibt die Top-Symbole über alle Crawls hinweg zurück"""
-        if self.combined_df is None or self.combined_df.empty:
+        if not self._has_data():
             return pd.DataFrame()
             
         try:
-            # Gruppiere nach Symbol und summiere Mentions
-            top_symbols = (self.combined_df.groupby('Symbol')['Mentions']
-                          .sum()
-                          .sort_values(ascending=False)
-                          .head(limit))
-            
-            return top_symbols.reset_index()
+            return self._get_rollups().top_symbols(limit)
             
         except Exception as e:
             self.logger.error(f"Error getting top symbols: {e}")
             return pd.DataFrame()
             
+    def _get_trending_engine(self):
+        """Gibt den Trend-Zustand zum aktuellen combined_df zurück und erstellt ihn bei Bedarf."""
+        if self.trending_engine is None:
+            self.trending_engine = TrendingEngine.from_frame(self.combined_df)
+        return self.trending_engine
+
     def get_trending_symbols(self, days=7, limit=10):
-        """Findet trending Symbole der letzten N Tage"""
-        if self.combined_df is None or self.combined_df.empty:
+        """
+        Findet trending Symbole der letzten N Tage.
+        Standardmäßig nach der Summe der Erwähnungen; mit TRENDING_CONFIG['method'] = 'zscore'
+        wie get_trending_zscore.
+        """
+        if TRENDING_CONFIG['method'] == 'zscore':
+            return self.get_trending_zscore(days, limit)
+        if not self._has_data():
             return pd.DataFrame()
             
         try:
-            # Filtere nach den letzten N Tagen
             cutoff_date = datetime.now().date() - timedelta(days=days)
-            recent_df = self.combined_df[self.combined_df['Date'] >= cutoff_date]
+            # Tagesaggregate ab dem Stichtag summieren
+            trending = self._get_rollups().top_symbols(limit, start_date=cutoff_date)
             
-            if recent_df.empty:
+            if trending.empty:
                 return pd.DataFrame()
-                
-            # Berechne Trend (Mentions der letzten Tage)
-            trending = (recent_df.groupby('Symbol')['Mentions']
-                       .sum()
-                       .sort_values(ascending=False)
-                       .head(limit))
-            
-            return trending.reset_index()
+            return trending
             
         except Exception as e:
             self.logger.error(f"Error getting trending symbols: {e}")
             return pd.DataFrame()
+
+    def get_trending_zscore(self, days=7, limit=10):
+        """
+        Symbole der letzten Session, sortiert nach z-Score gegenüber ihrer EWMA-Baseline.
+        Mentions sind die Erwähnungen in der letzten Session (mindestens TRENDING_CONFIG['min_mentions']).
+        """
+        if not self._has_data():
+            return pd.DataFrame()
+
+        try:
+            cutoff_date = datetime.now().date() - timedelta(days=days)
+            trending = self._get_trending_engine().ranking(limit, since=cutoff_date)
+            if trending.empty:
+                return pd.DataFrame()
+            return trending
+
+        except Exception as e:
+            self.logger.error(f"Error getting z-score trending symbols: {e}")
+            return pd.DataFrame()
+
+    def get_daily_mentions(self):
+        """Gibt die Erwähnungen je Tag über alle Symbole zurück (Spalten Date, Mentions)."""
+        if not self._has_data():
+            return pd.DataFrame()
+        return self._get_rollups().daily_totals()
+
+    def get_mention_distribution(self, limit=20):
+        """Gibt die Häufigkeit der Erwähnungsanzahlen je Session und Symbol zurück."""
+        if not self._has_data():
+            return pd.Series(dtype='int64')
+        return self._get_rollups().mention_distribution(limit)
             
+    def resample(self, symbols=None, freq='D', window=None):
+        """
+        Gibt die Erwähnungen als Matrix Symbol x Zeit-Bucket zurück (aus den Stunden-Rollups,
+        auch im Streaming-Modus verfügbar).
+
+        :param symbols: Liste von Symbolen oder None für alle
+        :param freq: pandas-Frequenz ab einer Stunde, z.B. 'h', '4h', 'D', 'W'
+        :param window: Zeitraum bis zur letzten Session, z.B. '7D' oder pd.Timedelta; None für alles
+        :return: DataFrame mit Symbolen als Zeilen und Bucket-Beginn (UTC) als Spalten
+        """
+        if not self._has_data():
+            return pd.DataFrame()
+        try:
+            if pd.to_timedelta(pd.tseries.frequencies.to_offset(freq)) < pd.Timedelta(hours=1):
+                self.logger.warning(f"Frequenz {freq} ist feiner als die Stunden-Rollups, verwende 'h'.")
+                freq = 'h'
+        except ValueError:
+            # Kalenderfrequenzen (z.B. 'W', 'MS') haben keine feste Dauer und sind immer gröber
+            pass
+
+        rollups = self._get_rollups()
+        start = None
+        if window is not None:
+            last_hour = rollups.symbol_hour.index.get_level_values('Hour').max()
+            start = last_hour - pd.Timedelta(window) + pd.Timedelta(hours=1)
+        if symbols is not None:
+            symbols = [symbol.upper() for symbol in symbols]
+        try:
+            return rollups.resample(symbols, freq, start=start)
+        except ValueError as e:
+            self.logger.error(f"Fehler beim Resampling mit Frequenz {freq}: {e}")
+            return pd.DataFrame()
+            
+    def _get_symbol_index(self):
+        """
+        Gibt den Symbol-Index zum aktuellen combined_df zurück: die Zeilen nach (Symbol, DateTime)
+        sortiert und je Symbol der Start-Offset, sodass eine Timeline ein einfacher Slice ist.
+        Der Index wird neu aufgebaut, sobald combined_df ersetzt wurde.
+        """
+        if self._symbol_index is None or self._symbol_index[0] is not self.combined_df:
+            symbols = self.combined_df['Symbol'].astype('category')
+            codes = symbols.cat.codes.to_numpy()
+            order = np.lexsort((self.combined_df['DateTime'].to_numpy(), codes))
+            offsets = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(symbols.cat.categories)))])
+            positions = {symbol: i for i, symbol in enumerate(symbols.cat.categories)}
+            self._symbol_index = (self.combined_df, self.combined_df.take(order), offsets, positions)
+        return self._symbol_index[1:]
+
     def get_symbol_timeline(self, symbol):
         """Gibt die Timeline für ein bestimmtes Symbol zurück"""
         if self.combined_df is None or self.combined_df.empty:
-            return pd.DataFrame()
+            # Im Streaming-Modus stehen nur die Timelines der Watchlist zur Verfügung
+            return self.watchlist_timelines.get(symbol.upper(), pd.DataFrame())
             
         try:
-            symbol_data = self.combined_df[self.combined_df['Symbol'] == symbol.upper()]
-            return symbol_data.sort_values('DateTime')
+            sorted_df, offsets, positions = self._get_symbol_index()
+            position = positions.get(symbol.upper())
+            if position is None:
+                return sorted_df.iloc[0:0]
+            return sorted_df.iloc[offsets[position]:offsets[position + 1]]
             
         except Exception as e:
             self.logger.error(f"Error getting timeline for {symbol}: {e}")
             return pd.DataFrame()
+
+    def get_symbol_timelines(self, symbols):
+        """
+        Gibt die Timelines mehrerer Symbole auf einmal zurück.
+
+        :param symbols: Liste von Symbolen
+        :return: Dict Symbol -> DataFrame (leer, wenn das Symbol nicht vorkommt)
+        """
+        return {symbol.upper(): self.get_symbol_timeline(symbol) for symbol in symbols}
             
+    def get_co_mention_graph(self, refresh=False):
+        """
+        Gibt den über alle Sessions aggregierten Co-Mention-Graphen zurück. Beim ersten
+        Zugriff (oder mit refresh=True) werden nur die noch nicht enthaltenen Sessions
+        eingerechnet; der Stand wird im Analyse-Zustand gespeichert.
+        """
+        if self.co_mention_graph is not None and not refresh:
+            return self.co_mention_graph
+
+        storage = get_storage_backend()
+        state_key = f"{DATA_PATHS['analysis_state_dir']}co_mentions.npz"
+        graph, sessions = self.co_mention_graph, self._co_mention_sessions
+        if graph is None:
+            graph, sessions = CoMentionGraph(), set()
+            state = storage.get(state_key)
+            if state is not None:
+                try:
+                    graph = CoMentionGraph.from_bytes(state)
+                    with np.load(io.BytesIO(state)) as arrays:
+                        sessions = set(arrays['sessions'].tolist())
+                except (ValueError, KeyError, OSError) as e:
+                    self.logger.warning(f"Co-Mention-Zustand nicht lesbar, baue neu auf: {e}")
+                    graph, sessions = CoMentionGraph(), set()
+
+        keys = storage.list(prefix=DATA_PATHS['results_dir']) or []
+        new_keys = sorted(k for k in keys if k.endswith('/co_mentions.npz') and k not in sessions)
+        if new_keys:
+            for key, content in storage.get_many(new_keys).items():
+                if content is None:
+                    self.logger.error(f"Co-Mentions {key} konnten nicht gelesen werden.")
+                    continue
+                graph.merge(CoMentionGraph.from_bytes(content))
+                sessions.add(key)
+            if not storage.put(state_key, graph.to_bytes(sessions=np.array(sorted(sessions), dtype=str))):
+                self.logger.error(f"Fehler beim Speichern des Co-Mention-Zustands unter {state_key}.")
+            self.logger.info(f"{len(new_keys)} Sessions in den Co-Mention-Graphen übernommen.")
+
+        self.co_mention_graph, self._co_mention_sessions = graph, sessions
+        return graph
+
+    def get_top_co_mentions(self, limit=20):
+        """Gibt die am häufigsten gemeinsam erwähnten Symbolpaare zurück."""
+        return self.get_co_mention_graph().top_pairs(limit)
+
+    def get_co_mention_neighbours(self, symbol, limit=10):
+        """Gibt die Symbole zurück, die am häufigsten zusammen mit dem Symbol erwähnt wurden."""
+        return self.get_co_mention_graph().neighbours(symbol, limit)
+
+    def get_query_engine(self, refresh=False):
+        """
+        Gibt die SQL-Abfrageschicht zurück. Beim ersten Zugriff (oder mit refresh=True)
+        werden neue Sessions aus dem Speicher-Backend übernommen.
+        """
+        if self.query_engine is None:
+            self.query_engine = SessionQueryEngine()
+            refresh = True
+        if refresh:
+            self.query_engine.ingest()
+        return self.query_engine
+
+    @staticmethod
+    def _query_range(days, start_date, end_date):
+        if days is not None:
+            return datetime.now().date() - timedelta(days=days), None
+        return start_date, end_date
+
+    def query_top_symbols(self, limit=10, days=None, start_date=None, end_date=None):
+        """Top-Symbole in einem Zeitfenster, berechnet in der Datenbank."""
+        start_date, end_date = self._query_range(days, start_date, end_date)
+        return self.get_query_engine().top_symbols(start_date, end_date, limit)
+
+    def query_symbol_history(self, symbol, days=None, start_date=None, end_date=None):
+        """Erwähnungen eines Symbols je Session, ohne die Historie in pandas zu laden."""
+        start_date, end_date = self._query_range(days, start_date, end_date)
+        return self.get_query_engine().symbol_history(symbol, start_date, end_date)
+
+    def query_sector_totals(self, days=None, start_date=None, end_date=None):
+        """Erwähnungen je Sektor (aus stock_symbols.csv) in einem Zeitfenster."""
+        start_date, end_date = self._query_range(days, start_date, end_date)
+        return self.get_query_engine().sector_totals(start_date, end_date)
+
+    def query(self, sql, params=()):
+        """Ad-hoc-SQL über die Tabellen sessions, mentions und symbols."""
+        return self.get_query_engine().query(sql, params)
+
     def create_summary_report(self):
         """Erstellt einen Zusammenfassungsbericht"""
-        if not self.all_results:
+        if not self.session_headers:
             return None
             
         try:
             # Grundlegende Statistiken
-            total_crawls = len(self.all_results)
+            total_crawls = len(self.session_headers)
             
-            if self.combined_df is not None and not self.combined_df.empty:
-                unique_symbols = self.combined_df['Symbol'].nunique()
-                total_mentions = self.combined_df['Mentions'].sum()
-                date_range = f"{self.combined_df['Date'].min()} bis {self.combined_df['Date'].max()}"
+            if self._has_data():
+                # Kennzahlen aus den Rollups, damit auch der Streaming-Modus ohne combined_df identisch ist
+                rollups = self._get_rollups()
+                unique_symbols = len(rollups.symbol_totals)
+                total_mentions = rollups.symbol_totals.sum()
+                date_range = f"{rollups.day_totals.index.min().date()} bis {rollups.day_totals.index.max().date()}"
                 
                 # Top 10 Symbole
                 top_symbols = self.get_top_symbols_overall(10)
@@ -269,28 +834,26 @@ class WSBDataAnalyzer:
             analysis_base_dir = DATA_PATHS['analysis_dir']
             session_save_path = self.session_path_for_saving
 
+            storage = get_storage_backend()
+
             # Helferfunktion zum Speichern
-            def _save(content, filename, is_bytes=False):
-                if STORAGE_CONFIG['type'] == 's3':
-                    buffer = io.BytesIO(content if is_bytes else content.encode('utf-8'))
-                    s3_key = f"{analysis_base_dir}{session_save_path}{filename}"
-                    if s3_handler.upload_file_obj(buffer, s3_key):
-                        self.logger.info(f"Analyse-Datei auf S3 unter {s3_key} gespeichert.")
-                    else:
-                        self.logger.error(f"Fehler beim Speichern von {s3_key} auf S3.")
+            def _save(content, filename, is_bytes=False, compress=False):
+                data = content if is_bytes else content.encode('utf-8')
+                if compress:
+                    encoding = compression.get_encoding()
+                    data = compression.compress(data, encoding)
+                    filename = compression.artifact_name(filename, encoding)
+                key = f"{analysis_base_dir}{session_save_path}{filename}"
+                if storage.put(key, data):
+                    self.logger.info(f"Analyse-Datei unter {key} gespeichert.")
                 else:
-                    local_path = os.path.join(analysis_base_dir, session_save_path.replace('/', os.sep), filename)
-                    os.makedirs(os.path.dirname(local_path), exist_ok=True)
-                    mode = 'wb' if is_bytes else 'w'
-                    encoding = None if is_bytes else 'utf-8'
-                    with open(local_path, mode, encoding=encoding) as f:
-                        f.write(content)
-                    self.logger.info(f"Analyse-Datei lokal unter {local_path} gespeichert.")
-
-            # Speichere kombinierten DataFrame
+                    self.logger.error(f"Fehler beim Speichern von {key}.")
+
+            # Speichere kombinierten DataFrame (entfällt im Streaming-Modus)
             if self.combined_df is not None and not self.combined_df.empty:
-                _save(self.combined_df.to_csv(index=False), "combined_analysis.csv")
-                
+                _save(self.get_export_dataframe().to_csv(index=False), "combined_analysis.csv", compress=True)
+
+            if self._has_data():
                 top_symbols = self.get_top_symbols_overall(50)
                 if not top_symbols.empty:
                     _save(top_symbols.to_csv(index=False), "top_symbols.csv")
@@ -298,6 +861,14 @@ class WSBDataAnalyzer:
                 trending = self.get_trending_symbols(7, 20)
                 if not trending.empty:
                     _save(trending.to_csv(index=False), "trending_symbols.csv")
+
+                trending_zscore = self.get_trending_zscore(7, 20)
+                if not trending_zscore.empty:
+                    _save(trending_zscore.to_csv(index=False), "trending_zscore.csv")
+                    
+                co_mentions = self.get_top_co_mentions(50)
+                if not co_mentions.empty:
+                    _save(co_mentions.to_csv(index=False), "top_co_mentions.csv")
                     
             summary = self.create_summary_report()
             if summary:
@@ -311,25 +882,22 @@ class WSBDataAnalyzer:
             return False
 
     def _upload_log_file(self):
-        """Lädt die Log-Datei für die Analyse-Session nach S3 hoch."""
-        if STORAGE_CONFIG['type'] != 's3':
-            return
+        """Archiviert die Log-Datei der Analyse-Session im Speicher-Backend."""
         if not self.log_file_path or not os.path.exists(self.log_file_path):
             self.logger.error("Analyse-Log-Datei nicht gefunden zum Hochladen.")
             return
         if not self.session_path_for_saving:
-            self.logger.error("Kein S3-Session-Pfad zum Hochladen der Log-Datei vorhanden.")
+            self.logger.error("Kein Session-Pfad zum Hochladen der Log-Datei vorhanden.")
             return
 
         try:
             # Fährt alle Logger herunter und schließt die Dateien sicher
             logging.shutdown()
 
-            with open(self.log_file_path, 'rb') as log_file_obj:
-                log_s3_key = f"{DATA_PATHS['analysis_dir']}{self.session_path_for_saving}analyzer.log"
-                # Da der Logger heruntergefahren ist, verwenden wir print
-                print(f"Lade Analyse-Log-Datei nach {log_s3_key} hoch...")
-                s3_handler.upload_file_obj(log_file_obj, log_s3_key)
+            log_key = f"{DATA_PATHS['analysis_dir']}{self.session_path_for_saving}analyzer.log"
+            # Da der Logger heruntergefahren ist, verwenden wir print
+            print(f"Lade Analyse-Log-Datei nach {log_key} hoch...")
+            get_storage_backend().put_file(log_key, self.log_file_path)
             
             os.remove(self.log_file_path)
             print(f"Lokale Analyse-Log-Datei {self.log_file_path} gelöscht.")
@@ -340,98 +908,208 @@ class WSBDataAnalyzer:
             # Re-initialisiere das Logging für den Fall, dass das Objekt weiterverwendet wird
             self.setup_logging(session_path=self.session_path_for_saving)
             
+    def build_plot_spec(self):
+        """
+        Erstellt die Plot-Spezifikation der Analyse-Diagramme aus den Rollups.
+        Die Spezifikation enthält nur aggregierte Daten und ist JSON-serialisierbar.
+        """
+        panels = []
+        top_symbols = self.get_top_symbols_overall(15)
+        if not top_symbols.empty:
+            panels.append({'position': (0, 0), 'kind': 'barh', 'title': 'Top 15 Most Mentioned Stocks',
+                           'xlabel': 'Total Mentions', 'labels': top_symbols['Symbol'].tolist(),
+                           'values': top_symbols['Mentions'].tolist()})
+
+        daily_mentions = self.get_daily_mentions()
+        if not daily_mentions.empty:
+            panels.append({'position': (0, 1), 'kind': 'line', 'title': 'Daily Mention Trends', 'rotate_x': 45,
+                           'labels': daily_mentions['Date'].dt.strftime('%Y-%m-%d').tolist(),
+                           'values': daily_mentions['Mentions'].tolist()})
+
+        top_10_symbols = self.get_top_symbols_overall(10)['Symbol'].tolist()
+        if top_10_symbols:
+            heatmap_data = self._get_rollups().daily_means(top_10_symbols)
+            if not heatmap_data.empty:
+                panels.append({'position': (1, 0), 'kind': 'heatmap', 'title': 'Top 10 Stocks Mention Heatmap',
+                               'cbar_label': 'Mentions', 'rows': heatmap_data.index.tolist(),
+                               'columns': [str(d.date()) for d in heatmap_data.columns],
+                               'values': heatmap_data.round(6).values.tolist()})
+
+        mention_dist = self.get_mention_distribution(20)
+        if not mention_dist.empty:
+            panels.append({'position': (1, 1), 'kind': 'bar', 'title': 'Distribution of Mention Counts',
+                           'values': mention_dist.tolist()})
+
+        return {'title': 'WSB Stock Mentions Analysis', 'figsize': (15, 12), 'grid': (2, 2),
+                'palette': 'husl', 'panels': panels}
+
+    def render_preview(self, spec=None):
+        """Rendert (bzw. lädt aus dem Render-Cache) die schnelle Vorschau der Diagramme als PNG."""
+        spec = spec or self.build_plot_spec()
+        return render_cached(spec, PLOT_CONFIG['preview_dpi'], get_storage_backend())
+
+    def export_plots(self, spec=None, background=None):
+        """
+        Speichert die Diagramme in voller Auflösung im Session-Ordner. Pro Datenversion wird
+        nur einmal gerendert; mit background=True läuft der Export in einem Hintergrund-Thread.
+        """
+        if not self.session_path_for_saving:
+            self.logger.error("Kein Session-Pfad zum Speichern der Visualisierung vorhanden.")
+            return False
+        spec = spec or self.build_plot_spec()
+        background = PLOT_CONFIG['background_export'] if background is None else background
+        plot_key = f"{DATA_PATHS['analysis_dir']}{self.session_path_for_saving}wsb_analysis_plots.png"
+
+        def _export():
+            try:
+                storage = get_storage_backend()
+                if storage.put(plot_key, render_cached(spec, PLOT_CONFIG['dpi'], storage)):
+                    self.logger.info(f"Plot unter {plot_key} gespeichert.")
+                else:
+                    self.logger.error("Fehler beim Speichern des Plots.")
+            except Exception as e:
+                self.logger.error(f"Fehler beim Export der Diagramme: {e}")
+
+        if not background:
+            _export()
+            return True
+        # Speicherzugriffe des Exports zählen in die Metriken der Analyse
+        thread = threading.Thread(target=bind_metrics(_export), name='plot-export')
+        thread.start()
+        self._export_threads.append(thread)
+        return True
+
+    def wait_for_exports(self, timeout=None):
+        """Wartet auf laufende Hintergrund-Exporte."""
+        for thread in self._export_threads:
+            thread.join(timeout)
+        self._export_threads = [t for t in self._export_threads if t.is_alive()]
+        return not self._export_threads
+
     def create_visualizations(self, save_plots=True):
-        """Erstellt Visualisierungen der Daten und speichert sie im Session-Ordner."""
-        if self.combined_df is None or self.combined_df.empty:
+        """
+        Erstellt Visualisierungen der Daten und speichert sie im Session-Ordner.
+        Gerendert wird im Render-Worker (plot_rendering). Im Session-Ordner wird sofort eine
+        Vorschau abgelegt, der Export in voller Auflösung folgt (je nach PLOT_CONFIG) im Hintergrund.
+
+        :return: PNG-Bytes der Vorschau oder False
+        """
+        if not self._has_data():
             self.logger.warning("No data available for visualization")
             return False
             
         try:
-            plt.style.use('default')
-            sns.set_palette("husl")
-            fig, axes = plt.subplots(2, 2, figsize=(15, 12))
-            fig.suptitle('WSB Stock Mentions Analysis', fontsize=16, fontweight='bold')
-            
-            top_symbols = self.get_top_symbols_overall(15)
-            if not top_symbols.empty:
-                axes[0, 0].barh(top_symbols['Symbol'], top_symbols['Mentions'])
-                axes[0, 0].set_title('Top 15 Most Mentioned Stocks')
-                axes[0, 0].set_xlabel('Total Mentions')
-                
-            daily_mentions = self.combined_df.groupby('Date')['Mentions'].sum().reset_index()
-            if not daily_mentions.empty:
-                axes[0, 1].plot(daily_mentions['Date'], daily_mentions['Mentions'], marker='o')
-                axes[0, 1].set_title('Daily Mention Trends')
-                axes[0, 1].tick_params(axis='x', rotation=45)
-                
-            top_10_symbols = self.get_top_symbols_overall(10)['Symbol'].tolist()
-            if top_10_symbols:
-                heatmap_data = self.combined_df[self.combined_df['Symbol'].isin(top_10_symbols)].pivot_table(index='Symbol', columns='Date', values='Mentions', fill_value=0)
-                if not heatmap_data.empty:
-                    sns.heatmap(heatmap_data, ax=axes[1, 0], cmap='YlOrRd', cbar_kws={'label': 'Mentions'})
-                    axes[1, 0].set_title('Top 10 Stocks Mention Heatmap')
-            
-            mention_dist = self.combined_df['Mentions'].value_counts().head(20)
-            if not mention_dist.empty:
-                axes[1, 1].bar(range(len(mention_dist)), mention_dist.values)
-                axes[1, 1].set_title('Distribution of Mention Counts')
-                
-            plt.tight_layout()
-            
+            spec = self.build_plot_spec()
             if save_plots:
                 if not self.session_path_for_saving:
                     self.logger.error("Kein Session-Pfad zum Speichern der Visualisierung vorhanden.")
                     return False
-                
-                plot_filename = "wsb_analysis_plots.png"
-                analysis_base_dir = DATA_PATHS['analysis_dir']
-                session_save_path = self.session_path_for_saving
-
-                if STORAGE_CONFIG['type'] == 's3':
-                    img_data = io.BytesIO()
-                    plt.savefig(img_data, format='png', dpi=300, bbox_inches='tight')
-                    img_data.seek(0)
-                    s3_key = f"{analysis_base_dir}{session_save_path}{plot_filename}"
-                    if s3_handler.upload_file_obj(img_data, s3_key):
-                        self.logger.info(f"Plot auf S3 unter {s3_key} gespeichert.")
-                    else:
-                        self.logger.error(f"Fehler beim Speichern des Plots auf S3.")
-                else:
-                    local_plot_path = os.path.join(analysis_base_dir, session_save_path.replace('/', os.sep), plot_filename)
-                    os.makedirs(os.path.dirname(local_plot_path), exist_ok=True)
-                    plt.savefig(local_plot_path, dpi=300, bbox_inches='tight')
-                    self.logger.info(f"Plot lokal unter {local_plot_path} gespeichert.")
+                # Export zuerst starten, damit beide Auflösungen parallel im Render-Worker entstehen
+                self.export_plots(spec)
             
-            return fig
+            preview = self.render_preview(spec)
+            if save_plots:
+                preview_key = f"{DATA_PATHS['analysis_dir']}{self.session_path_for_saving}wsb_analysis_plots_preview.png"
+                get_storage_backend().put(preview_key, preview)
+            
+            return preview
             
         except Exception as e:
             self.logger.error(f"Error creating visualizations: {e}")
             return False
             
-    def run_full_analysis(self, session_path=None):
-        """Führt eine vollständige Analyse für eine bestimmte Session durch."""
+    def run_full_analysis(self, session_path=None, streaming=False, days=None):
+        """
+        Führt eine vollständige Analyse für eine bestimmte Session durch.
+        Mit streaming=True werden alle Sessions blockweise aggregiert (ohne combined_analysis.csv).
+        Mit days (Standard: LOADER_CONFIG['history_days']) werden nur die Datumspartitionen der
+        letzten N Tage aus dem Parquet-Verlauf gelesen.
+        Die Laufzeiten der Phasen werden als metrics.json im Analyse-Ordner der Session gespeichert,
+        mit PROFILE_MEMORY=true zusätzlich der Speicherverbrauch als memory_profile.json.
+        """
         self.setup_logging(session_path=session_path)
         self.logger.info(f"Starting full analysis for session: {session_path or 'latest'}")
+        metrics = self.metrics = activate_metrics(
+            SessionMetrics('analysis', profile_memory=MEMORY_PROFILE_CONFIG['enabled']))
+        with metrics:
+            analysis_started = time.perf_counter()
+            if days is None and session_path is None and not streaming:
+                days = LOADER_CONFIG['history_days']
+            if days is not None and not HistoryStore.is_available():
+                self.logger.warning("Parquet-Verlauf nicht verfügbar (pyarrow fehlt), es werden alle Sessions geladen.")
+                days = None
         
-        if not self.load_all_results(session_path=session_path):
-            self.logger.error("Failed to load results for analysis")
-            return False
-            
-        if not self.create_combined_dataframe():
-            self.logger.error("Failed to create combined dataframe")
-            return False
+            if days is not None:
+                with metrics.phase('analysis.load'):
+                    loaded = self.load_history(days=days)
+                if not loaded:
+                    self.logger.error(f"Failed to load history for the last {days} days")
+                    return False
+            elif streaming:
+                with metrics.phase('analysis.load'):
+                    loaded = self.aggregate_in_chunks()
+                if not loaded:
+                    self.logger.error("Failed to aggregate results in chunks")
+                    return False
+            elif session_path is None:
+                # Über alle Sessions: nur neue Sessions laden und anhängen
+                with metrics.phase('analysis.load'):
+                    loaded = self.update_combined_dataframe()
+                if not loaded:
+                    self.logger.error("Failed to update combined dataframe")
+                    return False
+            else:
+                with metrics.phase('analysis.load'):
+                    loaded = self.load_all_results(session_path=session_path)
+                if not loaded:
+                    self.logger.error("Failed to load results for analysis")
+                    return False
+                
+                with metrics.phase('analysis.combine'):
+                    combined = self.create_combined_dataframe()
+                if not combined:
+                    self.logger.error("Failed to create combined dataframe")
+                    return False
+            metrics.snapshot_memory('analysis.combine')
+                
+            if self.sessions_df is not None:
+                metrics.count('sessions', len(self.sessions_df))
+            if self.combined_df is not None:
+                metrics.count('rows', len(self.combined_df))
             
-        if not self.save_analysis_results():
-            self.logger.error("Failed to save analysis results")
-            return False
+            with metrics.phase('analysis.save'):
+                saved = self.save_analysis_results()
+            if not saved:
+                self.logger.error("Failed to save analysis results")
+                return False
+            metrics.snapshot_memory('analysis.save')
             
-        self.create_visualizations()
+            with metrics.phase('analysis.visualize'):
+                # Nur der Export in voller Auflösung; die Vorschau brauchen nur interaktive Aufrufer
+                if self._has_data():
+                    self.export_plots()
+            metrics.snapshot_memory('analysis.visualize')
+            metrics.add_time('analysis.total', time.perf_counter() - analysis_started)
         
-        # Lade die Log-Datei hoch, nachdem alles andere fertig ist
-        self._upload_log_file()
+            metrics_key = f"{DATA_PATHS['analysis_dir']}{self.session_path_for_saving}metrics.json"
+            if not get_storage_backend().put(metrics_key, metrics.to_json().encode('utf-8')):
+                self.logger.error(f"Fehler beim Speichern der Metriken unter {metrics_key}.")
+            if metrics.memory:
+                # Speicher-Profil der Session (nur mit PROFILE_MEMORY=true)
+                metrics.memory.stop()
+                memory_key = f"{DATA_PATHS['analysis_dir']}{self.session_path_for_saving}memory_profile.json"
+                if not get_storage_backend().put(memory_key, metrics.memory.to_json().encode('utf-8')):
+                    self.logger.error(f"Fehler beim Speichern des Speicher-Profils unter {memory_key}.")
+            metrics.mark_success()
+
+            # Der Export im Hintergrund muss vor dem Log-Upload abgeschlossen sein, damit dessen
+            # Meldungen in der hochgeladenen Log-Datei stehen
+            self.wait_for_exports()
+            with metrics.phase('analysis.log_upload'):
+                self._upload_log_file()
         
-        self.logger.info("Full analysis completed successfully")
-        return True
+            self.logger.info("Full analysis completed successfully")
+            return True
 
 if __name__ == "__main__":
     # Test des Analyzers
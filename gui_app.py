@@ -10,14 +10,16 @@ import queue
 import json
 import os
 from datetime import datetime
+import base64
 import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import seaborn as sns
 
 from reddit_crawler import WSBStockCrawler
 from data_analyzer import WSBDataAnalyzer
-from config import GUI_CONFIG, REDDIT_CONFIG, CRAWLER_CONFIG, DATA_PATHS
+from config import GUI_CONFIG, REDDIT_CONFIG, CRAWLER_CONFIG, DATA_PATHS, PLOT_CONFIG
+from plot_rendering import get_plot_worker
+from topk import top_items
+import compression
+from storage import get_storage_backend
 
 class WSBCrawlerGUI:
     def __init__(self, root):
@@ -205,12 +207,12 @@ class WSBCrawlerGUI:
         viz_frame = ttk.Frame(self.notebook)
         self.notebook.add(viz_frame, text="Visualisierungen")
         
-        # Matplotlib-Canvas
-        self.fig, self.axes = plt.subplots(2, 2, figsize=(12, 8))
-        self.fig.suptitle('WSB Stock Analysis')
-        
-        self.canvas = FigureCanvasTkAgg(self.fig, viz_frame)
-        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        # Die Diagramme werden im Render-Worker als PNG erzeugt und hier nur angezeigt
+        self.plot_spec = None
+        self.plot_image = None
+        self.is_rendering = False
+        self.plot_label = ttk.Label(viz_frame, anchor=tk.CENTER)
+        self.plot_label.pack(fill=tk.BOTH, expand=True)
         
         # Buttons für Visualisierungen
         viz_button_frame = ttk.Frame(viz_frame)
@@ -418,6 +420,19 @@ class WSBCrawlerGUI:
                     self.analyze_button.config(state=tk.NORMAL)
                     self.update_visualizations()
                     
+                elif msg_type == 'plot':
+                    spec, png = args
+                    self.is_rendering = False
+                    self.show_plot(spec, png)
+                    self.log_message("Visualisierungen aktualisiert")
+                    
+                elif msg_type == 'plot_error':
+                    self.is_rendering = False
+                    self.log_message(args[0])
+                    
+                elif msg_type == 'plot_saved':
+                    messagebox.showinfo("Erfolg", f"Visualisierungen gespeichert: {args[0]}")
+                    
                 elif msg_type == 'error':
                     error_message = args[0]
                     self.log_message(f"✗ {error_message}")
@@ -466,20 +481,20 @@ Zeitraum: {summary.get('date_range', 'N/A')}"""
             
         try:
             # Lade neueste Ergebnisse
-            import glob
-            json_files = glob.glob(f"{DATA_PATHS['results_dir']}/*.json")
+            storage = get_storage_backend()
+            json_keys = [k for k in storage.list(prefix=DATA_PATHS['results_dir']) or []
+                         if compression.matches(k, 'wsb_mentions.json')]
             
-            if not json_files:
+            if not json_keys:
                 return
                 
             # Sortiere nach Datum (neueste zuerst)
-            json_files.sort(reverse=True)
+            json_keys.sort(reverse=True)
             
             # Lade die neuesten 5 Dateien
-            for json_file in json_files[:5]:
+            for json_file, content in storage.get_many(json_keys[:5]).items():
                 try:
-                    with open(json_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
+                    data = json.loads(compression.decompress(content))
                         
                     crawl_date = data.get('crawl_date', '')
                     timestamp = data.get('timestamp', '')
@@ -499,9 +514,8 @@ Zeitraum: {summary.get('date_range', 'N/A')}"""
                         
                     # Füge Top-Ergebnisse hinzu
                     results = data.get('results', {})
-                    sorted_results = sorted(results.items(), key=lambda x: x[1], reverse=True)
                     
-                    for symbol, mentions in sorted_results[:20]:  # Top 20
+                    for symbol, mentions in top_items(results, 20):  # Top 20
                         self.results_tree.insert('', tk.END, values=(symbol, mentions, date_str, time_str))
                         
                 except Exception as e:
@@ -534,76 +548,83 @@ Zeitraum: {summary.get('date_range', 'N/A')}"""
             except Exception as e:
                 messagebox.showerror("Fehler", f"Fehler beim Exportieren: {e}")
                 
-    def update_visualizations(self):
-        """Aktualisiert die Visualisierungen"""
-        try:
-            # Lade Analyzer-Daten
-            if not self.analyzer.load_all_results():
-                self.log_message("Keine Daten für Visualisierung verfügbar")
-                return
-                
-            if not self.analyzer.create_combined_dataframe():
-                self.log_message("Fehler beim Erstellen des DataFrames")
-                return
-                
-            # Leere aktuelle Plots
-            for ax in self.axes.flat:
-                ax.clear()
-                
-            # Erstelle neue Plots
-            df = self.analyzer.combined_df
+    def build_plot_spec(self):
+        """Erstellt die Plot-Spezifikation der GUI-Diagramme aus den Analyse-Daten."""
+        panels = []
+        top_symbols = self.analyzer.get_top_symbols_overall(10)
+        if not top_symbols.empty:
+            panels.append({'position': (0, 0), 'kind': 'barh', 'title': 'Top 10 Symbole', 'xlabel': 'Erwähnungen',
+                           'labels': top_symbols['Symbol'].tolist(), 'values': top_symbols['Mentions'].tolist()})
             
-            if df is not None and not df.empty:
-                # Top 10 Symbole
-                top_symbols = self.analyzer.get_top_symbols_overall(10)
-                if not top_symbols.empty:
-                    self.axes[0, 0].barh(top_symbols['Symbol'], top_symbols['Mentions'])
-                    self.axes[0, 0].set_title('Top 10 Symbole')
-                    self.axes[0, 0].set_xlabel('Erwähnungen')
-                    
-                # Timeline
-                daily_mentions = df.groupby('Date')['Mentions'].sum().reset_index()
-                if not daily_mentions.empty:
-                    self.axes[0, 1].plot(daily_mentions['Date'], daily_mentions['Mentions'], marker='o')
-                    self.axes[0, 1].set_title('Tägliche Erwähnungen')
-                    self.axes[0, 1].tick_params(axis='x', rotation=45)
-                    
-                # Verteilung
-                mention_counts = df['Mentions'].value_counts().head(15)
-                if not mention_counts.empty:
-                    self.axes[1, 0].bar(range(len(mention_counts)), mention_counts.values)
-                    self.axes[1, 0].set_title('Verteilung der Erwähnungen')
-                    self.axes[1, 0].set_xlabel('Erwähnungsanzahl')
-                    self.axes[1, 0].set_ylabel('Häufigkeit')
-                    
-                # Trending (letzte 7 Tage)
-                trending = self.analyzer.get_trending_symbols(7, 10)
-                if not trending.empty:
-                    self.axes[1, 1].barh(trending['Symbol'], trending['Mentions'])
-                    self.axes[1, 1].set_title('Trending (7 Tage)')
-                    self.axes[1, 1].set_xlabel('Erwähnungen')
-                    
-            self.fig.tight_layout()
-            self.canvas.draw()
+        daily_mentions = self.analyzer.get_daily_mentions()
+        if not daily_mentions.empty:
+            panels.append({'position': (0, 1), 'kind': 'line', 'title': 'Tägliche Erwähnungen', 'rotate_x': 45,
+                           'labels': daily_mentions['Date'].dt.strftime('%Y-%m-%d').tolist(),
+                           'values': daily_mentions['Mentions'].tolist()})
+            
+        mention_counts = self.analyzer.get_mention_distribution(15)
+        if not mention_counts.empty:
+            panels.append({'position': (1, 0), 'kind': 'bar', 'title': 'Verteilung der Erwähnungen',
+                           'xlabel': 'Erwähnungsanzahl', 'ylabel': 'Häufigkeit', 'values': mention_counts.tolist()})
             
-            self.log_message("Visualisierungen aktualisiert")
+        trending = self.analyzer.get_trending_symbols(7, 10)
+        if not trending.empty:
+            panels.append({'position': (1, 1), 'kind': 'barh', 'title': 'Trending (7 Tage)', 'xlabel': 'Erwähnungen',
+                           'labels': trending['Symbol'].tolist(), 'values': trending['Mentions'].tolist()})
             
+        return {'title': 'WSB Stock Analysis', 'figsize': (12, 8), 'grid': (2, 2), 'palette': 'husl', 'panels': panels}
+        
+    def update_visualizations(self):
+        """Aktualisiert die Visualisierungen (Daten und Rendern laufen außerhalb des Tk-Threads)"""
+        if self.is_rendering:
+            self.log_message("Visualisierungen werden bereits aktualisiert")
+            return
+        self.is_rendering = True
+        threading.Thread(target=self.render_visualizations, daemon=True).start()
+        
+    def render_visualizations(self):
+        """Lädt neue Sessions und rendert die Diagramme (in separatem Thread)"""
+        try:
+            # Lade nur neue Sessions seit der letzten Aktualisierung
+            if not self.analyzer.update_combined_dataframe():
+                self.result_queue.put(('plot_error', "Keine Daten für Visualisierung verfügbar"))
+                return
+            spec = self.build_plot_spec()
+            png = get_plot_worker().render(spec, PLOT_CONFIG['gui_dpi'])
+            self.result_queue.put(('plot', spec, png))
         except Exception as e:
-            self.log_message(f"Fehler bei Visualisierung: {e}")
+            self.result_queue.put(('plot_error', f"Fehler bei Visualisierung: {e}"))
             
+    def show_plot(self, spec, png):
+        """Zeigt ein gerendertes Diagramm an (im Tk-Thread)"""
+        self.plot_spec = spec
+        self.plot_image = tk.PhotoImage(data=base64.b64encode(png).decode('ascii'))
+        self.plot_label.config(image=self.plot_image)
+        
     def save_visualizations(self):
         """Speichert die Visualisierungen"""
+        if self.plot_spec is None:
+            messagebox.showwarning("Warnung", "Bitte zuerst die Diagramme aktualisieren.")
+            return
+            
         filename = filedialog.asksaveasfilename(
             defaultextension=".png",
             filetypes=[("PNG files", "*.png"), ("PDF files", "*.pdf"), ("All files", "*.*")]
         )
         
         if filename:
-            try:
-                self.fig.savefig(filename, dpi=300, bbox_inches='tight')
-                messagebox.showinfo("Erfolg", f"Visualisierungen gespeichert: {filename}")
-            except Exception as e:
-                messagebox.showerror("Fehler", f"Fehler beim Speichern: {e}")
+            fmt = 'pdf' if filename.lower().endswith('.pdf') else 'png'
+            future = get_plot_worker().submit(self.plot_spec, PLOT_CONFIG['dpi'], fmt)
+            
+            def _write(future):
+                try:
+                    with open(filename, 'wb') as f:
+                        f.write(future.result())
+                    self.result_queue.put(('plot_saved', filename))
+                except Exception as e:
+                    self.result_queue.put(('error', f"Fehler beim Speichern: {e}"))
+                    
+            future.add_done_callback(_write)
                 
     def test_reddit_connection(self):
         """Testet die Reddit-API-Verbindung"""
@@ -629,17 +650,18 @@ Zeitraum: {summary.get('date_range', 'N/A')}"""
     def load_results(self):
         """Lädt Ergebnisse aus einer Datei"""
         filename = filedialog.askopenfilename(
-            filetypes=[("JSON files", "*.json"), ("CSV files", "*.csv"), ("All files", "*.*")]
+            filetypes=[("JSON files", "*.json *.json.gz *.json.zst"), ("CSV files", "*.csv *.csv.gz *.csv.zst"),
+                       ("All files", "*.*")]
         )
         
         if filename:
             try:
-                if filename.endswith('.json'):
-                    with open(filename, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
+                if compression.strip_suffix(filename).endswith('.json'):
+                    data = json.loads(compression.read_text(filename))
                     self.log_message(f"JSON-Datei geladen: {filename}")
                     messagebox.showinfo("Erfolg", f"Ergebnisse geladen: {filename}")
-                elif filename.endswith('.csv'):
+                elif compression.strip_suffix(filename).endswith('.csv'):
+                    # pandas erkennt .gz/.zst anhand der Dateiendung
                     df = pd.read_csv(filename)
                     self.log_message(f"CSV-Datei geladen: {filename}")
                     messagebox.showinfo("Erfolg", f"Ergebnisse geladen: {filename}")
@@ -0,0 +1,150 @@
+"""
+Spaltenbasierter Verlauf aller Crawling-Sessions.
+Jede Session wird als Parquet-Datei in einer Datumspartition abgelegt
+('data/history/date=YYYY-MM-DD/HHMMSS.parquet'), sodass Abfragen über einen
+Zeitraum nur die betroffenen Partitionen und Spalten lesen.
+"""
+
+import io
+import logging
+import re
+from datetime import datetime, date
+import pandas as pd
+from config import DATA_PATHS
+from storage import get_storage_backend
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PATTERN = re.compile(r'date=(\d{4}-\d{2}-\d{2})/(\d{6})\.parquet$')
+
+COLUMNS = ['DateTime', 'Timestamp', 'Symbol', 'Mentions', 'TotalMentions', 'UniqueSymbols']
+
+def parse_crawl_date(result):
+    """Ermittelt den Crawl-Zeitpunkt eines Session-Ergebnisses."""
+    timestamp = result.get('timestamp', '')
+    crawl_date = result.get('crawl_date', '')
+    try:
+        if crawl_date:
+            return datetime.fromisoformat(crawl_date.replace('Z', '+00:00'))
+        # Fallback: Parse aus Timestamp
+        return datetime.strptime(timestamp, "%Y%m%d_%H%M%S")
+    except (ValueError, AttributeError):
+        return datetime.now()
+
+class HistoryStore:
+    def __init__(self, storage=None, base_prefix=None):
+        """Initialisiert den Verlauf auf dem angegebenen oder konfigurierten Speicher-Backend."""
+        self.storage = storage or get_storage_backend()
+        self.base_prefix = base_prefix or DATA_PATHS['history_dir']
+
+    @staticmethod
+    def is_available():
+        """Parquet benötigt das optionale Paket pyarrow."""
+        return pyarrow is not None
+
+    def partition_key(self, crawl_dt):
+        return f"{self.base_prefix}date={crawl_dt.strftime('%Y-%m-%d')}/{crawl_dt.strftime('%H%M%S')}.parquet"
+
+    def append(self, result):
+        """
+        Hängt ein Session-Ergebnis (Format von wsb_mentions.json) an den Verlauf an.
+
+        :return: Schlüssel der geschriebenen Partition-Datei oder None
+        """
+        if not self.is_available():
+            logger.warning("pyarrow nicht installiert, Session wird nicht in den Verlauf übernommen.")
+            return None
+
+        crawl_dt = parse_crawl_date(result)
+        results = result.get('results', {})
+        frame = pd.DataFrame({
+            'DateTime': pd.Timestamp(crawl_dt),
+            'Timestamp': result.get('timestamp', ''),
+            'Symbol': list(results.keys()),
+            'Mentions': pd.array(list(results.values()), dtype='int32'),
+            'TotalMentions': result.get('total_mentions', 0),
+            'UniqueSymbols': result.get('total_symbols_found', 0)
+        }, columns=COLUMNS)
+        frame['DateTime'] = pd.to_datetime(frame['DateTime'], utc=True)
+
+        buffer = io.BytesIO()
+        frame.to_parquet(buffer, index=False, compression='zstd')
+        key = self.partition_key(crawl_dt)
+        if self.storage.put(key, buffer.getvalue()):
+            logger.info(f"Session {result.get('timestamp', '')} in den Verlauf unter {key} übernommen.")
+            return key
+        logger.error(f"Fehler beim Schreiben der Verlaufspartition {key}.")
+        return None
+
+    def list_partition_keys(self, start_date=None, end_date=None):
+        """Listet die Partition-Dateien im Datumsbereich (inklusive), sortiert nach Zeit."""
+        keys = self.storage.list(prefix=self.base_prefix) or []
+        selected = []
+        for key in keys:
+            match = PARTITION_PATTERN.search(key)
+            if not match:
+                continue
+            partition_date = date.fromisoformat(match.group(1))
+            if start_date and partition_date < start_date:
+                continue
+            if end_date and partition_date > end_date:
+                continue
+            selected.append(key)
+        return sorted(selected)
+
+    def list_dates(self):
+        """Alle Datumspartitionen im Verlauf."""
+        return sorted({PARTITION_PATTERN.search(k).group(1) for k in self.list_partition_keys()})
+
+    def read(self, start_date=None, end_date=None, columns=None, symbols=None):
+        """
+        Liest den Verlauf mit Partition- und Spalten-Pruning.
+
+        :param start_date: Erstes Datum (inklusive) oder None
+        :param end_date: Letztes Datum (inklusive) oder None
+        :param columns: Zu lesende Spalten (Standard: alle)
+        :param symbols: Optionale Liste von Symbolen als Zeilenfilter
+        :return: DataFrame mit zusätzlicher Spalte 'Date' aus der Partition
+        """
+        if not self.is_available():
+            logger.warning("pyarrow nicht installiert, Verlauf kann nicht gelesen werden.")
+            return pd.DataFrame()
+
+        keys = self.list_partition_keys(start_date, end_date)
+        if not keys:
+            return pd.DataFrame(columns=['Date'] + list(columns or COLUMNS))
+
+        read_columns = list(columns or COLUMNS)
+        filters = None
+        if symbols is not None:
+            filters = [('Symbol', 'in', [s.upper() for s in symbols])]
+            if 'Symbol' not in read_columns:
+                read_columns.append('Symbol')
+
+        frames = []
+        for key, data in self.storage.get_many(keys).items():
+            if data is None:
+                logger.error(f"Verlaufspartition {key} konnte nicht gelesen werden.")
+                continue
+            frame = pd.read_parquet(io.BytesIO(data), columns=read_columns, filters=filters)
+            frame.insert(0, 'Date', date.fromisoformat(PARTITION_PATTERN.search(key).group(1)))
+            frames.append(frame)
+
+        if not frames:
+            return pd.DataFrame(columns=['Date'] + read_columns)
+        logger.info(f"{len(frames)} Verlaufspartitionen gelesen.")
+        df = pd.concat(frames, ignore_index=True)
+        if 'DateTime' in df:
+            df['DateTime'] = df['DateTime'].astype('datetime64[ns, UTC]')
+        return df
+
+    def read_last_days(self, days, columns=None, symbols=None):
+        """Liest nur die Partitionen der letzten N Tage (inklusive heute)."""
+        today = datetime.now().date()
+        start_date = date.fromordinal(today.toordinal() - days)
+        return self.read(start_date=start_date, end_date=today, columns=columns, symbols=symbols)
@@ -0,0 +1,184 @@
+"""
+Optionales Speicher-Profiling für Crawler und Analyse.
+Bei aktiviertem Profiling (PROFILE_MEMORY=true) verfolgt tracemalloc alle Allokationen
+der Session. Für jede Phase von SessionMetrics werden die Spitze des verfolgten Speichers
+und der Zuwachs festgehalten, an Messpunkten (snapshot) zusätzlich die größten Allokatoren
+und der RSS des Prozesses. Der Bericht wird als memory_profile.json neben metrics.json
+gespeichert.
+
+tracemalloc verlangsamt Python-Code deutlich; das Profiling ist nur für Messläufe gedacht.
+"""
+
+import json
+import os
+import sys
+import threading
+import tracemalloc
+from datetime import datetime, timezone
+from config import MEMORY_PROFILE_CONFIG
+
+try:
+    import resource
+except ImportError:  # z.B. unter Windows
+    resource = None
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else None
+
+def current_rss():
+    """Aktueller RSS des Prozesses in Bytes (None, wenn /proc nicht verfügbar ist)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError, TypeError):
+        return None
+
+def peak_rss():
+    """Höchster RSS seit Prozessstart in Bytes (None ohne das Modul resource)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS liefert Bytes, Linux Kilobytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+_active_profiler = None
+_active_lock = threading.Lock()
+
+class MemoryProfiler:
+    def __init__(self, name=None, frames=None, top_allocators=None):
+        """
+        :param name: Bezeichnung, z.B. 'crawl' oder 'analysis'
+        :param frames: Tiefe der Tracebacks je Allokation (Standard: MEMORY_PROFILE_CONFIG)
+        :param top_allocators: Anzahl der Allokatoren je Messpunkt (Standard: MEMORY_PROFILE_CONFIG)
+        """
+        self.name = name
+        self.frames = frames or MEMORY_PROFILE_CONFIG['frames']
+        self.top_allocators = top_allocators or MEMORY_PROFILE_CONFIG['top_allocators']
+        self.started = None
+        self.finished = None
+        self.phases = {}
+        self.snapshots = []
+        self.peak_traced = 0
+        self._stack = []
+        self._previous = None
+        self._owns_tracing = False
+        # Nur Phasen des startenden Threads werden gemessen (die Spitze von tracemalloc ist prozessweit)
+        self._thread = None
+
+    @property
+    def active(self):
+        return self.started is not None and self.finished is None
+
+    def start(self):
+        """Startet tracemalloc (falls nötig); ein zuvor aktiver Profiler wird beendet."""
+        global _active_profiler
+        with _active_lock:
+            if _active_profiler is not None and _active_profiler is not self:
+                _active_profiler.stop()
+            _active_profiler = self
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._owns_tracing = True
+        tracemalloc.reset_peak()
+        self.started = datetime.now(timezone.utc)
+        self._thread = threading.get_ident()
+        self._previous = tracemalloc.take_snapshot()
+        return self
+
+    def stop(self):
+        """Beendet das Profiling; tracemalloc wird nur gestoppt, wenn es hier gestartet wurde."""
+        global _active_profiler
+        if not self.active:
+            return self
+        self._fold_peak(tracemalloc.get_traced_memory()[1])
+        self.finished = datetime.now(timezone.utc)
+        self._stack.clear()
+        self._previous = None
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+        with _active_lock:
+            if _active_profiler is self:
+                _active_profiler = None
+        return self
+
+    def _fold_peak(self, peak):
+        self.peak_traced = max(self.peak_traced, peak)
+        if self._stack:
+            self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+
+    def enter(self):
+        """Beginn einer Phase (von SessionMetrics.phase aufgerufen)."""
+        if not self.active or threading.get_ident() != self._thread:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        # Die bisherige Spitze an die umgebende Phase weitergeben, bevor sie zurückgesetzt wird
+        self._fold_peak(peak)
+        tracemalloc.reset_peak()
+        self._stack.append({'start': current, 'peak': current})
+
+    def exit(self, name):
+        """Ende einer Phase: Spitze und Zuwachs werden je Phasenname aufsummiert."""
+        if not self.active or threading.get_ident() != self._thread or not self._stack:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        frame = self._stack.pop()
+        frame_peak = max(frame['peak'], peak)
+        self._fold_peak(frame_peak)
+        phase = self.phases.setdefault(name, {'calls': 0, 'peak_traced_bytes': 0, 'peak_increase_bytes': 0,
+                                              'growth_bytes': 0, 'peak_rss_bytes': None})
+        phase['calls'] += 1
+        phase['peak_traced_bytes'] = max(phase['peak_traced_bytes'], frame_peak)
+        phase['peak_increase_bytes'] = max(phase['peak_increase_bytes'], frame_peak - frame['start'])
+        phase['growth_bytes'] += current - frame['start']
+        phase['peak_rss_bytes'] = peak_rss()
+
+    def snapshot(self, label):
+        """
+        Messpunkt: größte Allokatoren (noch belegter Speicher je Codezeile) und deren
+        Zuwachs seit dem vorherigen Messpunkt, dazu verfolgter Speicher und RSS.
+        """
+        if not self.active:
+            return None
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        self._fold_peak(peak)
+        stats = snapshot.compare_to(self._previous, 'lineno')
+        stats.sort(key=lambda stat: stat.size, reverse=True)
+        self._previous = snapshot
+        entry = {
+            'label': label,
+            'time': datetime.now(timezone.utc).isoformat(),
+            'traced_bytes': current,
+            'peak_traced_bytes': self.peak_traced,
+            'rss_bytes': current_rss(),
+            'peak_rss_bytes': peak_rss(),
+            'top_allocators': [{
+                'location': ' <- '.join(f"{frame.filename}:{frame.lineno}" for frame in stat.traceback),
+                'size_bytes': stat.size,
+                'count': stat.count,
+                'size_diff_bytes': stat.size_diff,
+                'count_diff': stat.count_diff
+            } for stat in stats[:self.top_allocators]]
+        }
+        self.snapshots.append(entry)
+        return entry
+
+    def to_dict(self):
+        if self.active:
+            self._fold_peak(tracemalloc.get_traced_memory()[1])
+        return {
+            'name': self.name,
+            'started': self.started.isoformat() if self.started else None,
+            'finished': self.finished.isoformat() if self.finished else None,
+            'frames': self.frames,
+            'peak_traced_bytes': self.peak_traced,
+            'peak_rss_bytes': peak_rss(),
+            'phases': dict(sorted(self.phases.items())),
+            'snapshots': self.snapshots
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2, ensure_ascii=False)
@@ -0,0 +1,307 @@
+"""
+Leichtgewichtige Laufzeit-Metriken je Session.
+Zeiten je Phase und Zähler (Requests, Bytes, gescannte Texte, Treffer) werden in
+einem SessionMetrics-Objekt gesammelt und als metrics.json neben den Artefakten der
+Session gespeichert. Module ohne eigenen Zustand (z.B. s3_handler) schreiben in die
+aktiven Metriken des laufenden Kontexts (activate_metrics/get_metrics); parallele Crawls
+und Analysen in verschiedenen Threads zählen so getrennt.
+
+Ist der Endpunkt aktiviert (METRICS_CONFIG) oder läuft ein MetricsServer, fließen alle
+Werte zusätzlich in eine prozessweite Registry, die über einen lokalen HTTP-Endpunkt im
+Prometheus-Textformat ausgeliefert wird. Ohne Endpunkt kostet die Registry nichts.
+Raten wie Posts/s ergeben sich in Prometheus aus den Zählern, z.B. rate(wsb_posts_total[5m]).
+
+Mit profile_memory=True misst jede Phase zusätzlich den Speicherverbrauch (memory_profiling).
+"""
+
+import bisect
+import contextvars
+import functools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from config import METRICS_CONFIG
+from memory_profiling import MemoryProfiler
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+# Obergrenzen der Latenz-Histogramme in Sekunden
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0)
+
+@functools.lru_cache(maxsize=None)
+def _metric_name(name):
+    return 'wsb_' + ''.join(c if c.isalnum() else '_' for c in name)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class MetricsRegistry:
+    """Prozessweite Zähler, Gauges und Histogramme für die Prometheus-Ausgabe."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS, enabled=False):
+        """:param enabled: Werte annehmen; sonst sind alle Aufrufe wirkungslos"""
+        self.buckets = tuple(buckets)
+        self.enabled = enabled
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        # (Name, Suffix, Labels) -> Schlüssel mit Prometheus-Namen und sortierten Labels
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    def _key(self, name, suffix, labels):
+        lookup = (name, suffix, *labels.items())
+        key = self._keys.get(lookup)
+        if key is None:
+            key = self._keys[lookup] = (_metric_name(name) + suffix, tuple(sorted(labels.items())))
+        return key
+
+    def inc(self, name, amount=1, **labels):
+        if not self.enabled:
+            return
+        key = self._key(name, '_total', labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set_gauge(self, name, value, **labels):
+        if not self.enabled:
+            return
+        key = self._key(name, '', labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def add_gauge(self, name, amount, **labels):
+        if not self.enabled:
+            return
+        key = self._key(name, '', labels)
+        with self._lock:
+            self._gauges[key] = self._gauges.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        if not self.enabled:
+            return
+        key = self._key(name, '', labels)
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            histogram[0][position] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def render(self):
+        """Gibt alle Werte im Prometheus-Textformat (Version 0.0.4) zurück."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            histograms = sorted((key, ([*h[0]], h[1], h[2])) for key, h in self._histograms.items())
+
+        lines = []
+        typed = set()
+
+        def _type(name, kind):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in counters:
+            _type(name, 'counter')
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for (name, labels), value in gauges:
+            _type(name, 'gauge')
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for (name, labels), (bucket_counts, total, count) in histograms:
+            _type(name, 'histogram')
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), bucket_counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        return '\n'.join(lines) + '\n'
+
+registry = MetricsRegistry(enabled=METRICS_CONFIG['enabled'])
+
+class SessionMetrics:
+    def __init__(self, name=None, profile_memory=False):
+        """
+        :param name: Bezeichnung, z.B. 'crawl' oder 'analysis'
+        :param profile_memory: Speicherverbrauch je Phase mit tracemalloc messen
+        """
+        self.name = name
+        self.started = datetime.now(timezone.utc)
+        self.phases = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+        self.memory = MemoryProfiler(name).start() if profile_memory else None
+
+    @contextmanager
+    def phase(self, name):
+        """Misst die Laufzeit eines Blocks; mehrfache Aufrufe werden aufsummiert."""
+        if self.memory:
+            self.memory.enter()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - started)
+            if self.memory:
+                self.memory.exit(name)
+
+    def iterate(self, iterable, name):
+        """Gibt die Elemente eines Iterators weiter und misst die Wartezeit auf jedes Element."""
+        iterator = iter(iterable)
+        while True:
+            with self.phase(name):
+                item = next(iterator, _END)
+            if item is _END:
+                return
+            yield item
+
+    def add_time(self, name, seconds):
+        with self._lock:
+            phase = self.phases.setdefault(name, {'seconds': 0.0, 'calls': 0})
+            phase['seconds'] += seconds
+            phase['calls'] += 1
+        registry.observe('phase_duration_seconds', seconds, phase=name)
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+        registry.inc(name, amount)
+
+    def close(self):
+        """Beendet das Speicher-Profiling; mehrfache Aufrufe sind wirkungslos."""
+        if self.memory:
+            self.memory.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        # Auch bei Abbruch oder vorzeitigem return darf tracemalloc nicht weiterlaufen
+        self.close()
+        return False
+
+    def snapshot_memory(self, label):
+        """Messpunkt des Speicher-Profilings (ohne Profiling wirkungslos)."""
+        return self.memory.snapshot(label) if self.memory else None
+
+    def mark_success(self):
+        """Setzt den Zeitpunkt des letzten erfolgreichen Laufs (Gauge je Name)."""
+        registry.set_gauge('last_success_timestamp_seconds', round(time.time(), 3), job=self.name or 'default')
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'name': self.name,
+                'started': self.started.isoformat(),
+                'finished': datetime.now(timezone.utc).isoformat(),
+                'phases': {name: {'seconds': round(p['seconds'], 6), 'calls': p['calls']}
+                           for name, p in sorted(self.phases.items())},
+                'counters': dict(sorted(self.counters.items()))
+            }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2, ensure_ascii=False)
+
+# Neue Threads beginnen mit einem leeren Kontext und schreiben in die Standard-Metriken
+_active_metrics = contextvars.ContextVar('active_metrics', default=SessionMetrics())
+
+def get_metrics():
+    """Die aktiven Metriken des laufenden Threads bzw. Kontexts (mit activate_metrics gesetzt)."""
+    return _active_metrics.get()
+
+def activate_metrics(metrics):
+    """Setzt die Metriken, in die Code ohne eigenes Metrics-Objekt im laufenden Kontext schreibt."""
+    _active_metrics.set(metrics)
+    return metrics
+
+def bind_metrics(fn):
+    """Bindet fn an die aktiven Metriken des Aufrufers, z.B. für Worker-Threads."""
+    metrics = get_metrics()
+
+    def _run(*args, **kwargs):
+        token = _active_metrics.set(metrics)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _active_metrics.reset(token)
+    return _run
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("Metrics-Endpunkt: " + format % args)
+
+class MetricsServer:
+    def __init__(self, host=None, port=None):
+        """
+        :param host: Adresse (Standard: METRICS_CONFIG, lokal)
+        :param port: Port; 0 wählt einen freien Port
+        """
+        self.host = host or METRICS_CONFIG['host']
+        self.port = METRICS_CONFIG['port'] if port is None else port
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """Startet den Endpunkt GET /metrics in einem Hintergrund-Thread."""
+        self._server = ThreadingHTTPServer((self.host, self.port), _MetricsHandler)
+        # Ab jetzt werden die Werte gesammelt
+        registry.enabled = True
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name='metrics-server', daemon=True)
+        self._thread.start()
+        logger.info(f"Metrics-Endpunkt unter http://{self.host}:{self.port}/metrics gestartet.")
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+_metrics_server = None
+_server_lock = threading.Lock()
+
+def start_metrics_server():
+    """Startet den Metrics-Endpunkt einmal je Prozess, wenn er in METRICS_CONFIG aktiviert ist."""
+    global _metrics_server
+    if not METRICS_CONFIG['enabled']:
+        return None
+    with _server_lock:
+        if _metrics_server is None:
+            try:
+                _metrics_server = MetricsServer().start()
+            except OSError as e:
+                logger.warning(f"Metrics-Endpunkt konnte nicht gestartet werden: {e}")
+                return None
+        return _metrics_server
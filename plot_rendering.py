@@ -0,0 +1,165 @@
+"""
+Rendern der Analyse-Diagramme aus Plot-Spezifikationen.
+Eine Spezifikation ist ein JSON-serialisierbares Dict mit den bereits aggregierten
+Daten aller Teildiagramme. Ihr Hash dient als Datenversion: Gerenderte PNGs werden
+je Hash und Auflösung im Speicher-Backend abgelegt und nur einmal erzeugt.
+Gerendert wird in einem Prozess-Pool (PlotWorker), sodass weder die GUI noch
+Crawl und Analyse auf das Rendern warten und mehrere Diagramme parallel entstehen.
+"""
+
+import atexit
+import hashlib
+import io
+import json
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+import matplotlib
+import matplotlib.dates as mdates
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+import seaborn as sns
+from config import DATA_PATHS, PLOT_CONFIG
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+def spec_hash(spec):
+    """Stabiler Hash einer Plot-Spezifikation."""
+    return hashlib.sha256(json.dumps(spec, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def _draw_panel(ax, panel):
+    kind = panel['kind']
+    if kind == 'barh':
+        ax.barh(panel['labels'], panel['values'])
+    elif kind == 'line':
+        ax.plot(mdates.datestr2num(panel['labels']), panel['values'], marker='o')
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
+    elif kind == 'bar':
+        ax.bar(range(len(panel['values'])), panel['values'])
+    elif kind == 'heatmap':
+        data = pd.DataFrame(panel['values'], index=panel['rows'], columns=panel['columns'])
+        sns.heatmap(data, ax=ax, cmap='YlOrRd', cbar_kws={'label': panel.get('cbar_label', '')})
+    ax.set_title(panel.get('title', ''))
+    if panel.get('xlabel'):
+        ax.set_xlabel(panel['xlabel'])
+    if panel.get('ylabel'):
+        ax.set_ylabel(panel['ylabel'])
+    if panel.get('rotate_x'):
+        ax.tick_params(axis='x', rotation=panel['rotate_x'])
+
+def render_spec(spec, dpi=100, fmt='png'):
+    """
+    Rendert eine Plot-Spezifikation zu Bild-Bytes (Standard: PNG).
+    Verwendet direkt Figure und den Agg-Canvas statt pyplot und ist damit unabhängig
+    vom GUI-Backend und vom globalen pyplot-Zustand.
+    """
+    rows, cols = spec.get('grid', (2, 2))
+    palette = matplotlib.cycler(color=sns.color_palette(spec.get('palette', 'husl')))
+    with matplotlib.rc_context({'axes.prop_cycle': palette}):
+        fig = Figure(figsize=tuple(spec.get('figsize', (15, 12))))
+        FigureCanvasAgg(fig)
+        axes = fig.subplots(rows, cols, squeeze=False)
+        if spec.get('title'):
+            fig.suptitle(spec['title'], fontsize=16, fontweight='bold')
+        for panel in spec.get('panels', []):
+            row, col = panel['position']
+            _draw_panel(axes[row][col], panel)
+        fig.tight_layout()
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt, dpi=dpi, bbox_inches='tight')
+    return buffer.getvalue()
+
+def _init_worker():
+    """Initialisiert einen Render-Prozess mit dem Agg-Backend."""
+    matplotlib.use('Agg')
+
+class PlotWorker:
+    def __init__(self, max_workers=None):
+        """
+        :param max_workers: Anzahl Render-Prozesse; 0 rendert synchron im aufrufenden Thread
+        """
+        self.max_workers = PLOT_CONFIG['workers'] if max_workers is None else max_workers
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                # 'spawn': die Render-Prozesse erben weder Threads und Locks noch den
+                # GUI-Zustand (Tkinter, Streamlit) des aufrufenden Prozesses
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+            return self._pool
+
+    def submit(self, spec, dpi=100, fmt='png'):
+        """Rendert eine Spezifikation im Hintergrund und gibt ein Future mit den Bild-Bytes zurück."""
+        if not self.max_workers:
+            future = Future()
+            try:
+                future.set_result(render_spec(spec, dpi, fmt))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        registry.add_gauge('queue_depth', 1, queue='plot_render')
+        future = self._get_pool().submit(render_spec, spec, dpi, fmt)
+        future.add_done_callback(lambda _: registry.add_gauge('queue_depth', -1, queue='plot_render'))
+        return future
+
+    def render(self, spec, dpi=100, fmt='png'):
+        """Rendert eine Spezifikation und wartet auf das Ergebnis."""
+        return self.submit(spec, dpi, fmt).result()
+
+    def render_many(self, specs, dpi=100, fmt='png'):
+        """Rendert mehrere Spezifikationen parallel; Ergebnis in der Reihenfolge der Eingabe."""
+        futures = [self.submit(spec, dpi, fmt) for spec in specs]
+        return [future.result() for future in futures]
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait, cancel_futures=not wait)
+                self._pool = None
+
+_plot_worker = None
+
+def get_plot_worker():
+    """Gibt den gemeinsamen Render-Worker des Prozesses zurück."""
+    global _plot_worker
+    if _plot_worker is None:
+        _plot_worker = PlotWorker()
+        # Render-Prozesse beim Beenden des Programms nicht verwaist zurücklassen
+        atexit.register(_plot_worker.shutdown)
+    return _plot_worker
+
+RENDERS_PREFIX = f"{DATA_PATHS['analysis_state_dir']}renders/"
+
+def render_key(spec, dpi):
+    """Schlüssel des gerenderten PNGs einer Datenversion im Speicher-Backend."""
+    return f"{RENDERS_PREFIX}{spec_hash(spec)}_{dpi}.png"
+
+def prune_renders(storage, keep_hash):
+    """Löscht die Renders älterer Datenversionen; die Auflösungen von keep_hash bleiben erhalten."""
+    for key in storage.list(RENDERS_PREFIX) or []:
+        if not key[len(RENDERS_PREFIX):].startswith(f"{keep_hash}_"):
+            storage.delete(key)
+
+def render_cached(spec, dpi, storage, worker=None):
+    """
+    Gibt das PNG einer Spezifikation zurück und rendert nur, wenn es noch nicht vorliegt.
+    Gerendert wird über den Render-Worker (Standard: get_plot_worker()).
+    """
+    key = render_key(spec, dpi)
+    data = storage.get(key)
+    if data is not None:
+        logger.info(f"Diagramm aus dem Render-Cache geladen ({dpi} dpi).")
+        return data
+    data = (worker or get_plot_worker()).render(spec, dpi)
+    if storage.put(key, data):
+        # Jede neue Datenversion ersetzt die vorherige, der Render-Cache wächst nicht
+        prune_renders(storage, spec_hash(spec))
+    else:
+        logger.warning(f"Gerendertes Diagramm konnte nicht zwischengespeichert werden: {key}")
+    return data
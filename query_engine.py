@@ -0,0 +1,206 @@
+"""
+Eingebettete SQL-Abfrageschicht über die Session-Historie.
+Sessions werden inkrementell in eine lokale SQLite-Datenbank übernommen; Filter
+und Aggregationen laufen in der Datenbank, sodass Ad-hoc-Auswertungen ohne
+vollständiges Laden der Historie in pandas auskommen.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import closing, contextmanager
+import pandas as pd
+from config import DATA_PATHS, QUERY_CONFIG
+import compression
+from storage import get_storage_backend
+from history_store import parse_crawl_date
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id INTEGER PRIMARY KEY,
+    session_path TEXT NOT NULL UNIQUE,
+    timestamp TEXT NOT NULL,
+    crawl_time TEXT NOT NULL,
+    crawl_date TEXT NOT NULL,
+    total_mentions INTEGER NOT NULL,
+    unique_symbols INTEGER NOT NULL,
+    subreddit TEXT
+);
+CREATE TABLE IF NOT EXISTS mentions (
+    session_id INTEGER NOT NULL REFERENCES sessions(session_id),
+    symbol TEXT NOT NULL,
+    mentions INTEGER NOT NULL,
+    crawl_time TEXT NOT NULL,
+    crawl_date TEXT NOT NULL,
+    PRIMARY KEY (session_id, symbol)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS symbols (
+    symbol TEXT PRIMARY KEY,
+    company TEXT,
+    exchange TEXT,
+    sector TEXT
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_sessions_date ON sessions (crawl_date);
+CREATE INDEX IF NOT EXISTS idx_mentions_date_symbol ON mentions (crawl_date, symbol, mentions);
+CREATE INDEX IF NOT EXISTS idx_mentions_symbol_time ON mentions (symbol, crawl_time, mentions);
+"""
+
+def _date_filter(column, start_date, end_date, params):
+    """Bedingungen für einen Datumsbereich (inklusive); die Parameter werden ergänzt."""
+    conditions = []
+    if start_date is not None:
+        conditions.append(f"{column} >= ?")
+        params.append(str(start_date))
+    if end_date is not None:
+        conditions.append(f"{column} <= ?")
+        params.append(str(end_date))
+    return conditions
+
+def _where(conditions):
+    """Verknüpft Bedingungen zu einer WHERE-Klausel (leer ohne Bedingungen)."""
+    return ("WHERE " + " AND ".join(conditions)) if conditions else ""
+
+class SessionQueryEngine:
+    def __init__(self, db_path=None, storage=None):
+        """Öffnet (bzw. erstellt) die Datenbank und legt das Schema an."""
+        self.db_path = db_path or QUERY_CONFIG['db_path']
+        self.storage = storage or get_storage_backend()
+        if self.db_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        # Eine gemeinsame Verbindung, damit auch ':memory:'-Datenbanken erhalten bleiben
+        self._connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._connection.executescript(SCHEMA)
+        self._lock = threading.RLock()
+
+    def close(self):
+        self._connection.close()
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock, self._connection:
+            yield self._connection
+
+    def load_symbols(self, path=None):
+        """Übernimmt die Stammdaten (Firma, Börse, Sektor) aus der Symbol-CSV."""
+        df = pd.read_csv(path or DATA_PATHS['stock_symbols']).reindex(
+            columns=['Symbol', 'Company', 'Exchange', 'Sector'])
+        df = df.astype(object).where(df.notna(), None)
+        rows = zip(df['Symbol'].str.upper(), df['Company'], df['Exchange'], df['Sector'])
+        with self._transaction() as conn:
+            conn.executemany("INSERT OR REPLACE INTO symbols VALUES (?, ?, ?, ?)", rows)
+        return len(df)
+
+    def ingested_sessions(self):
+        with self._lock, closing(self._connection.execute("SELECT session_path FROM sessions")) as cursor:
+            return {row[0] for row in cursor}
+
+    def ingest_result(self, session_path, result, conn=None):
+        """Übernimmt ein einzelnes Session-Ergebnis (Format von wsb_mentions.json)."""
+        crawl_dt = pd.Timestamp(parse_crawl_date(result))
+        crawl_dt = crawl_dt.tz_convert('UTC') if crawl_dt.tzinfo else crawl_dt.tz_localize('UTC')
+        crawl_time = crawl_dt.strftime('%Y-%m-%d %H:%M:%S')
+        crawl_date = crawl_dt.strftime('%Y-%m-%d')
+        results = result.get('results', {})
+
+        def _insert(conn):
+            cursor = conn.execute(
+                "INSERT INTO sessions (session_path, timestamp, crawl_time, crawl_date, total_mentions, "
+                "unique_symbols, subreddit) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (session_path, result.get('timestamp', ''), crawl_time, crawl_date,
+                 result.get('total_mentions', 0), result.get('total_symbols_found', 0),
+                 result.get('subreddit')))
+            session_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO mentions VALUES (?, ?, ?, ?, ?)",
+                ((session_id, symbol, count, crawl_time, crawl_date) for symbol, count in results.items()))
+
+        if conn is not None:
+            _insert(conn)
+        else:
+            with self._transaction() as conn:
+                _insert(conn)
+
+    def ingest(self):
+        """
+        Übernimmt alle Sessions aus dem Speicher-Backend, die noch nicht in der Datenbank sind.
+
+        :return: Anzahl neu übernommener Sessions
+        """
+        results_dir = DATA_PATHS['results_dir']
+        keys = self.storage.list(prefix=results_dir)
+        if keys is None:
+            return 0
+        with self._lock, closing(self._connection.execute("SELECT COUNT(*) FROM symbols")) as cursor:
+            if cursor.fetchone()[0] == 0 and os.path.exists(DATA_PATHS['stock_symbols']):
+                self.load_symbols()
+
+        known = self.ingested_sessions()
+        new_keys = {}
+        for key in sorted(k for k in keys if compression.matches(k, 'wsb_mentions.json')):
+            session_path = key[len(results_dir):].rsplit('/', 1)[0] + '/'
+            if session_path not in known:
+                new_keys[key] = session_path
+
+        keys = list(new_keys)
+        added = 0
+        batch_size = QUERY_CONFIG['batch_size']
+        for start in range(0, len(keys), batch_size):
+            contents = self.storage.get_many(keys[start:start + batch_size])
+            with self._transaction() as conn:
+                for key, content in contents.items():
+                    if content is None:
+                        logger.error(f"Session {key} konnte nicht gelesen werden.")
+                        continue
+                    try:
+                        self.ingest_result(new_keys[key], json.loads(compression.decompress(content)), conn)
+                        added += 1
+                    except (ValueError, sqlite3.Error) as e:
+                        logger.error(f"Fehler beim Übernehmen von {key}: {e}")
+        if added:
+            logger.info(f"{added} Sessions in die Abfrage-Datenbank übernommen.")
+        return added
+
+    def query(self, sql, params=()):
+        """Führt eine beliebige SELECT-Abfrage aus und gibt das Ergebnis als DataFrame zurück."""
+        with self._lock:
+            return pd.read_sql_query(sql, self._connection, params=list(params))
+
+    def top_symbols(self, start_date=None, end_date=None, limit=10):
+        """Top-Symbole nach Erwähnungen im Datumsbereich (inklusive)."""
+        params = []
+        where = _where(_date_filter('crawl_date', start_date, end_date, params))
+        return self.query(
+            f"SELECT symbol AS Symbol, SUM(mentions) AS Mentions FROM mentions {where} "
+            f"GROUP BY symbol ORDER BY Mentions DESC, symbol LIMIT ?", params + [limit])
+
+    def symbol_history(self, symbol, start_date=None, end_date=None):
+        """Erwähnungen eines Symbols je Session, zeitlich sortiert."""
+        params = [symbol.upper()]
+        where = _where(['m.symbol = ?'] + _date_filter('m.crawl_date', start_date, end_date, params))
+        df = self.query(
+            "SELECT m.crawl_time AS DateTime, s.timestamp AS Timestamp, m.mentions AS Mentions, "
+            "s.total_mentions AS TotalMentions FROM mentions m JOIN sessions s USING (session_id) "
+            f"{where} ORDER BY m.crawl_time", params)
+        df['DateTime'] = pd.to_datetime(df['DateTime'], utc=True)
+        return df
+
+    def sector_totals(self, start_date=None, end_date=None):
+        """Erwähnungen je Sektor im Datumsbereich; Symbole ohne Stammdaten zählen als 'Unknown'."""
+        params = []
+        where = _where(_date_filter('m.crawl_date', start_date, end_date, params))
+        return self.query(
+            "SELECT COALESCE(y.sector, 'Unknown') AS Sector, SUM(m.mentions) AS Mentions, "
+            "COUNT(DISTINCT m.symbol) AS Symbols FROM mentions m LEFT JOIN symbols y USING (symbol) "
+            f"{where} GROUP BY Sector ORDER BY Mentions DESC", params)
+
+    def daily_totals(self, start_date=None, end_date=None):
+        """Erwähnungen je Tag im Datumsbereich."""
+        params = []
+        where = _where(_date_filter('crawl_date', start_date, end_date, params))
+        return self.query(
+            f"SELECT crawl_date AS Date, SUM(mentions) AS Mentions FROM mentions {where} "
+            f"GROUP BY crawl_date ORDER BY crawl_date", params)
@@ -4,16 +4,29 @@ Durchsucht r/wallstreetbets nach Aktiensymbolen und zählt deren Häufigkeit
 """
 
 import praw
+import prawcore
 import pandas as pd
 import re
 import json
 import os
-import io
 from datetime import datetime, timezone
-from collections import defaultdict, Counter
+from collections import Counter
 import logging
-from config import REDDIT_CONFIG, CRAWLER_CONFIG, DATA_PATHS, STORAGE_CONFIG
-import s3_handler
+import time
+from config import REDDIT_CONFIG, CRAWLER_CONFIG, DATA_PATHS, ARTIFACT_CONFIG, CO_MENTION_CONFIG, MEMORY_PROFILE_CONFIG
+import compression
+from storage import get_storage_backend
+from history_store import HistoryStore
+from co_mentions import CoMentionGraph
+from topk import TopKCounter, top_items
+from metrics import SessionMetrics, activate_metrics, get_metrics, start_metrics_server
+
+class CountingRequestor(prawcore.Requestor):
+    """Zählt jeden HTTP-Request an Reddit (inklusive Token-Anfragen) als reddit_requests."""
+
+    def request(self, *args, **kwargs):
+        get_metrics().count('reddit_requests')
+        return super().request(*args, **kwargs)
 
 class WSBStockCrawler:
     def __init__(self):
@@ -21,12 +34,17 @@ class WSBStockCrawler:
         self.reddit = None
         self.stock_symbols = set()
         self.excluded_words = set(CRAWLER_CONFIG['excluded_words'])
-        self.results = defaultdict(int)
+        self.results = TopKCounter()
+        self.co_mentions = CoMentionGraph()
+        self.metrics = SessionMetrics('crawl')
+        # Zähler der Symbolerkennung; werden je Post gesammelt an die Metriken übergeben
+        self._extract_stats = [0, 0, 0]  # Texte, Tokens, Treffer
         self.session_timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
         self.log_file_path = None
         self.session_path = None
         self.setup_logging()
         self.load_stock_symbols()
+        start_metrics_server()
         
     def setup_logging(self):
         """Konfiguriert das Logging für die aktuelle Session."""
@@ -70,7 +88,8 @@ class WSBStockCrawler:
                 client_secret=REDDIT_CONFIG['client_secret'],
                 user_agent=REDDIT_CONFIG['user_agent'],
                 username=REDDIT_CONFIG['username'],
-                password=REDDIT_CONFIG['password']
+                password=REDDIT_CONFIG['password'],
+                requestor_class=CountingRequestor
             )
             # Test der Verbindung
             self.reddit.user.me()
@@ -92,6 +111,9 @@ class WSBStockCrawler:
         # Suche nach Wörtern mit 1-5 Buchstaben, die nicht in excluded_words sind
         pattern = r'\b[A-Z]{1,5}\b'
         potential_symbols = re.findall(pattern, text)
+        stats = self._extract_stats
+        stats[0] += 1
+        stats[1] += len(potential_symbols)
         
         # Filtere nach bekannten Aktiensymbolen und schließe ausgeschlossene Wörter aus
         found_symbols = []
@@ -102,7 +124,17 @@ class WSBStockCrawler:
                 len(symbol) <= CRAWLER_CONFIG['max_symbol_length']):
                 found_symbols.append(symbol)
                 
+        stats[2] += len(found_symbols)
         return found_symbols
+
+    def _flush_extract_stats(self, metrics):
+        """Übergibt die seit dem letzten Aufruf gesammelten Zähler der Symbolerkennung an die Metriken."""
+        texts, tokens, matched = self._extract_stats
+        self._extract_stats = [0, 0, 0]
+        if texts:
+            metrics.count('texts_scanned', texts)
+            metrics.count('tokens_scanned', tokens)
+            metrics.count('symbols_matched', matched)
         
     def crawl_subreddit(self, progress_callback=None):
         """Crawlt das WSB Subreddit nach Aktiensymbolen"""
@@ -112,7 +144,13 @@ class WSBStockCrawler:
                 
         try:
             subreddit = self.reddit.subreddit(CRAWLER_CONFIG['subreddit'])
-            self.results = defaultdict(int)
+            self.results = TopKCounter()
+            self.co_mentions = CoMentionGraph()
+            track_co_mentions = CO_MENTION_CONFIG['enabled']
+            self.metrics = metrics = activate_metrics(
+                SessionMetrics('crawl', profile_memory=MEMORY_PROFILE_CONFIG['enabled']))
+            self._extract_stats = [0, 0, 0]
+            crawl_started = time.perf_counter()
             
             # Crawle Hot Posts
             posts_processed = 0
@@ -120,31 +158,46 @@ class WSBStockCrawler:
             
             self.logger.info(f"Starting to crawl r/{CRAWLER_CONFIG['subreddit']}")
             
-            for post in subreddit.hot(limit=CRAWLER_CONFIG['post_limit']):
+            for post in metrics.iterate(subreddit.hot(limit=CRAWLER_CONFIG['post_limit']), 'crawl.fetch_posts'):
                 # Extrahiere Symbole aus Titel und Text des Posts
+                # (die Erkennung wird je Post als eine Messung der Phase crawl.extract erfasst)
+                extract_started = time.perf_counter()
                 title_symbols = self.extract_symbols_from_text(post.title)
                 selftext_symbols = self.extract_symbols_from_text(post.selftext)
+                extract_seconds = time.perf_counter() - extract_started
                 
                 # Zähle die gefundenen Symbole
                 for symbol in title_symbols + selftext_symbols:
                     self.results[symbol] += 1
+                if track_co_mentions:
+                    self.co_mentions.add_document(title_symbols + selftext_symbols)
                     
                 # Crawle Kommentare
                 try:
-                    post.comments.replace_more(limit=0)  # Entferne "more comments"
+                    with metrics.phase('crawl.fetch_comments'):
+                        post.comments.replace_more(limit=0)  # Entferne "more comments"
+                        comments = post.comments.list()[:CRAWLER_CONFIG['comment_limit']]
                     comments_processed = 0
                     
-                    for comment in post.comments.list()[:CRAWLER_CONFIG['comment_limit']]:
+                    extract_started = time.perf_counter()
+                    for comment in comments:
                         if hasattr(comment, 'body'):
                             comment_symbols = self.extract_symbols_from_text(comment.body)
                             for symbol in comment_symbols:
                                 self.results[symbol] += 1
+                            if track_co_mentions:
+                                self.co_mentions.add_document(comment_symbols)
                             comments_processed += 1
+                    extract_seconds += time.perf_counter() - extract_started
+                    metrics.count('comments', comments_processed)
                             
                 except Exception as e:
                     self.logger.warning(f"Error processing comments for post {post.id}: {e}")
                     
                 posts_processed += 1
+                metrics.add_time('crawl.extract', extract_seconds)
+                self._flush_extract_stats(metrics)
+                metrics.count('posts')
                 
                 # Update Progress
                 if progress_callback:
@@ -153,15 +206,18 @@ class WSBStockCrawler:
                     
                 self.logger.info(f"Processed post {posts_processed}/{total_posts}: {post.title[:50]}...")
                 
+            metrics.add_time('crawl.total', time.perf_counter() - crawl_started)
+            metrics.snapshot_memory('crawl')
             self.logger.info(f"Crawling completed. Found {len(self.results)} unique symbols")
             return True
             
         except Exception as e:
             self.logger.error(f"Error during crawling: {e}")
+            self.metrics.close()
             return False
             
     def _upload_log_file(self, session_path):
-        """Lädt die Log-Datei für die aktuelle Session nach S3 hoch."""
+        """Archiviert die Log-Datei der aktuellen Session im Speicher-Backend."""
         if not self.log_file_path or not os.path.exists(self.log_file_path):
             self.logger.error("Log-Datei nicht gefunden zum Hochladen.")
             return
@@ -170,10 +226,9 @@ class WSBStockCrawler:
             # Fährt alle Logger herunter und schließt die Dateien sicher
             logging.shutdown()
             
-            with open(self.log_file_path, 'rb') as log_file_obj:
-                log_s3_key = f"{DATA_PATHS['results_dir']}{session_path}crawler.log"
-                self.logger.info(f"Lade Log-Datei nach {log_s3_key} hoch...")
-                s3_handler.upload_file_obj(log_file_obj, log_s3_key)
+            log_key = f"{DATA_PATHS['results_dir']}{session_path}crawler.log"
+            self.logger.info(f"Lade Log-Datei nach {log_key} hoch...")
+            get_storage_backend().put_file(log_key, self.log_file_path)
             
             # Lokale Log-Datei nach dem Hochladen löschen
             os.remove(self.log_file_path)
@@ -187,15 +242,18 @@ class WSBStockCrawler:
             self.setup_logging()
 
     def save_results(self):
-        """Speichert die Crawling-Ergebnisse entweder lokal oder auf S3."""
+        """Speichert die Crawling-Ergebnisse im konfigurierten Speicher-Backend."""
         try:
             # Verwende den im Konstruktor erstellten Zeitstempel für Konsistenz
             now = datetime.strptime(self.session_timestamp, "%Y%m%d_%H%M%S").replace(tzinfo=timezone.utc)
             session_date = now.strftime("%Y-%m-%d")
             session_time = now.strftime("%H%M%S")
             self.session_path = f"{session_date}/{session_time}/"
+            metrics = self.metrics
+            serialize_started = time.perf_counter()
             
-            sorted_results = dict(sorted(self.results.items(), key=lambda x: x[1], reverse=True))
+            # Das Artefakt enthält alle Symbole absteigend sortiert (Leser zeigen es in dieser Reihenfolge)
+            sorted_results = dict(top_items(self.results))
 
             # JSON-Daten vorbereiten
             result_data = {
@@ -206,62 +264,74 @@ class WSBStockCrawler:
                 'subreddit': CRAWLER_CONFIG['subreddit'],
                 'results': sorted_results
             }
-            json_content = json.dumps(result_data, indent=2, ensure_ascii=False)
-            
-            # CSV-Daten vorbereiten
-            df = pd.DataFrame(list(sorted_results.items()), columns=['Symbol', 'Mentions'])
-            df['Timestamp'] = f"{session_date.replace('-', '')}_{session_time}"
-            df['Date'] = now.strftime("%Y-%m-%d %H:%M:%S")
-            csv_content = df.to_csv(index=False)
+            encoding = compression.get_encoding()
+            # Komprimierte Artefakte werden kompakt geschrieben, Einrückung kostet nur Platz
+            json_indent = 2 if encoding == 'none' else None
+            json_content = json.dumps(result_data, indent=json_indent, ensure_ascii=False,
+                                      separators=None if json_indent else (',', ':'))
+            session_prefix = f"{DATA_PATHS['results_dir']}{self.session_path}"
+            json_key = session_prefix + compression.artifact_name("wsb_mentions.json", encoding)
+            artifacts = {json_key: compression.compress(json_content.encode('utf-8'), encoding)}
 
-            json_filename = "wsb_mentions.json"
-            csv_filename = "wsb_mentions.csv"
+            # Die CSV enthält dieselben Daten wie das JSON und wird nur auf Wunsch geschrieben
+            csv_key = None
+            if ARTIFACT_CONFIG['session_csv']:
+                df = pd.DataFrame(list(sorted_results.items()), columns=['Symbol', 'Mentions'])
+                df['Timestamp'] = f"{session_date.replace('-', '')}_{session_time}"
+                df['Date'] = now.strftime("%Y-%m-%d %H:%M:%S")
+                csv_key = session_prefix + compression.artifact_name("wsb_mentions.csv", encoding)
+                artifacts[csv_key] = compression.compress(df.to_csv(index=False).encode('utf-8'), encoding)
 
-            if STORAGE_CONFIG['type'] == 's3':
-                self.logger.info(f"Speichere Ergebnisse auf S3 in Session-Pfad: {self.session_path}")
-                base_path = DATA_PATHS['results_dir']
-                json_obj_name = f"{base_path}{self.session_path}{json_filename}"
-                csv_obj_name = f"{base_path}{self.session_path}{csv_filename}"
+            # Gemeinsame Erwähnungen als dünn besetzte Matrix (npz ist bereits komprimiert)
+            if not self.co_mentions.empty:
+                artifacts[session_prefix + "co_mentions.npz"] = self.co_mentions.to_bytes()
 
-                json_buffer = io.BytesIO(json_content.encode('utf-8'))
-                s3_handler.upload_file_obj(json_buffer, json_obj_name)
-                csv_buffer = io.BytesIO(csv_content.encode('utf-8'))
-                s3_handler.upload_file_obj(csv_buffer, csv_obj_name)
-                
-                self.logger.info(f"Ergebnisse auf S3 unter {json_obj_name} und {csv_obj_name} gespeichert")
-                
-                # Lade die Log-Datei hoch
+            metrics.add_time('save.serialize', time.perf_counter() - serialize_started)
+            metrics.count('bytes_written', sum(len(data) for data in artifacts.values()))
+
+            storage = get_storage_backend()
+            self.logger.info(f"Speichere Ergebnisse ({storage.name}) in Session-Pfad: {self.session_path}")
+            with metrics.phase('save.upload'):
+                saved = storage.put_many(artifacts)
+            if not saved.get(json_key):
+                self.logger.error(f"Fehler beim Speichern von {json_key}")
+                return None, None
+            self.logger.info(f"Ergebnisse unter {', '.join(artifacts)} gespeichert")
+            metrics.snapshot_memory('save')
+
+            # Spaltenbasierten Verlauf fortschreiben
+            with metrics.phase('save.history'):
+                HistoryStore(storage).append(result_data)
+
+            # Archiviere die Log-Datei in der Session
+            with metrics.phase('save.log_upload'):
                 self._upload_log_file(self.session_path)
 
-                return json_obj_name, csv_obj_name
-            else:
-                # Lokal speichern
-                local_session_dir = os.path.join(DATA_PATHS['results_dir'], self.session_path.replace('/', os.sep))
-                self.logger.info(f"Speichere Ergebnisse lokal in: {local_session_dir}")
-                os.makedirs(local_session_dir, exist_ok=True)
-                
-                local_json_path = os.path.join(local_session_dir, json_filename)
-                with open(local_json_path, 'w', encoding='utf-8') as f:
-                    f.write(json_content)
+            # Laufzeit-Metriken der Session als letztes Artefakt
+            if not storage.put(session_prefix + "metrics.json", metrics.to_json().encode('utf-8')):
+                self.logger.error("Fehler beim Speichern der Metriken.")
+            if metrics.memory:
+                # Speicher-Profil der Session (nur mit PROFILE_MEMORY=true)
+                metrics.memory.stop()
+                if not storage.put(session_prefix + "memory_profile.json", metrics.memory.to_json().encode('utf-8')):
+                    self.logger.error("Fehler beim Speichern des Speicher-Profils.")
+            metrics.mark_success()
 
-                local_csv_path = os.path.join(local_session_dir, csv_filename)
-                with open(local_csv_path, 'w', encoding='utf-8') as f:
-                    f.write(csv_content)
-                
-                self.logger.info(f"Ergebnisse lokal unter {local_json_path} und {local_csv_path} gespeichert")
-                return local_json_path, local_csv_path
+            return json_key, csv_key if csv_key and saved.get(csv_key) else None
 
         except Exception as e:
             self.logger.error(f"Fehler beim Speichern der Ergebnisse: {e}")
             return None, None
+        finally:
+            # Das Speicher-Profiling der Session endet mit dem Speichern, auch bei einem Fehler
+            self.metrics.close()
             
     def get_top_mentions(self, limit=20):
         """Gibt die Top-Erwähnungen zurück"""
         if not self.results:
             return []
             
-        sorted_results = sorted(self.results.items(), key=lambda x: x[1], reverse=True)
-        return sorted_results[:limit]
+        return self.results.top(limit)
         
     def get_crawl_summary(self):
         """Gibt eine Zusammenfassung des Crawling-Laufs zurück"""
@@ -270,7 +340,7 @@ class WSBStockCrawler:
             
         total_mentions = sum(self.results.values())
         unique_symbols = len(self.results)
-        top_symbol = max(self.results.items(), key=lambda x: x[1]) if self.results else None
+        top_symbol = self.results.top(1)[0]
         
         return {
             'total_mentions': total_mentions,
@@ -0,0 +1,152 @@
+"""
+Vorberechnete Aggregate (Rollups) der Erwähnungen je Symbol.
+Die Tabellen werden beim Hinzufügen neuer Sessions fortgeschrieben, sodass
+Abfragen wie Top-Symbole, Trends oder Tagesverläufe unabhängig von der Anzahl
+der Roh-Zeilen beantwortet werden.
+"""
+
+import io
+import logging
+import pandas as pd
+from topk import top_series
+
+logger = logging.getLogger(__name__)
+
+# Tabellenname -> Index-Ebenen. Zeitbezogene Tabellen sind nach Zeit zuerst sortiert,
+# damit Zeiträume als Slice gelesen werden können.
+TABLES = {
+    'symbol_hour': ['Hour', 'Symbol'],
+    'symbol_day': ['Date', 'Symbol'],
+    'symbol_day_sessions': ['Date', 'Symbol'],
+    'day_totals': ['Date'],
+    'symbol_totals': ['Symbol'],
+    'mention_counts': ['Mentions']
+}
+
+def _empty_table(levels):
+    if len(levels) == 1:
+        index = pd.Index([], name=levels[0])
+    else:
+        index = pd.MultiIndex.from_arrays([[]] * len(levels), names=levels)
+    return pd.Series([], index=index, dtype='int64')
+
+class SymbolRollups:
+    def __init__(self):
+        """Initialisiert leere Rollup-Tabellen."""
+        for name, levels in TABLES.items():
+            setattr(self, name, _empty_table(levels))
+
+    @classmethod
+    def from_frame(cls, frame):
+        """Erstellt die Rollups aus einer Fakt-Tabelle (Date, DateTime, Symbol, Mentions)."""
+        rollups = cls()
+        rollups.add(frame)
+        return rollups
+
+    @property
+    def empty(self):
+        return self.day_totals.empty
+
+    def add(self, frame):
+        """Schreibt die Rollups mit den Zeilen einer (neuen) Fakt-Tabelle fort."""
+        if frame is None or frame.empty:
+            return
+        symbols = frame['Symbol'].astype(str).rename('Symbol')
+        hours = frame['DateTime'].dt.floor('h').rename('Hour')
+        dates = frame['Date'].rename('Date')
+        mentions = frame['Mentions'].astype('int64')
+
+        parts = {
+            'symbol_hour': mentions.groupby([hours, symbols]).sum(),
+            'symbol_day': mentions.groupby([dates, symbols]).sum(),
+            'symbol_day_sessions': mentions.groupby([dates, symbols]).size(),
+            'day_totals': mentions.groupby(dates).sum(),
+            'symbol_totals': mentions.groupby(symbols).sum(),
+            'mention_counts': mentions.value_counts().rename_axis('Mentions')
+        }
+        self._merge_tables(parts)
+
+    def merge(self, other):
+        """Addiert die Tabellen anderer Rollups (z.B. eines gespeicherten Teilstands)."""
+        if other is not None and not other.empty:
+            self._merge_tables({name: getattr(other, name) for name in TABLES})
+
+    def _merge_tables(self, parts):
+        for name, values in parts.items():
+            current = getattr(self, name)
+            if not current.empty:
+                values = current.add(values, fill_value=0)
+            setattr(self, name, values.astype('int64').sort_index())
+
+    def top_symbols(self, limit=20, start_date=None):
+        """Top-Symbole nach Erwähnungen, optional nur ab start_date (inklusive)."""
+        if start_date is None:
+            totals = self.symbol_totals
+        else:
+            totals = self.symbol_day.loc[pd.Timestamp(start_date):].groupby(level='Symbol').sum()
+        return top_series(totals, limit).rename('Mentions').reset_index()
+
+    def daily_totals(self):
+        """Erwähnungen je Tag über alle Symbole."""
+        return self.day_totals.rename('Mentions').reset_index()
+
+    def daily_means(self, symbols):
+        """Mittlere Erwähnungen je Session, Symbol (Zeilen) und Tag (Spalten); fehlende Tage als 0."""
+        selected = self.symbol_day.index.get_level_values('Symbol').isin(symbols)
+        means = self.symbol_day[selected] / self.symbol_day_sessions[selected]
+        return means.unstack('Date', fill_value=0).sort_index()
+
+    def resample(self, symbols=None, freq='D', start=None, end=None):
+        """
+        Erwähnungen je Symbol (Zeilen) und Zeit-Bucket (Spalten) aus der Stundentabelle.
+        Buckets ohne Erwähnungen werden mit 0 gefüllt.
+
+        :param symbols: Liste von Symbolen oder None für alle
+        :param freq: pandas-Frequenz, mindestens eine Stunde (z.B. 'h', '4h', 'D', 'W')
+        :param start: Erste Stunde (inklusive) oder None
+        :param end: Letzte Stunde (inklusive) oder None
+        """
+        table = self.symbol_hour
+        if start is not None or end is not None:
+            table = table.loc[start:end]
+        if symbols is not None:
+            table = table[table.index.get_level_values('Symbol').isin(symbols)]
+        if table.empty:
+            return pd.DataFrame(index=pd.Index(symbols or [], name='Symbol'), dtype='int64')
+        matrix = table.unstack('Symbol', fill_value=0).resample(freq).sum().T
+        if symbols is not None:
+            matrix = matrix.reindex(symbols, fill_value=0)
+        matrix.columns.name = 'Bucket'
+        return matrix
+
+    def mention_distribution(self, limit=20):
+        """Häufigkeit der Erwähnungsanzahlen je Session und Symbol (wie value_counts)."""
+        return top_series(self.mention_counts, limit)
+
+    def save(self, storage, prefix):
+        """Speichert alle Tabellen als Parquet-Dateien unter dem Präfix."""
+        items = {}
+        for name in TABLES:
+            buffer = io.BytesIO()
+            getattr(self, name).rename('Value').reset_index().to_parquet(buffer, index=False)
+            items[f"{prefix}{name}.parquet"] = buffer.getvalue()
+        saved = storage.put_many(items)
+        if not all(saved.values()):
+            logger.error(f"Fehler beim Speichern der Rollups unter {prefix}.")
+            return False
+        return True
+
+    @classmethod
+    def load(cls, storage, prefix):
+        """Lädt gespeicherte Rollups oder gibt None zurück, wenn sie unvollständig sind."""
+        keys = {name: f"{prefix}{name}.parquet" for name in TABLES}
+        contents = storage.get_many(list(keys.values()))
+        if any(contents.get(key) is None for key in keys.values()):
+            return None
+        rollups = cls()
+        for name, levels in TABLES.items():
+            frame = pd.read_parquet(io.BytesIO(contents[keys[name]]))
+            for column in frame.select_dtypes(include=['datetime', 'datetimetz']):
+                frame[column] = frame[column].dt.as_unit('ns')
+            setattr(rollups, name, frame.set_index(levels)['Value'].astype('int64').rename(None))
+        return rollups
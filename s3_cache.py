@@ -0,0 +1,197 @@
+"""
+Lokaler Read-Through-Cache für S3-Artefakte.
+Objekte werden inhaltsadressiert (SHA-256) auf der Festplatte abgelegt und bei
+Überschreitung der Größengrenze nach LRU-Prinzip verdrängt.
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from config import CACHE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+class S3Cache:
+    def __init__(self, cache_dir=None, max_bytes=None, immutable_prefixes=None):
+        """Initialisiert den Cache im angegebenen Verzeichnis."""
+        self.cache_dir = cache_dir or CACHE_CONFIG['cache_dir']
+        self.max_bytes = max_bytes if max_bytes is not None else CACHE_CONFIG['max_bytes']
+        self.immutable_prefixes = tuple(immutable_prefixes if immutable_prefixes is not None
+                                        else CACHE_CONFIG['immutable_prefixes'])
+        self.objects_dir = os.path.join(self.cache_dir, 'objects')
+        self.index_path = os.path.join(self.cache_dir, 'index.json')
+        self._lock = threading.RLock()
+        self._dirty = False
+        os.makedirs(self.objects_dir, exist_ok=True)
+        # Objektname -> {'sha256', 'etag', 'size', 'last_access'}
+        self._index = self._load_index()
+        atexit.register(self.flush)
+
+    def _load_index(self):
+        """Lädt den Index vom Datenträger und verwirft Einträge ohne Blob."""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        return {key: entry for key, entry in index.items()
+                if os.path.exists(self._blob_path(entry['sha256']))}
+
+    def _blob_path(self, sha256):
+        return os.path.join(self.objects_dir, sha256[:2], sha256)
+
+    def flush(self):
+        """Schreibt den Index atomar auf den Datenträger, falls er geändert wurde."""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(self._index, f)
+                os.replace(tmp_path, self.index_path)
+                self._dirty = False
+            except OSError as e:
+                logger.warning(f"Cache-Index konnte nicht geschrieben werden: {e}")
+
+    def is_immutable(self, object_name):
+        """Session-Artefakte ändern sich nach dem Schreiben nicht mehr."""
+        return object_name.startswith(self.immutable_prefixes)
+
+    def lookup(self, object_name):
+        """Gibt den Cache-Eintrag für ein Objekt zurück oder None."""
+        with self._lock:
+            entry = self._index.get(object_name)
+            if entry and not os.path.exists(self._blob_path(entry['sha256'])):
+                del self._index[object_name]
+                self._dirty = True
+                return None
+            return entry
+
+    def _touch(self, object_name):
+        self._index[object_name]['last_access'] = time.time()
+        self._dirty = True
+
+    def read(self, object_name):
+        """Liest den Inhalt eines gecachten Objekts als Bytes oder None."""
+        with self._lock:
+            entry = self.lookup(object_name)
+            if not entry:
+                return None
+            self._touch(object_name)
+            blob_path = self._blob_path(entry['sha256'])
+        with open(blob_path, 'rb') as f:
+            return f.read()
+
+    def open(self, object_name):
+        """Öffnet ein gecachtes Objekt als binären Stream oder gibt None zurück."""
+        with self._lock:
+            entry = self.lookup(object_name)
+            if not entry:
+                return None
+            self._touch(object_name)
+            return open(self._blob_path(entry['sha256']), 'rb')
+
+    def copy_to(self, object_name, file_name):
+        """Kopiert ein gecachtes Objekt an einen lokalen Pfad. Gibt True bei Erfolg zurück."""
+        with self._lock:
+            entry = self.lookup(object_name)
+            if not entry:
+                return False
+            self._touch(object_name)
+            blob_path = self._blob_path(entry['sha256'])
+        shutil.copyfile(blob_path, file_name)
+        return True
+
+    def store(self, object_name, data, etag=None):
+        """Legt den Inhalt eines Objekts im Cache ab."""
+        sha256 = hashlib.sha256(data).hexdigest()
+        blob_path = self._blob_path(sha256)
+        if not os.path.exists(blob_path):
+            self._write_blob(blob_path, lambda f: f.write(data))
+        self._register(object_name, sha256, len(data), etag)
+
+    def store_file(self, object_name, file_name, etag=None):
+        """Legt eine bereits heruntergeladene Datei im Cache ab."""
+        digest = hashlib.sha256()
+        with open(file_name, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        sha256 = digest.hexdigest()
+        blob_path = self._blob_path(sha256)
+        if not os.path.exists(blob_path):
+            with open(file_name, 'rb') as src:
+                self._write_blob(blob_path, lambda f: shutil.copyfileobj(src, f))
+        self._register(object_name, sha256, os.path.getsize(blob_path), etag)
+
+    def _write_blob(self, blob_path, writer):
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(blob_path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            writer(f)
+        os.replace(tmp_path, blob_path)
+
+    def _register(self, object_name, sha256, size, etag):
+        with self._lock:
+            self._index[object_name] = {
+                'sha256': sha256,
+                'etag': etag,
+                'size': size,
+                'last_access': time.time()
+            }
+            self._dirty = True
+            self._evict()
+            self.flush()
+
+    def invalidate(self, object_name):
+        """Entfernt ein Objekt aus dem Cache, z.B. nach einem Überschreiben."""
+        with self._lock:
+            entry = self._index.pop(object_name, None)
+            if entry is not None:
+                self._dirty = True
+                if all(e['sha256'] != entry['sha256'] for e in self._index.values()):
+                    self._remove_blob(entry['sha256'])
+                self.flush()
+
+    def _blob_sizes(self):
+        sizes = {}
+        for entry in self._index.values():
+            sizes[entry['sha256']] = entry['size']
+        return sizes
+
+    def _remove_blob(self, sha256):
+        try:
+            os.remove(self._blob_path(sha256))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        """Verdrängt die am längsten nicht genutzten Einträge bis zur Größengrenze."""
+        total = sum(self._blob_sizes().values())
+        if total <= self.max_bytes:
+            return
+        refcounts = {}
+        for entry in self._index.values():
+            refcounts[entry['sha256']] = refcounts.get(entry['sha256'], 0) + 1
+        for object_name, entry in sorted(self._index.items(), key=lambda x: x[1]['last_access']):
+            if total <= self.max_bytes:
+                break
+            del self._index[object_name]
+            sha256 = entry['sha256']
+            refcounts[sha256] -= 1
+            if refcounts[sha256] == 0:
+                total -= entry['size']
+                self._remove_blob(sha256)
+            logger.info(f"Cache-Eintrag {object_name} verdrängt.")
+        self._dirty = True
+
+    def total_size(self):
+        """Gesamtgröße aller gecachten Blobs in Bytes."""
+        with self._lock:
+            return sum(self._blob_sizes().values())
@@ -4,15 +4,87 @@ Stellt Funktionen zum Hochladen, Herunterladen und Auflisten von Dateien bereit.
 """
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import NoCredentialsError, PartialCredentialsError, ClientError
 import logging
 import os
-from config import S3_CONFIG
+import threading
+import time
+from collections import deque
+from config import S3_CONFIG, CACHE_CONFIG
+from s3_cache import S3Cache
+import compression
+from metrics import get_metrics
 
 # Konfiguriere das Logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+_cache = None
+
+def get_cache():
+    """Gibt den lokalen S3-Cache zurück oder None, wenn er deaktiviert ist."""
+    global _cache
+    if not CACHE_CONFIG['enabled']:
+        return None
+    if _cache is None:
+        _cache = S3Cache()
+    return _cache
+
+def _invalidate_cache(object_name):
+    """Verwirft den Cache-Eintrag eines Objekts, das überschrieben wird."""
+    cache = get_cache()
+    if cache:
+        cache.invalidate(object_name)
+
+def _is_not_modified(error):
+    """Prüft, ob ein ClientError eine 304-Antwort auf If-None-Match ist."""
+    return error.response.get('Error', {}).get('Code') in ('304', 'NotModified')
+
+# Die letzten Transfers mit Durchsatz, z.B. zur Anzeige in der UI
+transfer_history = deque(maxlen=100)
+
+def get_transfer_config():
+    """Erstellt die TransferConfig aus dem Transferprofil in S3_CONFIG."""
+    profile = S3_CONFIG.get('transfer', {})
+    return TransferConfig(
+        multipart_threshold=profile.get('multipart_threshold', 8 * 1024 * 1024),
+        multipart_chunksize=profile.get('multipart_chunksize', 8 * 1024 * 1024),
+        max_concurrency=profile.get('max_concurrency', 10),
+        use_threads=profile.get('use_threads', True)
+    )
+
+class _TransferProgress:
+    """Zählt übertragene Bytes; boto3 ruft den Callback aus mehreren Threads auf."""
+    def __init__(self):
+        self.bytes_transferred = 0
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, bytes_amount):
+        with self._lock:
+            self.bytes_transferred += bytes_amount
+
+    def report(self, direction, object_name):
+        """Loggt den Durchsatz des Transfers und merkt ihn in transfer_history vor."""
+        elapsed = time.perf_counter() - self.started
+        throughput = self.bytes_transferred / elapsed if elapsed > 0 else 0.0
+        stats = {
+            'direction': direction,
+            'object_name': object_name,
+            'bytes': self.bytes_transferred,
+            'seconds': round(elapsed, 4),
+            'bytes_per_second': round(throughput, 1)
+        }
+        transfer_history.append(stats)
+        metrics = get_metrics()
+        metrics.add_time(f"s3.{direction}", elapsed)
+        metrics.count('s3_requests')
+        metrics.count(f"s3_bytes_{direction}ed", self.bytes_transferred)
+        logger.info(f"{direction.capitalize()} {object_name}: {self.bytes_transferred / 1024 / 1024:.2f} MB "
+                    f"in {elapsed:.2f} s ({throughput / 1024 / 1024:.2f} MB/s)")
+        return stats
+
 def _get_bucket_name_from_arn(arn):
     """Extrahiert den Bucket-Namen aus einem S3-ARN."""
     try:
@@ -21,8 +93,29 @@ def _get_bucket_name_from_arn(arn):
         logger.warning(f"Ungültiger S3-ARN: {arn}. Verwende den Wert direkt.")
         return arn
 
-def get_s3_client():
-    """Erstellt und gibt einen S3-Client zurück."""
+_clients = {}
+_clients_lock = threading.Lock()
+
+def get_s3_client(refresh=False):
+    """
+    Gibt einen S3-Client für die aktuellen Zugangsdaten zurück.
+    Der Client wird je Zugangsdaten einmal erstellt und geprüft und danach wiederverwendet
+    (boto3-Clients sind threadsicher). Mit refresh=True wird die Verbindung neu geprüft;
+    schlägt die Prüfung fehl, wird der bisherige Client verworfen.
+    """
+    key = (S3_CONFIG['aws_access_key_id'], S3_CONFIG['aws_secret_access_key'], S3_CONFIG['region_name'])
+    with _clients_lock:
+        s3_client = None if refresh else _clients.get(key)
+        if s3_client is None:
+            s3_client = _create_s3_client()
+            if s3_client is not None:
+                _clients[key] = s3_client
+            else:
+                _clients.pop(key, None)
+        return s3_client
+
+def _create_s3_client():
+    """Erstellt einen S3-Client und prüft die Verbindung."""
     try:
         s3_client = boto3.client(
             's3',
@@ -53,12 +146,13 @@ def get_s3_client():
         logger.error(f"Ein unerwarteter Fehler ist beim Verbinden mit S3 aufgetreten: {e}")
         return None
 
-def upload_file(file_name, object_name=None):
+def upload_file(file_name, object_name=None, extra_args=None):
     """
     Lädt eine Datei in einen S3-Bucket hoch.
 
     :param file_name: Pfad zur hochzuladenden Datei
     :param object_name: S3-Objektname. Wenn nicht angegeben, wird file_name verwendet.
+    :param extra_args: Zusätzliche Objekt-Metadaten, z.B. ContentEncoding
     :return: True bei Erfolg, sonst False
     """
     if object_name is None:
@@ -76,8 +170,12 @@ def upload_file(file_name, object_name=None):
 
     try:
         logger.info(f"Lade {file_name} in Bucket {bucket_name} als {object_name} hoch...")
-        s3_client.upload_file(file_name, bucket_name, object_name)
+        _invalidate_cache(object_name)
+        progress = _TransferProgress()
+        s3_client.upload_file(file_name, bucket_name, object_name, ExtraArgs=extra_args,
+                              Callback=progress, Config=get_transfer_config())
         logger.info(f"Upload von {file_name} erfolgreich.")
+        progress.report('upload', object_name)
     except FileNotFoundError:
         logger.error(f"Die Datei {file_name} wurde nicht gefunden.")
         return False
@@ -92,12 +190,43 @@ def upload_file(file_name, object_name=None):
         return False
     return True
 
-def upload_file_obj(file_obj, object_name):
+def delete_file(object_name):
+    """
+    Löscht ein Objekt aus dem S3-Bucket.
+
+    :param object_name: S3-Objektname
+    :return: True bei Erfolg (auch wenn das Objekt nicht existierte), sonst False
+    """
+    s3_client = get_s3_client()
+    if not s3_client:
+        return False
+
+    bucket_arn = S3_CONFIG.get('bucket_name')
+    if not bucket_arn:
+        logger.error("S3-Bucket-Name ist nicht konfiguriert.")
+        return False
+    bucket_name = _get_bucket_name_from_arn(bucket_arn)
+
+    try:
+        logger.info(f"Lösche {object_name} aus Bucket {bucket_name}...")
+        _invalidate_cache(object_name)
+        get_metrics().count('s3_requests')
+        s3_client.delete_object(Bucket=bucket_name, Key=object_name)
+        return True
+    except ClientError as e:
+        logger.error(f"Fehler beim Löschen der Datei: {e}")
+        return False
+    except Exception as e:
+        logger.error(f"Ein unerwarteter Fehler ist aufgetreten: {e}")
+        return False
+
+def upload_file_obj(file_obj, object_name, extra_args=None):
     """
     Lädt ein Datei-ähnliches Objekt in einen S3-Bucket hoch.
 
     :param file_obj: Das Datei-ähnliche Objekt (z.B. io.BytesIO)
     :param object_name: S3-Objektname.
+    :param extra_args: Zusätzliche Objekt-Metadaten, z.B. ContentEncoding
     :return: True bei Erfolg, sonst False
     """
     s3_client = get_s3_client()
@@ -112,8 +241,12 @@ def upload_file_obj(file_obj, object_name):
 
     try:
         logger.info(f"Lade Datei-Objekt in Bucket {bucket_name} als {object_name} hoch...")
-        s3_client.upload_fileobj(file_obj, bucket_name, object_name)
+        _invalidate_cache(object_name)
+        progress = _TransferProgress()
+        s3_client.upload_fileobj(file_obj, bucket_name, object_name, ExtraArgs=extra_args,
+                                 Callback=progress, Config=get_transfer_config())
         logger.info(f"Upload des Datei-Objekts erfolgreich.")
+        progress.report('upload', object_name)
     except NoCredentialsError:
         logger.error("Anmeldeinformationen nicht verfügbar.")
         return False
@@ -136,6 +269,13 @@ def download_file(object_name, file_name=None):
     """
     if file_name is None:
         file_name = os.path.basename(object_name)
+
+    cache = get_cache()
+    entry = cache.lookup(object_name) if cache else None
+    if entry and cache.is_immutable(object_name) and cache.copy_to(object_name, file_name):
+        logger.info(f"{object_name} aus dem lokalen Cache geladen.")
+        get_metrics().count('s3_cache_hits')
+        return True
         
     s3_client = get_s3_client()
     if not s3_client:
@@ -148,8 +288,30 @@ def download_file(object_name, file_name=None):
     bucket_name = _get_bucket_name_from_arn(bucket_arn)
 
     try:
+        etag = None
+        if cache:
+            # Revalidiere per ETag, bevor die Datei erneut übertragen wird. Ändert sich das
+            # Objekt zwischen HEAD und Download, passt das gespeicherte ETag nicht zum Inhalt;
+            # die nächste Revalidierung lädt die Datei dann einmal zu viel, nie veraltet.
+            head_kwargs = {'IfNoneMatch': entry['etag']} if entry and entry.get('etag') else {}
+            get_metrics().count('s3_requests')
+            try:
+                with get_metrics().phase('s3.head'):
+                    etag = s3_client.head_object(Bucket=bucket_name, Key=object_name, **head_kwargs).get('ETag')
+            except ClientError as e:
+                if entry and _is_not_modified(e) and cache.copy_to(object_name, file_name):
+                    logger.info(f"{object_name} unverändert, aus dem lokalen Cache geladen.")
+                    get_metrics().count('s3_cache_hits')
+                    return True
+                raise
+
         logger.info(f"Lade {object_name} aus Bucket {bucket_name} nach {file_name} herunter...")
-        s3_client.download_file(bucket_name, object_name, file_name)
+        progress = _TransferProgress()
+        s3_client.download_file(bucket_name, object_name, file_name,
+                                Callback=progress, Config=get_transfer_config())
+        progress.report('download', object_name)
+        if cache:
+            cache.store_file(object_name, file_name, etag)
         logger.info(f"Download von {object_name} erfolgreich.")
     except ClientError as e:
         if e.response['Error']['Code'] == "404":
@@ -181,9 +343,14 @@ def list_files(prefix=''):
         
     try:
         logger.info(f"Liste Dateien im Bucket {bucket_name} mit Präfix '{prefix}' auf...")
-        response = s3_client.list_objects_v2(Bucket=bucket_name, Prefix=prefix)
-        if 'Contents' in response:
-            files = [item['Key'] for item in response['Contents']]
+        # list_objects_v2 liefert maximal 1000 Objekte pro Seite
+        paginator = s3_client.get_paginator('list_objects_v2')
+        files = []
+        metrics = get_metrics()
+        for page in metrics.iterate(paginator.paginate(Bucket=bucket_name, Prefix=prefix), 's3.list'):
+            metrics.count('s3_requests')
+            files.extend(item['Key'] for item in page.get('Contents', []))
+        if files:
             logger.info(f"{len(files)} Dateien gefunden.")
             return files
         else:
@@ -241,13 +408,36 @@ def list_sessions(base_prefix):
     logger.info(f"{len(sorted_sessions)} eindeutige Sessions gefunden.")
     return sorted_sessions
 
-def get_file_content(object_name):
+def get_file_content(object_name, as_bytes=False):
     """
     Liest den Inhalt einer Datei aus S3 als String.
+    Komprimierte Artefakte (gzip/zstd) werden transparent dekodiert.
 
     :param object_name: S3-Objektname
-    :return: Dateiinhalt als String oder None bei Fehler
+    :param as_bytes: Gibt die (dekomprimierten) Bytes ohne UTF-8-Dekodierung zurück
+    :return: Dateiinhalt als String bzw. Bytes oder None bei Fehler
     """
+    data = get_object_bytes(object_name)
+    if data is None:
+        return None
+    return compression.decompress(data) if as_bytes else compression.decode_text(data)
+
+def get_object_bytes(object_name):
+    """
+    Liest die gespeicherten Bytes einer Datei aus S3, ohne sie zu dekomprimieren.
+
+    :param object_name: S3-Objektname
+    :return: Dateiinhalt als Bytes oder None bei Fehler
+    """
+    cache = get_cache()
+    entry = cache.lookup(object_name) if cache else None
+    if entry and cache.is_immutable(object_name):
+        data = cache.read(object_name)
+        if data is not None:
+            logger.info(f"Inhalt von {object_name} aus dem lokalen Cache gelesen.")
+            get_metrics().count('s3_cache_hits')
+            return data
+
     s3_client = get_s3_client()
     if not s3_client:
         return None
@@ -260,10 +450,26 @@ def get_file_content(object_name):
 
     try:
         logger.info(f"Lese Inhalt von {object_name} aus Bucket {bucket_name}...")
-        response = s3_client.get_object(Bucket=bucket_name, Key=object_name)
-        content = response['Body'].read().decode('utf-8', errors='ignore')
+        get_kwargs = {'IfNoneMatch': entry['etag']} if entry and entry.get('etag') else {}
+        metrics = get_metrics()
+        metrics.count('s3_requests')
+        try:
+            with metrics.phase('s3.get_object'):
+                response = s3_client.get_object(Bucket=bucket_name, Key=object_name, **get_kwargs)
+                data = response['Body'].read()
+        except ClientError as e:
+            if entry and _is_not_modified(e):
+                data = cache.read(object_name)
+                if data is not None:
+                    logger.info(f"{object_name} unverändert, aus dem lokalen Cache gelesen.")
+                    metrics.count('s3_cache_hits')
+                    return data
+            raise
+        metrics.count('s3_bytes_downloaded', len(data))
+        if cache:
+            cache.store(object_name, data, response.get('ETag'))
         logger.info(f"Inhalt von {object_name} erfolgreich gelesen.")
-        return content
+        return data
     except ClientError as e:
         if e.response['Error']['Code'] == "NoSuchKey":
             logger.error(f"Das Objekt {object_name} existiert nicht im Bucket {bucket_name}.")
@@ -273,3 +479,105 @@ def get_file_content(object_name):
     except Exception as e:
         logger.error(f"Ein unerwarteter Fehler ist aufgetreten: {e}")
         return None
+
+def open_stream(object_name, binary=False):
+    """
+    Öffnet eine Datei aus S3 als Stream, ohne sie vollständig in den Speicher zu laden.
+    Komprimierte Artefakte werden beim Lesen dekomprimiert. Der Aufrufer muss den
+    Stream schließen, damit die HTTP-Verbindung freigegeben wird.
+
+    :param object_name: S3-Objektname
+    :param binary: Gibt einen binären statt eines UTF-8-Text-Streams zurück
+    :return: Datei-ähnliches Objekt oder None bei Fehler
+    """
+    cache = get_cache()
+    if cache and cache.is_immutable(object_name):
+        cached_file = cache.open(object_name)
+        if cached_file is not None:
+            logger.info(f"Öffne {object_name} aus dem lokalen Cache.")
+            return compression.open_decompressed(cached_file) if binary else compression.open_text(cached_file)
+
+    s3_client = get_s3_client()
+    if not s3_client:
+        return None
+
+    bucket_arn = S3_CONFIG.get('bucket_name')
+    if not bucket_arn:
+        logger.error("S3-Bucket-Name ist nicht konfiguriert.")
+        return None
+    bucket_name = _get_bucket_name_from_arn(bucket_arn)
+
+    try:
+        logger.info(f"Öffne Stream auf {object_name} in Bucket {bucket_name}...")
+        response = s3_client.get_object(Bucket=bucket_name, Key=object_name)
+        body = response['Body']
+        return compression.open_decompressed(body) if binary else compression.open_text(body)
+    except ClientError as e:
+        if e.response['Error']['Code'] == "NoSuchKey":
+            logger.error(f"Das Objekt {object_name} existiert nicht im Bucket {bucket_name}.")
+        else:
+            logger.error(f"Fehler beim Öffnen der Datei: {e}")
+        return None
+    except Exception as e:
+        logger.error(f"Ein unerwarteter Fehler ist aufgetreten: {e}")
+        return None
+
+def iter_lines(object_name):
+    """
+    Liest eine Datei aus S3 zeilenweise, ohne sie vollständig in den Speicher zu laden.
+
+    :param object_name: S3-Objektname
+    :return: Generator über die Zeilen ohne Zeilenumbruch
+    """
+    stream = open_stream(object_name)
+    if stream is None:
+        return
+    with stream:
+        for line in stream:
+            yield line.rstrip('\r\n')
+
+def get_file_range(object_name, start=0, end=None, as_bytes=False):
+    """
+    Liest einen Byte-Bereich einer Datei aus S3, z.B. den Kopf oder das Ende eines Logs.
+    Ein negativer Start liest die letzten -start Bytes. Bereiche beziehen sich auf die
+    gespeicherten Bytes und sind daher nur für unkomprimierte Dateien sinnvoll.
+
+    :param object_name: S3-Objektname
+    :param start: Erstes Byte (inklusive) oder negative Länge für das Dateiende
+    :param end: Letztes Byte (inklusive). None liest bis zum Dateiende.
+    :param as_bytes: Gibt Bytes statt eines Strings zurück
+    :return: Inhalt des Bereichs oder None bei Fehler
+    """
+    if start < 0:
+        byte_range = f"bytes={start}"
+    else:
+        byte_range = f"bytes={start}-{end if end is not None else ''}"
+
+    s3_client = get_s3_client()
+    if not s3_client:
+        return None
+
+    bucket_arn = S3_CONFIG.get('bucket_name')
+    if not bucket_arn:
+        logger.error("S3-Bucket-Name ist nicht konfiguriert.")
+        return None
+    bucket_name = _get_bucket_name_from_arn(bucket_arn)
+
+    try:
+        logger.info(f"Lese Bereich {byte_range} von {object_name} aus Bucket {bucket_name}...")
+        response = s3_client.get_object(Bucket=bucket_name, Key=object_name, Range=byte_range)
+        data = response['Body'].read()
+        return data if as_bytes else data.decode('utf-8', errors='ignore')
+    except ClientError as e:
+        error_code = e.response['Error']['Code']
+        if error_code == "NoSuchKey":
+            logger.error(f"Das Objekt {object_name} existiert nicht im Bucket {bucket_name}.")
+        elif error_code == "InvalidRange":
+            # Leere Datei oder Start hinter dem Dateiende
+            return b'' if as_bytes else ''
+        else:
+            logger.error(f"Fehler beim Lesen des Bereichs: {e}")
+        return None
+    except Exception as e:
+        logger.error(f"Ein unerwarteter Fehler ist aufgetreten: {e}")
+        return None
@@ -0,0 +1,96 @@
+"""
+Paralleles Laden und Parsen der Session-Ergebnisse (wsb_mentions.json).
+Lokale Dateien werden direkt in den Worker-Prozessen gelesen, dekomprimiert und
+geparst; bei entfernten Backends werden die Bytes gebündelt geladen und
+anschließend parallel geparst. Ist orjson installiert, wird es zum Parsen verwendet.
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from config import LOADER_CONFIG
+import compression
+from storage import get_storage_backend, LocalStorageBackend
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+def parse_json(data):
+    """Parst JSON-Bytes, bevorzugt mit orjson."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _parse_bytes(data):
+    """Worker: dekomprimiert und parst ein Artefakt. Gibt (Ergebnis, Fehler) zurück."""
+    if data is None:
+        return None, "Datei konnte nicht gelesen werden."
+    try:
+        return parse_json(compression.decompress(data)), None
+    except Exception as e:
+        return None, str(e)
+
+def _parse_file(path):
+    """Worker: liest, dekomprimiert und parst eine lokale Datei."""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        return None, str(e)
+    return _parse_bytes(data)
+
+def _executor_for(executor, max_workers):
+    if executor == 'process':
+        # 'spawn' statt 'fork': die aufrufenden Prozesse (Streamlit, Tkinter, Analyse) haben
+        # bereits Threads und Locks, die ein geforkter Worker in undefiniertem Zustand erben würde
+        return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+    return ThreadPoolExecutor(max_workers=max_workers)
+
+def load_sessions(keys, storage=None, executor=None, max_workers=None):
+    """
+    Lädt und parst mehrere Session-Ergebnisse parallel.
+
+    :param keys: Schlüssel der wsb_mentions.json-Artefakte
+    :param storage: Speicher-Backend (Standard: konfiguriertes Backend)
+    :param executor: 'process', 'thread' oder 'serial' (Standard: LOADER_CONFIG)
+    :return: Dict Schlüssel -> geparstes Ergebnis, in der Reihenfolge der Schlüssel;
+             nicht lesbare Artefakte werden geloggt und ausgelassen
+    """
+    keys = list(keys)
+    storage = storage or get_storage_backend()
+    executor = executor or LOADER_CONFIG['executor']
+    max_workers = max_workers or LOADER_CONFIG['max_workers'] or os.cpu_count()
+    if len(keys) < LOADER_CONFIG['min_parallel'] or max_workers < 2:
+        executor = 'serial'
+
+    is_local = isinstance(storage, LocalStorageBackend)
+    if is_local:
+        worker, items = _parse_file, [storage.path_for(key) for key in keys]
+    else:
+        # Entfernte Backends laden die Bytes selbst parallel (z.B. S3 im Thread-Pool)
+        contents = storage.get_many(keys)
+        worker, items = _parse_bytes, [contents.get(key) for key in keys]
+
+    if executor == 'serial':
+        parsed = list(map(worker, items))
+    else:
+        chunksize = max(1, min(LOADER_CONFIG['chunksize'], len(items) // (max_workers * 4) or 1))
+        with _executor_for(executor, max_workers) as pool:
+            if executor == 'process':
+                parsed = list(pool.map(worker, items, chunksize=chunksize))
+            else:
+                parsed = list(pool.map(worker, items))
+
+    results = {}
+    for key, (result, error) in zip(keys, parsed):
+        if error is not None:
+            logger.error(f"Fehler beim Laden von {key}: {error}")
+            continue
+        results[key] = result
+    return results
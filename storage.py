@@ -0,0 +1,306 @@
+"""
+Speicher-Backends für Session- und Analyse-Artefakte.
+Crawler, Analyzer und UIs arbeiten gegen die StorageBackend-Schnittstelle;
+Schlüssel sind relative Pfade wie 'data/results/2025-07-07/210032/wsb_mentions.json.gz'
+und sind für alle Backends identisch.
+"""
+
+import abc
+import io
+import logging
+import mimetypes
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import STORAGE_CONFIG
+import compression
+from metrics import registry, bind_metrics
+
+logger = logging.getLogger(__name__)
+
+# Session-Verzeichnisse haben das Format 'YYYY-MM-DD/HHMMSS/'
+SESSION_PATTERN = re.compile(r'^(\d{4}-\d{2}-\d{2}/\d{6}/)')
+
+class StorageBackend(abc.ABC):
+    """Basisklasse für Speicher-Backends. Fehler werden geloggt, nicht geworfen."""
+    name = None
+
+    @abc.abstractmethod
+    def put(self, key, data):
+        """Speichert Bytes unter einem Schlüssel. Gibt True bei Erfolg zurück."""
+        raise NotImplementedError
+
+    def put_file(self, key, file_name):
+        """Speichert eine lokale Datei unter einem Schlüssel."""
+        with open(file_name, 'rb') as f:
+            return self.put(key, f.read())
+
+    @abc.abstractmethod
+    def get(self, key):
+        """Liest die gespeicherten Bytes eines Schlüssels oder None."""
+        raise NotImplementedError
+
+    def get_range(self, key, start=0, end=None):
+        """Liest einen Byte-Bereich. Ein negativer Start liest die letzten -start Bytes."""
+        data = self.get(key)
+        if data is None:
+            return None
+        if start < 0:
+            return data[start:]
+        return data[start:None if end is None else end + 1]
+
+    def open(self, key, binary=False):
+        """Öffnet einen Schlüssel als (dekomprimierenden) Stream oder gibt None zurück."""
+        data = self.get(key)
+        if data is None:
+            return None
+        stream = io.BytesIO(data)
+        return compression.open_decompressed(stream) if binary else compression.open_text(stream)
+
+    @abc.abstractmethod
+    def list(self, prefix=''):
+        """Listet alle Schlüssel mit dem Präfix auf. Gibt None bei Fehler zurück."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def delete(self, key):
+        """Löscht einen Schlüssel. Gibt True zurück, auch wenn er nicht existierte."""
+        raise NotImplementedError
+
+    def exists(self, key):
+        return self.get(key) is not None
+
+    def put_many(self, items):
+        """Speichert mehrere Schlüssel. Gibt ein Dict Schlüssel -> Erfolg zurück."""
+        return {key: self.put(key, data) for key, data in items.items()}
+
+    def get_many(self, keys):
+        """Liest mehrere Schlüssel. Gibt ein Dict Schlüssel -> Bytes (oder None) zurück."""
+        return {key: self.get(key) for key in keys}
+
+    def list_sessions(self, base_prefix):
+        """Listet alle Session-Pfade ('YYYY-MM-DD/HHMMSS/') unter einem Präfix, neueste zuerst."""
+        keys = self.list(base_prefix) or []
+        sessions = set()
+        for key in keys:
+            match = SESSION_PATTERN.match(key[len(base_prefix):])
+            if match:
+                sessions.add(match.group(1))
+        return sorted(sessions, reverse=True)
+
+class LocalStorageBackend(StorageBackend):
+    """Speichert Artefakte im lokalen Dateisystem relativ zu einem Basisverzeichnis."""
+    name = 'local'
+
+    def __init__(self, root=None):
+        self.root = root if root is not None else STORAGE_CONFIG['local_root']
+
+    def path_for(self, key):
+        return os.path.join(self.root, key.replace('/', os.sep))
+
+    def put(self, key, data):
+        path = self.path_for(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(data)
+            return True
+        except OSError as e:
+            logger.error(f"Fehler beim lokalen Speichern von {key}: {e}")
+            return False
+
+    def put_file(self, key, file_name):
+        path = self.path_for(key)
+        if os.path.abspath(path) == os.path.abspath(file_name):
+            return True
+        return super().put_file(key, file_name)
+
+    def get(self, key):
+        try:
+            with open(self.path_for(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.error(f"Fehler beim lokalen Lesen von {key}: {e}")
+            return None
+
+    def get_range(self, key, start=0, end=None):
+        try:
+            with open(self.path_for(key), 'rb') as f:
+                if start < 0:
+                    f.seek(0, os.SEEK_END)
+                    f.seek(max(0, f.tell() + start))
+                    return f.read()
+                f.seek(start)
+                return f.read() if end is None else f.read(end - start + 1)
+        except FileNotFoundError:
+            return None
+
+    def open(self, key, binary=False):
+        try:
+            return compression.open_local(self.path_for(key), binary=binary)
+        except FileNotFoundError:
+            return None
+
+    def exists(self, key):
+        return os.path.isfile(self.path_for(key))
+
+    def delete(self, key):
+        try:
+            os.remove(self.path_for(key))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"Fehler beim lokalen Löschen von {key}: {e}")
+            return False
+        return True
+
+    def list(self, prefix=''):
+        # Nur das Verzeichnis des Präfixes durchsuchen, nicht das gesamte Basisverzeichnis
+        prefix_dir = prefix.rsplit('/', 1)[0] if '/' in prefix else ''
+        search_root = self.path_for(prefix_dir) if prefix_dir else self.root
+        keys = []
+        for dirpath, _, filenames in os.walk(search_root):
+            rel_dir = os.path.relpath(dirpath, self.root).replace(os.sep, '/')
+            rel_dir = '' if rel_dir == '.' else rel_dir + '/'
+            for filename in filenames:
+                key = rel_dir + filename
+                if key.startswith(prefix):
+                    keys.append(key)
+        return sorted(keys)
+
+class S3StorageBackend(StorageBackend):
+    """Speichert Artefakte in S3 über das s3_handler-Modul."""
+    name = 's3'
+
+    def __init__(self, max_workers=None):
+        import s3_handler
+        self.s3 = s3_handler
+        self.max_workers = max_workers or STORAGE_CONFIG['max_workers']
+
+    def _extra_args(self, key):
+        # Content-Type und -Encoding werden aus dem Schlüssel abgeleitet
+        content_type, _ = mimetypes.guess_type(compression.strip_suffix(key))
+        encoding = compression.encoding_from_name(key)
+        return compression.s3_extra_args(encoding, content_type) or None
+
+    def put(self, key, data):
+        return self.s3.upload_file_obj(io.BytesIO(data), key, extra_args=self._extra_args(key))
+
+    def put_file(self, key, file_name):
+        return self.s3.upload_file(file_name, key, extra_args=self._extra_args(key))
+
+    def get(self, key):
+        return self.s3.get_object_bytes(key)
+
+    def get_range(self, key, start=0, end=None):
+        return self.s3.get_file_range(key, start=start, end=end, as_bytes=True)
+
+    def open(self, key, binary=False):
+        return self.s3.open_stream(key, binary=binary)
+
+    def list(self, prefix=''):
+        return self.s3.list_files(prefix=prefix)
+
+    def delete(self, key):
+        return self.s3.delete_file(key)
+
+    def list_sessions(self, base_prefix):
+        return self.s3.list_sessions(base_prefix)
+
+    def _tracked(self, fn):
+        """
+        Führt fn (in den Metriken des Aufrufers) aus und hält die Anzahl ausstehender
+        Transfers im Gauge aktuell.
+        """
+        fn = bind_metrics(fn)
+
+        def _run(*args):
+            try:
+                return fn(*args)
+            finally:
+                registry.add_gauge('queue_depth', -1, queue='s3_transfers')
+        return _run
+
+    def put_many(self, items):
+        registry.add_gauge('queue_depth', len(items), queue='s3_transfers')
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = executor.map(self._tracked(lambda item: self.put(*item)), items.items())
+            return dict(zip(items.keys(), results))
+
+    def get_many(self, keys):
+        keys = list(keys)
+        registry.add_gauge('queue_depth', len(keys), queue='s3_transfers')
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return dict(zip(keys, executor.map(self._tracked(self.get), keys)))
+
+class MemoryStorageBackend(StorageBackend):
+    """
+    Flüchtiger In-Memory-Speicher als Stand-in für S3, z.B. für Offline-Benchmarks.
+    Mit latency lässt sich eine feste Verzögerung pro Anfrage simulieren.
+    """
+    name = 'memory'
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.objects = {}
+        self._lock = threading.Lock()
+
+    def _simulate_latency(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def put(self, key, data):
+        self._simulate_latency()
+        with self._lock:
+            self.objects[key] = bytes(data)
+        return True
+
+    def get(self, key):
+        self._simulate_latency()
+        with self._lock:
+            return self.objects.get(key)
+
+    def exists(self, key):
+        with self._lock:
+            return key in self.objects
+
+    def delete(self, key):
+        self._simulate_latency()
+        with self._lock:
+            self.objects.pop(key, None)
+        return True
+
+    def list(self, prefix=''):
+        self._simulate_latency()
+        with self._lock:
+            return sorted(key for key in self.objects if key.startswith(prefix))
+
+_BACKEND_CLASSES = {
+    'local': LocalStorageBackend,
+    's3': S3StorageBackend,
+    'memory': MemoryStorageBackend
+}
+_backends = {}
+_backend_override = None
+
+def get_storage_backend(storage_type=None):
+    """Gibt das Backend für den konfigurierten (oder angegebenen) Speichertyp zurück."""
+    if _backend_override is not None and storage_type is None:
+        return _backend_override
+    storage_type = storage_type or STORAGE_CONFIG['type']
+    if storage_type not in _BACKEND_CLASSES:
+        raise ValueError(f"Unbekannter Speichertyp: {storage_type}")
+    # Das lokale Backend hängt von local_root ab und wird je Basisverzeichnis zwischengespeichert
+    cache_key = (storage_type, STORAGE_CONFIG['local_root']) if storage_type == 'local' else storage_type
+    if cache_key not in _backends:
+        _backends[cache_key] = _BACKEND_CLASSES[storage_type]()
+    return _backends[cache_key]
+
+def set_storage_backend(backend):
+    """Setzt ein Backend, das unabhängig von STORAGE_CONFIG verwendet wird (None hebt es auf)."""
+    global _backend_override
+    _backend_override = backend
@@ -14,8 +14,10 @@ from config import REDDIT_CONFIG, CRAWLER_CONFIG, STORAGE_CONFIG, S3_CONFIG, DAT
 import time
 import pandas as pd
 import os
-import io
-import glob
+import json
+from datetime import datetime
+import compression
+from storage import get_storage_backend
 
 try:
     import s3_handler
@@ -44,6 +46,118 @@ def load_config_from_storage():
 
 load_config_from_storage()
 
+# Von Logs wird nur das Ende geladen, damit große Logs den Speicher nicht sprengen
+LOG_TAIL_BYTES = 256 * 1024
+
+def trim_log_tail(data):
+    """Dekodiert das Ende eines Logs und verwirft die angeschnittene erste Zeile."""
+    if data is None:
+        return None
+    if len(data) >= LOG_TAIL_BYTES and b'\n' in data:
+        data = data[data.index(b'\n') + 1:]
+    return data.decode('utf-8', errors='ignore')
+
+def show_metrics(title, data):
+    """Zeigt die Laufzeit-Metriken (metrics.json) einer Session an."""
+    st.subheader(title)
+    if data is None:
+        st.info("Keine Metriken für diese Session gefunden.")
+        return
+    metrics = json.loads(data)
+    phases = pd.DataFrame([{'Phase': name, 'Sekunden': values['seconds'], 'Aufrufe': values['calls']}
+                           for name, values in metrics.get('phases', {}).items()])
+    if not phases.empty:
+        st.dataframe(phases.sort_values('Sekunden', ascending=False), hide_index=True)
+    counters = metrics.get('counters', {})
+    if counters:
+        st.dataframe(pd.DataFrame(list(counters.items()), columns=['Zähler', 'Wert']), hide_index=True)
+
+def mentions_dataframe(result_data):
+    """Erstellt die Erwähnungstabelle einer Session aus ihrem JSON-Artefakt."""
+    mentions_df = pd.DataFrame(list(result_data.get('results', {}).items()), columns=['Symbol', 'Mentions'])
+    mentions_df['Timestamp'] = result_data.get('timestamp', '')
+    crawl_date = result_data.get('crawl_date', '')
+    if crawl_date:
+        mentions_df['Date'] = datetime.fromisoformat(crawl_date.replace('Z', '+00:00')).strftime("%Y-%m-%d %H:%M:%S")
+    return mentions_df
+
+# --- Zwischenspeicher ---
+# Streamlit führt das Skript bei jeder Interaktion neu aus. Sessionlisten, Symbolliste und
+# Artefakte werden daher über Reruns und Browser-Sitzungen hinweg zwischengespeichert (TTL in Sekunden).
+SESSIONS_TTL = 60  # Neue Sessions erscheinen spätestens nach einer Minute
+ARTIFACT_TTL = 3600  # Ergebnis-Artefakte einer Session werden nur einmal geschrieben
+PLOT_TTL = 120  # Der Export in voller Auflösung ersetzt ggf. noch die Vorschau
+
+def storage_id():
+    """Kennung des aktiven Speicher-Backends für die Cache-Schlüssel."""
+    if STORAGE_CONFIG['type'] == 's3':
+        return f"s3:{S3_CONFIG.get('bucket_name')}"
+    return f"{STORAGE_CONFIG['type']}:{os.path.abspath(STORAGE_CONFIG['local_root'])}"
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def load_symbol_index(path, mtime):
+    """Die Symbolliste; wird von allen Sitzungen geteilt und darf nicht verändert werden."""
+    return pd.read_csv(path)
+
+def get_symbol_index():
+    """Die Symbolliste aus stock_symbols.csv (nach Änderungen der Datei neu eingelesen)."""
+    path = DATA_PATHS['stock_symbols']
+    return load_symbol_index(path, os.path.getmtime(path))
+
+@st.cache_data(ttl=SESSIONS_TTL, show_spinner=False)
+def list_sessions(storage_key):
+    """Die Sessions im Ergebnis-Ordner des Backends storage_key, neueste zuerst."""
+    return get_storage_backend().list_sessions(DATA_PATHS['results_dir']) or []
+
+class ArtifactMissing(Exception):
+    """Ein Artefakt fehlt (noch); Ausnahmen werden von st.cache_data nicht zwischengespeichert."""
+
+@st.cache_data(ttl=ARTIFACT_TTL, max_entries=32, show_spinner=False)
+def _load_session_mentions(storage_key, session):
+    storage = get_storage_backend()
+    session_keys = storage.list(prefix=f"{DATA_PATHS['results_dir']}{session}") or []
+    json_keys = [k for k in session_keys if compression.matches(k, 'wsb_mentions.json')]
+    file_content = compression.decompress(storage.get(json_keys[0]) or b'') if json_keys else None
+    if not file_content:
+        # Die Session wird ggf. gerade geschrieben und soll beim nächsten Rerun erneut geladen werden
+        raise ArtifactMissing(session)
+    return mentions_dataframe(json.loads(file_content))
+
+def load_session_mentions(storage_key, session):
+    """Die Erwähnungstabelle einer Session oder None, wenn kein Ergebnis-Artefakt existiert."""
+    try:
+        return _load_session_mentions(storage_key, session)
+    except ArtifactMissing:
+        return None
+
+@st.cache_data(ttl=PLOT_TTL, max_entries=16, show_spinner=False)
+def _load_session_plot(storage_key, session):
+    storage = get_storage_backend()
+    plot_data = storage.get(f"{DATA_PATHS['analysis_dir']}{session}wsb_analysis_plots.png")
+    if plot_data is not None:
+        return plot_data, False
+    # Der Export in voller Auflösung läuft ggf. noch im Hintergrund
+    plot_data = storage.get(f"{DATA_PATHS['analysis_dir']}{session}wsb_analysis_plots_preview.png")
+    if plot_data is None:
+        raise ArtifactMissing(session)
+    return plot_data, True
+
+def load_session_plot(storage_key, session):
+    """Das Diagramm einer Session als (PNG, ist_vorschau); (None, False), wenn es fehlt."""
+    try:
+        return _load_session_plot(storage_key, session)
+    except ArtifactMissing:
+        return None, False
+
+def current_session():
+    """Die ausgewählte Session oder, ohne Auswahl bei lokalem Speicher, die neueste."""
+    if st.session_state.get('selected_session'):
+        return st.session_state.selected_session
+    if STORAGE_CONFIG['type'] != 's3':
+        sessions = list_sessions(storage_id())
+        return sessions[0] if sessions else None
+    return None
+
 # Initialisiere Session State
 if 'crawling_in_progress' not in st.session_state:
     st.session_state.crawling_in_progress = False
@@ -180,7 +294,7 @@ with st.sidebar.expander("Speicher-Konfiguration"):
             load_config_from_storage()
             
             with st.spinner("Teste S3-Verbindung..."):
-                if s3_handler and s3_handler.get_s3_client():
+                if s3_handler and s3_handler.get_s3_client(refresh=True):
                     st.success("S3-Verbindung erfolgreich!")
                 else:
                     st.error("S3-Verbindung fehlgeschlagen. Überprüfen Sie Ihre Daten.")
@@ -195,28 +309,26 @@ with st.sidebar.expander("Speicher-Konfiguration"):
              time.sleep(1)
              st.rerun()
 
-# --- Session-Auswahl für S3 ---
-if STORAGE_CONFIG['type'] == 's3' and s3_handler:
-    st.sidebar.subheader("S3 Session-Auswahl")
-    if st.sidebar.button("S3 Sessions laden", key="load_s3_sessions_button"):
-        # Wir suchen in 'data/results/', da dort die primären Session-Ordner erstellt werden
-        sessions = s3_handler.list_sessions(base_prefix=DATA_PATHS['results_dir'])
-        if sessions:
-            st.session_state.s3_sessions = sessions
-        else:
-            st.session_state.s3_sessions = []
-            st.sidebar.info("Keine S3-Sessions gefunden.")
-
-    if 's3_sessions' in st.session_state and st.session_state.s3_sessions:
-        st.session_state.selected_session = st.sidebar.selectbox(
-            "Wähle eine Session",
-            options=st.session_state.s3_sessions,
-            index=0,
-            key="session_selector",
-            help="Zeigt Ordner im Format YYYY-MM-DD/HHMMSS/"
-        )
-    elif 's3_sessions' in st.session_state:
-        st.sidebar.info("Keine S3-Sessions gefunden.")
+# --- Session-Auswahl ---
+storage = get_storage_backend()
+st.sidebar.subheader("Session-Auswahl")
+if st.sidebar.button("Sessions laden", key="load_sessions_button"):
+    # Wir suchen in 'data/results/', da dort die primären Session-Ordner erstellt werden
+    sessions = list_sessions(storage_id())
+    st.session_state.sessions = sessions
+    if not sessions:
+        st.sidebar.info("Keine Sessions gefunden.")
+
+if 'sessions' in st.session_state and st.session_state.sessions:
+    st.session_state.selected_session = st.sidebar.selectbox(
+        "Wähle eine Session",
+        options=st.session_state.sessions,
+        index=0,
+        key="session_selector",
+        help="Zeigt Ordner im Format YYYY-MM-DD/HHMMSS/"
+    )
+elif 'sessions' in st.session_state:
+    st.sidebar.info("Keine Sessions gefunden.")
 
 # --- Crawler-Einstellungen ---
 st.sidebar.subheader("Crawler-Einstellungen")
@@ -258,8 +370,6 @@ def set_all_config_to_local_storage(config_data):
     localS.setItem("aws_region", config_data.get('aws_region', 'eu-central-1'), key="import_aws_region")
     load_config_from_storage() # Reload global config after setting local storage
 
-import json
-
 with st.sidebar.expander("Konfiguration Import/Export"):
     if st.button("Konfiguration exportieren", key="export_config_button"):
         config_to_export = get_all_config_from_local_storage()
@@ -348,6 +458,8 @@ with tab_dashboard:
         else:
             st.error("Crawling fehlgeschlagen. Überprüfen Sie die Logs.")
         
+        # Die neue Session soll sofort in der Auswahl erscheinen
+        list_sessions.clear()
         st.session_state.crawling_in_progress = False
         time.sleep(3)
         st.rerun()
@@ -362,31 +474,20 @@ with tab_results:
     try:
         # Lade die Stock-Symbole für die Anreicherung
         try:
-            stock_symbols_df = pd.read_csv(DATA_PATHS['stock_symbols'])
+            stock_symbols_df = get_symbol_index()
         except FileNotFoundError:
             st.error(f"Stock-Symbol-Datei nicht gefunden unter: {DATA_PATHS['stock_symbols']}")
             stock_symbols_df = pd.DataFrame() # Leerer DataFrame, um Fehler zu vermeiden
 
-        file_content = None
-        if STORAGE_CONFIG['type'] == 's3' and s3_handler:
-            if st.session_state.selected_session:
-                st.info(f"Lade Ergebnisse für Session {st.session_state.selected_session} von S3...")
-                file_key = f"{DATA_PATHS['results_dir']}{st.session_state.selected_session}wsb_mentions.csv"
-                file_content = s3_handler.get_file_content(file_key)
-            else:
-                st.info("Bitte wählen Sie eine S3-Session in der Seitenleiste aus.")
-        else:
-            st.info("Lade neueste Ergebnisse vom lokalen Speicher...")
-            # Lokale Logik: Finde die neueste Datei im verschachtelten Verzeichnis
-            list_of_files = glob.glob(f"{DATA_PATHS['results_dir']}/**/wsb_mentions.csv", recursive=True)
-            if list_of_files:
-                latest_file_path = max(list_of_files, key=os.path.getctime)
-                with open(latest_file_path, 'r', encoding='utf-8') as f:
-                    file_content = f.read()
-
-        if file_content:
-            mentions_df = pd.read_csv(io.StringIO(file_content))
-            
+        mentions_df = None
+        session = current_session()
+        if session:
+            st.info(f"Lade Ergebnisse für Session {session} ({storage.name})...")
+            mentions_df = load_session_mentions(storage_id(), session)
+        elif STORAGE_CONFIG['type'] == 's3':
+            st.info("Bitte wählen Sie eine S3-Session in der Seitenleiste aus.")
+
+        if mentions_df is not None:
             # Anreichern der Daten
             if not stock_symbols_df.empty:
                 # Annahme: Die Spalte in wsb_mentions.csv heißt 'Symbol'
@@ -408,28 +509,20 @@ with tab_visuals:
     st.header("Visualisierungen")
     
     try:
-        plot_path = None
-        if STORAGE_CONFIG['type'] == 's3' and s3_handler:
-            if st.session_state.selected_session:
-                st.info(f"Lade Visualisierung für Session {st.session_state.selected_session} von S3...")
-                plot_key = f"{DATA_PATHS['analysis_dir']}{st.session_state.selected_session}wsb_analysis_plots.png"
-                temp_plot_path = "temp_plot.png"
-                if s3_handler.download_file(plot_key, temp_plot_path):
-                    plot_path = temp_plot_path
-                else:
-                    st.warning(f"Visualisierung für Session {st.session_state.selected_session} nicht gefunden.")
-            else:
-                st.info("Bitte wählen Sie eine S3-Session in der Seitenleiste aus.")
-        else:
-            st.info("Lade neueste Visualisierung vom lokalen Speicher...")
-            list_of_files = glob.glob(f"{DATA_PATHS['analysis_dir']}/**/wsb_analysis_plots.png", recursive=True)
-            if list_of_files:
-                plot_path = max(list_of_files, key=os.path.getctime)
-
-        if plot_path:
-            st.image(plot_path)
-            if os.path.exists("temp_plot.png"):
-                os.remove("temp_plot.png") # Aufräumen
+        plot_data = None
+        session = current_session()
+        if session:
+            st.info(f"Lade Visualisierung für Session {session} ({storage.name})...")
+            plot_data, is_preview = load_session_plot(storage_id(), session)
+            if is_preview:
+                st.caption("Vorschau – die Version in voller Auflösung wird noch erstellt.")
+            if plot_data is None:
+                st.warning(f"Visualisierung für Session {session} nicht gefunden.")
+        elif STORAGE_CONFIG['type'] == 's3':
+            st.info("Bitte wählen Sie eine S3-Session in der Seitenleiste aus.")
+
+        if plot_data:
+            st.image(plot_data)
         else:
             st.info("Führen Sie zuerst die Analyse durch, um Visualisierungen anzuzeigen.")
     except Exception as e:
@@ -439,37 +532,21 @@ with tab_logs:
     st.header("Logs der ausgewählten Session")
 
     if st.button("Logs laden", key="load_logs_button"):
-        session = st.session_state.get('selected_session')
+        session = current_session()
         if not session:
             st.warning("Bitte wählen Sie zuerst eine Session in der Seitenleiste aus.")
         else:
             st.info(f"Lade Logs für Session: {session}")
             
             log_contents = {}
-            
-            if STORAGE_CONFIG['type'] == 's3' and s3_handler:
-                # Lade von S3
-                crawler_log_key = f"{DATA_PATHS['results_dir']}{session}crawler.log"
-                analyzer_log_key = f"{DATA_PATHS['analysis_dir']}{session}analyzer.log"
-                
-                log_contents['crawler'] = s3_handler.get_file_content(crawler_log_key)
-                log_contents['analyzer'] = s3_handler.get_file_content(analyzer_log_key)
-            else:
-                # Lade lokal
-                crawler_log_path = os.path.join(DATA_PATHS['results_dir'], session.replace('/', os.sep), "crawler.log")
-                analyzer_log_path = os.path.join(DATA_PATHS['analysis_dir'], session.replace('/', os.sep), "analyzer.log")
-                
-                try:
-                    with open(crawler_log_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        log_contents['crawler'] = f.read()
-                except FileNotFoundError:
-                    log_contents['crawler'] = "Crawler-Log für diese Session nicht gefunden."
-                
-                try:
-                    with open(analyzer_log_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        log_contents['analyzer'] = f.read()
-                except FileNotFoundError:
-                    log_contents['analyzer'] = "Analyzer-Log für diese Session nicht gefunden."
+            log_keys = {
+                'crawler': f"{DATA_PATHS['results_dir']}{session}crawler.log",
+                'analyzer': f"{DATA_PATHS['analysis_dir']}{session}analyzer.log"
+            }
+            for name, log_key in log_keys.items():
+                log_contents[name] = trim_log_tail(storage.get_range(log_key, start=-LOG_TAIL_BYTES))
+                if log_contents[name] is None:
+                    log_contents[name] = f"{name.capitalize()}-Log für diese Session nicht gefunden."
 
             # Anzeige der Logs
             st.subheader("Crawler Log")
@@ -477,3 +554,7 @@ with tab_logs:
             
             st.subheader("Analyzer Log")
             st.text_area("Analyzer Log Content", value=log_contents.get('analyzer') or "Kein Inhalt.", height=300)
+
+            # Laufzeit-Metriken je Phase
+            show_metrics("Crawler-Metriken", storage.get(f"{DATA_PATHS['results_dir']}{session}metrics.json"))
+            show_metrics("Analyse-Metriken", storage.get(f"{DATA_PATHS['analysis_dir']}{session}metrics.json"))
@@ -0,0 +1,41 @@
+import os
+import sys
+import pytest
+
+# Die Module liegen flach im Projektverzeichnis
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import S3_CONFIG
+from storage import MemoryStorageBackend, set_storage_backend
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    """Crawler und Analyse legen Logs relativ zum Arbeitsverzeichnis an."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+@pytest.fixture
+def memory_storage():
+    backend = MemoryStorageBackend()
+    set_storage_backend(backend)
+    yield backend
+    set_storage_backend(None)
+
+@pytest.fixture
+def s3(tmp_path, monkeypatch):
+    """Bucket in moto und ein leerer lokaler S3-Cache; gibt den boto3-Client zurück."""
+    moto = pytest.importorskip('moto')
+    import boto3
+    import s3_handler
+    from s3_cache import S3Cache
+
+    with moto.mock_aws():
+        for key, value in {'aws_access_key_id': 'testing', 'aws_secret_access_key': 'testing',
+                           'region_name': 'us-east-1', 'bucket_name': 'arn:aws:s3:::wsb-test'}.items():
+            monkeypatch.setitem(S3_CONFIG, key, value)
+        client = boto3.client('s3', region_name='us-east-1')
+        client.create_bucket(Bucket='wsb-test')
+        monkeypatch.setattr(s3_handler, '_cache', S3Cache(cache_dir=str(tmp_path / 'cache'),
+                                                          immutable_prefixes=['data/results/']))
+        monkeypatch.setattr(s3_handler, '_clients', {})
+        yield client
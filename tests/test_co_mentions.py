@@ -0,0 +1,49 @@
+from co_mentions import CoMentionGraph
+
+def _graph(documents):
+    graph = CoMentionGraph()
+    for symbols in documents:
+        graph.add_document(symbols)
+    return graph
+
+def _pairs(graph):
+    # Die Reihenfolge innerhalb eines Paars hängt von der Iterationsreihenfolge des Symbol-Sets ab
+    return {frozenset((row.Symbol1, row.Symbol2)): row.CoMentions for row in graph.top_pairs(100).itertuples()}
+
+def _pair(*symbols):
+    return frozenset(symbols)
+
+def test_pairs_count_once_per_document():
+    graph = _graph([['GME', 'AMC', 'GME'], ['AMC', 'GME'], ['TSLA'], ['GME', 'TSLA']])
+    assert graph.documents == 3
+    assert _pairs(graph) == {_pair('GME', 'AMC'): 2, _pair('GME', 'TSLA'): 1}
+    neighbours = graph.neighbours('gme')
+    assert list(zip(neighbours['Symbol'], neighbours['CoMentions'])) == [('AMC', 2), ('TSLA', 1)]
+    assert graph.neighbours('NOPE').empty
+
+def test_merge_with_different_symbol_order():
+    first = _graph([['GME', 'AMC'], ['GME', 'TSLA']])
+    second = _graph([['TSLA', 'AMC'], ['AMC', 'GME'], ['NVDA', 'GME']])
+    first.merge(second)
+    assert first.documents == 5
+    assert _pairs(first) == {_pair('GME', 'AMC'): 2, _pair('GME', 'TSLA'): 1,
+                             _pair('TSLA', 'AMC'): 1, _pair('NVDA', 'GME'): 1}
+    # Die Matrix bleibt symmetrisch
+    assert first.neighbours('AMC')['CoMentions'].sum() == 3
+
+def test_merge_empty_graph_is_noop():
+    graph = _graph([['GME', 'AMC']])
+    graph.merge(CoMentionGraph())
+    assert _pairs(graph) == {_pair('GME', 'AMC'): 1}
+
+def test_bytes_round_trip_keeps_pending_entries_and_extras():
+    graph = _graph([['GME', 'AMC'], ['GME', 'AMC', 'TSLA']])
+    # Noch nicht eingerechnete Einträge werden beim Serialisieren übernommen
+    assert len(graph._rows)
+    data = graph.to_bytes(sessions=['2024-01-01/100000/'])
+    restored = CoMentionGraph.from_bytes(data)
+    assert restored.symbols == graph.symbols
+    assert restored.documents == 2
+    assert _pairs(restored) == _pairs(graph)
+    restored.add_document(['TSLA', 'AMC'])
+    assert _pairs(restored)[_pair('AMC', 'TSLA')] == 2
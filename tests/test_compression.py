@@ -0,0 +1,46 @@
+import gzip
+import io
+import pytest
+import compression
+
+PAYLOAD = '{"results": {"GME": 3}}\nzweite Zeile äöü\n'.encode('utf-8')
+
+ENCODINGS = ['none', 'gzip', pytest.param('zstd', marks=pytest.mark.skipif(
+    compression.zstandard is None, reason="zstandard nicht installiert"))]
+
+@pytest.mark.parametrize('encoding', ENCODINGS)
+def test_round_trip(encoding):
+    data = compression.compress(PAYLOAD, encoding)
+    assert compression.decompress(data) == PAYLOAD
+    with compression.open_decompressed(io.BytesIO(data)) as stream:
+        assert stream.read() == PAYLOAD
+
+@pytest.mark.parametrize('encoding', ENCODINGS)
+def test_text_stream_and_local_file(tmp_path, encoding):
+    path = tmp_path / compression.artifact_name('wsb_mentions.json', encoding)
+    path.write_bytes(compression.compress(PAYLOAD, encoding))
+    assert compression.read_text(str(path)) == PAYLOAD.decode('utf-8')
+    with compression.open_local(str(path)) as stream:
+        assert stream.readlines()[1] == 'zweite Zeile äöü\n'
+    assert compression.encoding_from_name(str(path)) == encoding
+    assert compression.matches(str(path), 'wsb_mentions.json')
+
+def test_format_is_detected_by_magic_bytes_not_name():
+    data = compression.compress(PAYLOAD, 'gzip')
+    assert data[:2] == compression.GZIP_MAGIC
+    # Deterministisch (mtime=0), damit gleiche Inhalte gleiche Bytes ergeben
+    assert data == compression.compress(PAYLOAD, 'gzip')
+    assert compression.decompress(gzip.compress(PAYLOAD)) == PAYLOAD
+    # Unkomprimierte Daten bleiben unverändert, auch wenn sie mit einem Teil der Magic Bytes beginnen
+    assert compression.decompress(b'\x1f') == b'\x1f'
+    assert compression.decompress(b'') == b''
+
+@pytest.mark.skipif(compression.zstandard is not None, reason="zstandard installiert")
+def test_zstd_without_package():
+    with pytest.raises(ImportError):
+        compression.decompress(compression.ZSTD_MAGIC + b'\x00' * 8)
+
+def test_unknown_encoding_falls_back_to_gzip(monkeypatch):
+    monkeypatch.setitem(compression.ARTIFACT_CONFIG, 'compression', 'brotli')
+    assert compression.get_encoding() == 'gzip'
+    assert compression.artifact_name('summary.json') == 'summary.json.gz'
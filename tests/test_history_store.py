@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from data_analyzer import WSBDataAnalyzer
+from history_store import HistoryStore
+
+pytestmark = pytest.mark.skipif(not HistoryStore.is_available(), reason="pyarrow nicht installiert")
+
+def _append(history, days_ago, results):
+    crawl_dt = datetime.now(timezone.utc).replace(hour=12, minute=0, second=0, microsecond=0) - timedelta(days=days_ago)
+    history.append({
+        'timestamp': crawl_dt.strftime('%Y%m%d_%H%M%S'),
+        'crawl_date': crawl_dt.isoformat(),
+        'total_symbols_found': len(results),
+        'total_mentions': sum(results.values()),
+        'results': results
+    })
+
+class CountingStorage:
+    """Zählt die gelesenen Schlüssel eines Backends."""
+    def __init__(self, backend):
+        self.backend = backend
+        self.read_keys = []
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+    def get_many(self, keys, **kwargs):
+        self.read_keys.extend(keys)
+        return self.backend.get_many(keys, **kwargs)
+
+def test_read_last_days_prunes_partitions(memory_storage):
+    history = HistoryStore(memory_storage)
+    for days_ago in (30, 10, 2, 1):
+        _append(history, days_ago, {'GME': days_ago, 'AMC': 1})
+
+    counting = CountingStorage(memory_storage)
+    df = HistoryStore(counting).read_last_days(7, columns=['Symbol', 'Mentions'], symbols=['gme'])
+    assert len(counting.read_keys) == 2
+    assert list(df.columns) == ['Date', 'Symbol', 'Mentions']
+    assert sorted(df['Mentions']) == [1, 2]
+
+def test_run_full_analysis_reads_only_requested_days(memory_storage):
+    history = HistoryStore(memory_storage)
+    for days_ago in (20, 3, 0):
+        _append(history, days_ago, {'GME': 5, 'TSLA': days_ago + 1})
+
+    analyzer = WSBDataAnalyzer()
+    assert analyzer.run_full_analysis(days=7)
+    assert len(analyzer.session_headers) == 2
+    assert analyzer.combined_df['Mentions'].sum() == 5 + 4 + 5 + 1
+    # Der Export ist vor dem Ende abgeschlossen, eine Vorschau wird nicht abgelegt
+    session_dir = f"data/analysis/{analyzer.session_path_for_saving}"
+    plots = [key[len(session_dir):] for key in memory_storage.list(prefix=session_dir) if key.endswith('.png')]
+    assert plots == ['wsb_analysis_plots.png']
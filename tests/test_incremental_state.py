@@ -0,0 +1,73 @@
+import json
+import pytest
+import compression
+import config
+from config import DATA_PATHS
+from data_analyzer import WSBDataAnalyzer
+from history_store import HistoryStore
+
+pytestmark = pytest.mark.skipif(not HistoryStore.is_available(), reason="pyarrow nicht installiert")
+
+def _put_session(storage, session, crawl_date, results):
+    data = {
+        'timestamp': session.replace('-', '').replace('/', '_').rstrip('_'),
+        'crawl_date': crawl_date,
+        'total_symbols_found': len(results),
+        'total_mentions': sum(results.values()),
+        'subreddit': 'wallstreetbets',
+        'results': results
+    }
+    key = f"{DATA_PATHS['results_dir']}{session}wsb_mentions.json"
+    storage.put(key, compression.compress(json.dumps(data).encode('utf-8'), 'none'))
+
+def test_state_without_symbols_is_reused(memory_storage):
+    storage = memory_storage
+    _put_session(storage, '2024-01-01/100000/', '2024-01-01T10:00:00+00:00', {})
+    assert not WSBDataAnalyzer().update_combined_dataframe()
+
+    # Der leere Zustand muss ladbar sein, sonst wird bei jedem Lauf neu aufgebaut
+    frame, sessions, parts, _, _ = WSBDataAnalyzer()._load_state(storage)
+    assert frame is not None and frame.empty
+    assert list(frame.columns) == ['Date', 'DateTime', 'Timestamp', 'Symbol', 'Mentions']
+    assert [header['session'] for header in sessions] == ['2024-01-01/100000/']
+    assert parts == []
+
+    _put_session(storage, '2024-01-01/110000/', '2024-01-01T11:00:00+00:00', {'GME': 3, 'AMC': 1})
+    analyzer = WSBDataAnalyzer()
+    assert analyzer.update_combined_dataframe()
+    assert len(analyzer.session_headers) == 2
+    assert analyzer.all_results == []
+    assert dict(zip(analyzer.combined_df['Symbol'].astype(str), analyzer.combined_df['Mentions'])) == \
+        {'GME': 3, 'AMC': 1}
+
+def test_new_sessions_are_appended_as_parts_and_compacted(memory_storage, monkeypatch):
+    monkeypatch.setitem(config.LOADER_CONFIG, 'state_compact_parts', 3)
+    storage = memory_storage
+    state_dir = DATA_PATHS['analysis_state_dir']
+    # Die zweite Session ist älter als die erste und wird nachgereicht
+    sessions = [('2024-01-02/100000/', '2024-01-02T10:00:00+00:00', {'GME': 1}),
+                ('2024-01-01/100000/', '2024-01-01T10:00:00+00:00', {'AMC': 2}),
+                ('2024-01-03/100000/', '2024-01-03T10:00:00+00:00', {'GME': 4, 'TSLA': 1})]
+
+    _put_session(storage, *sessions[0])
+    assert WSBDataAnalyzer().update_combined_dataframe()
+    first_part = storage.get(f"{state_dir}facts/000000.parquet")
+
+    _put_session(storage, *sessions[1])
+    analyzer = WSBDataAnalyzer()
+    assert analyzer.update_combined_dataframe()
+    # Bestehende Teile werden nicht neu geschrieben
+    assert storage.get(f"{state_dir}facts/000000.parquet") == first_part
+    assert sorted(storage.list(prefix=f"{state_dir}facts/")) == \
+        [f"{state_dir}facts/000000.parquet", f"{state_dir}facts/000001.parquet"]
+    assert list(analyzer.combined_df['Symbol'].astype(str)) == ['AMC', 'GME']
+
+    _put_session(storage, *sessions[2])
+    assert WSBDataAnalyzer().update_combined_dataframe()
+    assert storage.list(prefix=f"{state_dir}facts/") == [f"{state_dir}facts/000002.parquet"]
+    assert all(key.startswith(f"{state_dir}rollups/000002/") for key in storage.list(prefix=f"{state_dir}rollups/"))
+
+    frame, headers, parts, rollups, _ = WSBDataAnalyzer()._load_state(storage)
+    assert parts == ['000002'] and len(headers) == 3
+    assert list(frame['Mentions']) == [2, 1, 4, 1]
+    assert rollups.symbol_totals.to_dict() == {'AMC': 2, 'GME': 5, 'TSLA': 1}
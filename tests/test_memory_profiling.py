@@ -0,0 +1,41 @@
+import tracemalloc
+import pytest
+from config import DATA_PATHS, MEMORY_PROFILE_CONFIG
+from data_analyzer import WSBDataAnalyzer
+from metrics import SessionMetrics
+
+@pytest.fixture
+def profiling(monkeypatch):
+    monkeypatch.setitem(MEMORY_PROFILE_CONFIG, 'enabled', True)
+    assert not tracemalloc.is_tracing()
+    yield
+    assert not tracemalloc.is_tracing()
+
+def test_phases_are_profiled_and_context_manager_stops_tracing(profiling):
+    with SessionMetrics('test', profile_memory=True) as metrics:
+        with metrics.phase('alloc'):
+            data = [bytes(1024) for _ in range(100)]
+        assert tracemalloc.is_tracing()
+    report = metrics.memory.to_dict()
+    assert report['finished'] is not None
+    assert report['phases']['alloc']['peak_increase_bytes'] >= 100 * 1024
+    del data
+    # Ein zweites close() ist wirkungslos
+    metrics.close()
+
+def test_failed_analysis_stops_profiler(profiling, memory_storage):
+    analyzer = WSBDataAnalyzer()
+    assert not analyzer.run_full_analysis()
+    assert analyzer.metrics.memory is not None and not analyzer.metrics.memory.active
+
+def test_failed_save_stops_profiler(profiling, memory_storage, monkeypatch, workdir):
+    from reddit_crawler import WSBStockCrawler
+
+    symbols = workdir / DATA_PATHS['stock_symbols']
+    symbols.parent.mkdir(parents=True, exist_ok=True)
+    symbols.write_text("Symbol\nGME\n")
+    crawler = WSBStockCrawler()
+    crawler.metrics = SessionMetrics('crawl', profile_memory=True)
+    monkeypatch.setattr(memory_storage, 'put_many', lambda items: {key: False for key in items})
+    assert crawler.save_results() == (None, None)
+    assert not crawler.metrics.memory.active
@@ -0,0 +1,93 @@
+import threading
+import urllib.error
+import urllib.request
+import pytest
+from metrics import (MetricsRegistry, MetricsServer, SessionMetrics, activate_metrics, bind_metrics,
+                     get_metrics, registry)
+
+@pytest.fixture(autouse=True)
+def active_metrics():
+    previous = get_metrics()
+    yield
+    activate_metrics(previous)
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(registry, 'enabled', registry.enabled)
+    server = MetricsServer(host='127.0.0.1', port=0).start()
+    yield server
+    server.stop()
+
+def _get(server, path):
+    with urllib.request.urlopen(f"http://127.0.0.1:{server.port}{path}", timeout=5) as response:
+        return response.headers['Content-Type'], response.read().decode('utf-8')
+
+def test_server_on_free_port_serves_prometheus_text(server):
+    assert server.port != 0
+    assert registry.enabled
+    metrics = SessionMetrics('test-job')
+    metrics.count('posts', 3)
+    with metrics.phase('test.phase'):
+        pass
+    metrics.mark_success()
+
+    content_type, body = _get(server, '/metrics')
+    assert content_type.startswith('text/plain; version=0.0.4')
+    assert '# TYPE wsb_posts_total counter' in body
+    assert 'wsb_phase_duration_seconds_bucket{phase="test.phase",le="+Inf"}' in body
+    assert 'wsb_last_success_timestamp_seconds{job="test-job"}' in body
+
+def test_server_rejects_other_paths(server):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        _get(server, '/')
+    assert error.value.code == 404
+
+def test_disabled_registry_ignores_values():
+    local = MetricsRegistry()
+    local.inc('posts')
+    local.observe('latency', 0.2)
+    assert local.render() == '\n'
+
+def test_histogram_is_cumulative():
+    local = MetricsRegistry(buckets=(0.1, 1.0), enabled=True)
+    for value in (0.05, 0.5, 2.0):
+        local.observe('latency', value, op='get')
+    lines = local.render().splitlines()
+    assert 'wsb_latency_bucket{op="get",le="0.1"} 1' in lines
+    assert 'wsb_latency_bucket{op="get",le="1.0"} 2' in lines
+    assert 'wsb_latency_bucket{op="get",le="+Inf"} 3' in lines
+    assert 'wsb_latency_count{op="get"} 3' in lines
+
+def test_active_metrics_are_scoped_per_thread():
+    main = activate_metrics(SessionMetrics('main'))
+    seen = {}
+
+    def _worker():
+        seen['unbound'] = get_metrics()
+        activate_metrics(SessionMetrics('worker')).count('posts')
+
+    thread = threading.Thread(target=_worker)
+    thread.start()
+    thread.join()
+    assert seen['unbound'] is not main
+    assert get_metrics() is main and 'posts' not in main.counters
+
+    thread = threading.Thread(target=bind_metrics(lambda: get_metrics().count('s3_requests')))
+    thread.start()
+    thread.join()
+    assert main.counters == {'s3_requests': 1}
+
+def test_reddit_requests_are_counted_per_http_request():
+    from reddit_crawler import CountingRequestor
+
+    class _Session:
+        headers = {}
+
+        def request(self, *args, **kwargs):
+            return 'response'
+
+    metrics = activate_metrics(SessionMetrics('crawl'))
+    requestor = CountingRequestor('wsb-test-agent', session=_Session())
+    assert requestor.request('GET', 'https://oauth.reddit.com/r/wallstreetbets/hot') == 'response'
+    requestor.request('POST', 'https://www.reddit.com/api/v1/access_token')
+    assert metrics.counters['reddit_requests'] == 2
@@ -0,0 +1,22 @@
+from plot_rendering import PlotWorker, RENDERS_PREFIX, render_cached, render_key
+
+SPEC = {'grid': (1, 1), 'figsize': (2, 2), 'panels': [{'position': (0, 0), 'kind': 'bar', 'values': [1, 2, 3]}]}
+
+def test_worker_renders_in_spawned_processes():
+    worker = PlotWorker(max_workers=1)
+    try:
+        png = worker.render(SPEC, dpi=20)
+        assert png.startswith(b'\x89PNG')
+        assert worker._pool._mp_context.get_start_method() == 'spawn'
+    finally:
+        worker.shutdown()
+    assert worker._pool is None
+
+def test_render_cache_keeps_only_latest_data_version(memory_storage):
+    worker = PlotWorker(max_workers=0)
+    first = render_cached(SPEC, 20, memory_storage, worker)
+    assert memory_storage.get(render_key(SPEC, 20)) == first
+
+    changed = {**SPEC, 'panels': [{**SPEC['panels'][0], 'values': [3, 2, 1]}]}
+    render_cached(changed, 20, memory_storage, worker)
+    assert memory_storage.list(RENDERS_PREFIX) == [render_key(changed, 20)]
@@ -0,0 +1,26 @@
+import pytest
+from query_engine import SessionQueryEngine
+
+@pytest.fixture
+def engine(memory_storage):
+    engine = SessionQueryEngine(db_path=':memory:', storage=memory_storage)
+    for day, results in (('01', {'GME': 3, 'AMC': 1}), ('02', {'GME': 5}), ('03', {'GME': 2, 'AMC': 4})):
+        engine.ingest_result(f"2024-01-{day}/100000/", {
+            'timestamp': f"202401{day}_100000", 'crawl_date': f"2024-01-{day}T10:00:00+00:00",
+            'total_mentions': sum(results.values()), 'total_symbols_found': len(results), 'results': results})
+    yield engine
+    engine.close()
+
+@pytest.mark.parametrize('start_date, end_date, expected', [
+    (None, None, [3, 5, 2]),
+    ('2024-01-02', None, [5, 2]),
+    (None, '2024-01-02', [3, 5]),
+    ('2024-01-02', '2024-01-02', [5]),
+])
+def test_symbol_history_combines_symbol_and_date_conditions(engine, start_date, end_date, expected):
+    assert list(engine.symbol_history('gme', start_date, end_date)['Mentions']) == expected
+
+def test_top_symbols_in_date_range(engine):
+    top = engine.top_symbols('2024-01-03', '2024-01-03')
+    assert list(zip(top['Symbol'], top['Mentions'])) == [('AMC', 4), ('GME', 2)]
+    assert list(engine.daily_totals(start_date='2024-01-02')['Mentions']) == [5, 6]
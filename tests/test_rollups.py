@@ -0,0 +1,53 @@
+import pandas as pd
+import pytest
+from rollups import SymbolRollups
+
+@pytest.fixture
+def rollups():
+    date_times = pd.to_datetime(['2024-01-01 09:30', '2024-01-01 09:45', '2024-01-01 15:00',
+                                 '2024-01-02 10:00', '2024-01-03 11:00'], utc=True)
+    frame = pd.DataFrame({
+        'Date': date_times.tz_convert(None).normalize(),
+        'DateTime': date_times,
+        'Symbol': ['GME', 'GME', 'AMC', 'GME', 'TSLA'],
+        'Mentions': [2, 3, 4, 1, 7]
+    })
+    return SymbolRollups.from_frame(frame)
+
+def test_resample_daily(rollups):
+    matrix = rollups.resample(['GME', 'AMC'], freq='D')
+    assert list(matrix.index) == ['GME', 'AMC']
+    assert matrix.columns.name == 'Bucket'
+    # Buckets reichen vom ersten bis zum letzten Eintrag der gewählten Symbole
+    assert matrix.loc['GME'].tolist() == [5, 1]
+    assert matrix.loc['AMC'].tolist() == [4, 0]
+
+def test_resample_hourly_buckets_and_range(rollups):
+    matrix = rollups.resample(['GME', 'AMC'], freq='6h', start='2024-01-01', end='2024-01-01 23:00')
+    assert list(matrix.columns) == [pd.Timestamp('2024-01-01 06:00', tz='UTC'), pd.Timestamp('2024-01-01 12:00', tz='UTC')]
+    assert matrix.loc['GME'].tolist() == [5, 0]
+    assert matrix.loc['AMC'].tolist() == [0, 4]
+
+def test_resample_unknown_symbol_is_zero(rollups):
+    matrix = rollups.resample(['GME', 'NOPE'], freq='D')
+    assert matrix.loc['NOPE'].sum() == 0
+    empty = rollups.resample(['NOPE'], freq='D')
+    assert empty.empty and list(empty.index) == ['NOPE']
+
+def test_resample_all_symbols(rollups):
+    matrix = rollups.resample(freq='W')
+    assert sorted(matrix.index) == ['AMC', 'GME', 'TSLA']
+    assert matrix.sum(axis=1).to_dict() == {'AMC': 4, 'GME': 6, 'TSLA': 7}
+
+def test_merge_equals_combined_add(rollups):
+    merged = SymbolRollups()
+    merged.merge(rollups)
+    merged.merge(rollups)
+    assert merged.symbol_totals.to_dict() == {'AMC': 8, 'GME': 12, 'TSLA': 14}
+    assert merged.resample(['GME']).loc['GME'].tolist() == [10, 2]
+
+def test_save_and_load(rollups, memory_storage):
+    assert rollups.save(memory_storage, 'state/rollups/')
+    loaded = SymbolRollups.load(memory_storage, 'state/rollups/')
+    pd.testing.assert_frame_equal(loaded.resample(freq='D'), rollups.resample(freq='D'))
+    assert SymbolRollups.load(memory_storage, 'missing/') is None
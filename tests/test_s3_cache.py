@@ -0,0 +1,60 @@
+import s3_handler
+from s3_cache import S3Cache
+
+def _download(workdir, key):
+    target = workdir / 'download.bin'
+    assert s3_handler.download_file(key, str(target))
+    return target.read_bytes()
+
+def test_download_miss_revalidate_and_change(s3, workdir):
+    key = 'data/analysis/2024-01-01/100000/summary.json'
+    s3.put_object(Bucket='wsb-test', Key=key, Body=b'v1')
+
+    # Miss: Download und Ablage im Cache
+    assert _download(workdir, key) == b'v1'
+    entry = s3_handler.get_cache().lookup(key)
+    assert entry and entry['etag']
+
+    # Unverändert: HEAD mit If-None-Match, Inhalt aus dem Cache
+    s3_handler.get_cache().store(key, b'cached', entry['etag'])
+    assert _download(workdir, key) == b'cached'
+
+    # Geändert: neues ETag, erneuter Download
+    s3.put_object(Bucket='wsb-test', Key=key, Body=b'v2')
+    assert _download(workdir, key) == b'v2'
+    assert s3_handler.get_cache().lookup(key)['etag'] != entry['etag']
+
+def test_immutable_artifacts_are_served_without_request(s3, workdir):
+    key = 'data/results/2024-01-01/100000/wsb_mentions.json'
+    s3.put_object(Bucket='wsb-test', Key=key, Body=b'{}')
+    assert _download(workdir, key) == b'{}'
+
+    # Session-Artefakte werden nicht revalidiert, auch wenn das Objekt verschwindet
+    s3.delete_object(Bucket='wsb-test', Key=key)
+    assert _download(workdir, key) == b'{}'
+    assert s3_handler.get_object_bytes(key) == b'{}'
+
+def test_get_object_bytes_revalidates(s3):
+    key = 'data/analysis/state/sessions.json'
+    s3.put_object(Bucket='wsb-test', Key=key, Body=b'[1]')
+    assert s3_handler.get_object_bytes(key) == b'[1]'
+    s3.put_object(Bucket='wsb-test', Key=key, Body=b'[1, 2]')
+    assert s3_handler.get_object_bytes(key) == b'[1, 2]'
+
+def test_eviction_keeps_most_recently_used(tmp_path):
+    cache = S3Cache(cache_dir=str(tmp_path / 'cache'), max_bytes=10, immutable_prefixes=[])
+    cache.store('a', b'aaaa')
+    cache.store('b', b'bbbb')
+    assert cache.read('a') == b'aaaa'  # a zuletzt genutzt
+    cache.store('c', b'cccc')
+    assert cache.lookup('b') is None
+    assert cache.read('a') == b'aaaa' and cache.read('c') == b'cccc'
+    assert cache.total_size() <= 10
+
+def test_identical_content_is_stored_once(tmp_path):
+    cache = S3Cache(cache_dir=str(tmp_path / 'cache'), immutable_prefixes=[])
+    cache.store('a', b'same')
+    cache.store('b', b'same')
+    assert cache.total_size() == 4
+    cache.invalidate('a')
+    assert cache.read('b') == b'same'
@@ -0,0 +1,25 @@
+import json
+import pytest
+import compression
+from config import LOADER_CONFIG
+from session_loader import load_sessions
+from storage import LocalStorageBackend
+
+@pytest.fixture
+def session_keys(tmp_path):
+    storage = LocalStorageBackend(root=str(tmp_path))
+    keys = []
+    for i in range(LOADER_CONFIG['min_parallel']):
+        key = f"data/results/2024-01-01/{i:06d}/wsb_mentions.json"
+        storage.put(key, compression.compress(json.dumps({'timestamp': str(i), 'results': {'GME': i}}).encode('utf-8'), 'none'))
+        keys.append(key)
+    storage.put(keys[3], b'{kaputt')
+    return storage, keys
+
+@pytest.mark.parametrize('executor', ['serial', 'thread', 'process'])
+def test_executors_return_results_in_key_order(session_keys, executor):
+    storage, keys = session_keys
+    results = load_sessions(keys, storage, executor=executor, max_workers=2)
+    expected = [key for i, key in enumerate(keys) if i != 3]
+    assert list(results) == expected
+    assert [result['results']['GME'] for result in results.values()] == [i for i in range(len(keys)) if i != 3]
@@ -0,0 +1,33 @@
+import pytest
+from config import STORAGE_CONFIG
+from storage import (LocalStorageBackend, MemoryStorageBackend, StorageBackend, get_storage_backend)
+
+@pytest.mark.parametrize('make_backend', [lambda path: LocalStorageBackend(str(path)),
+                                          lambda path: MemoryStorageBackend()])
+def test_backend_contract(tmp_path, make_backend):
+    backend = make_backend(tmp_path)
+    assert backend.put('data/results/2024-01-01/100000/a.json', b'a')
+    assert backend.put('data/results/2024-01-02/090000/b.json', b'bb')
+    assert backend.get('data/results/2024-01-01/100000/a.json') == b'a'
+    assert backend.get('missing') is None
+    assert backend.get_range('data/results/2024-01-02/090000/b.json', start=-1) == b'b'
+    assert backend.list('data/results/2024-01-01/') == ['data/results/2024-01-01/100000/a.json']
+    assert backend.list_sessions('data/results/') == ['2024-01-02/090000/', '2024-01-01/100000/']
+    assert backend.delete('data/results/2024-01-01/100000/a.json')
+    assert backend.delete('data/results/2024-01-01/100000/a.json')
+    assert not backend.exists('data/results/2024-01-01/100000/a.json')
+
+def test_incomplete_backend_fails_on_construction():
+    class Incomplete(StorageBackend):
+        def put(self, key, data):
+            return True
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_local_backend_is_cached_per_root(monkeypatch, tmp_path):
+    monkeypatch.setitem(STORAGE_CONFIG, 'local_root', str(tmp_path / 'a'))
+    first = get_storage_backend('local')
+    assert get_storage_backend('local') is first
+    monkeypatch.setitem(STORAGE_CONFIG, 'local_root', str(tmp_path / 'b'))
+    assert get_storage_backend('local') is not first
@@ -0,0 +1,50 @@
+import copy
+import pickle
+import numpy as np
+import pytest
+from topk import TopKCounter, top_indices, top_items
+
+@pytest.mark.parametrize('limit', [0, 1, 2, 4, 5, 7, 10])
+def test_top_indices_breaks_ties_by_position(limit):
+    values = np.array([1, 3, 3, 3, 0, 3, 2])
+    expected = np.lexsort((np.arange(len(values)), -values))[:limit]
+    assert top_indices(values, limit).tolist() == expected.tolist()
+
+def test_top_indices_matches_full_sort_on_random_ties():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        values = rng.integers(0, 4, rng.integers(1, 40))
+        limit = int(rng.integers(1, 45))
+        assert top_indices(values, limit).tolist() == \
+            np.lexsort((np.arange(len(values)), -values))[:limit].tolist()
+
+def test_counter_keeps_incumbent_on_tie():
+    counter = TopKCounter(k=2)
+    for key in ('GME', 'AMC', 'TSLA'):
+        counter[key] += 1
+    assert counter.top() == [('GME', 1), ('AMC', 1)]
+    counter['TSLA'] += 1
+    assert counter.top() == [('TSLA', 2), ('GME', 1)]
+
+def test_counter_reselects_after_decrease_and_delete():
+    counter = TopKCounter(k=2)
+    for key, value in {'GME': 5, 'AMC': 4, 'TSLA': 3}.items():
+        counter[key] = value
+    counter['GME'] = 1
+    assert counter.top() == [('AMC', 4), ('TSLA', 3)]
+    del counter['AMC']
+    assert counter.top() == [('TSLA', 3), ('GME', 1)]
+    assert counter.top(10) == top_items(counter)
+
+@pytest.mark.parametrize('clone', [lambda c: pickle.loads(pickle.dumps(c)), copy.deepcopy, copy.copy])
+def test_counter_survives_pickle_and_copy(clone):
+    counter = TopKCounter(k=2)
+    for key, value in {'GME': 3, 'AMC': 1, 'TSLA': 2}.items():
+        counter[key] += value
+    restored = clone(counter)
+    assert type(restored) is TopKCounter and restored.k == 2
+    assert dict(restored) == dict(counter)
+    assert restored.top() == [('GME', 3), ('TSLA', 2)]
+    restored['AMC'] += 5
+    assert restored.top() == [('AMC', 6), ('GME', 3)]
+    assert counter['AMC'] == 1
@@ -0,0 +1,34 @@
+import io
+import numpy as np
+import pandas as pd
+from config import TRENDING_CONFIG
+from trending import TrendingEngine
+
+def _frame():
+    return pd.DataFrame({
+        'DateTime': pd.to_datetime(['2024-01-01', '2024-01-01', '2024-01-02', '2024-01-03', '2024-01-03'], utc=True),
+        'Symbol': ['GME', 'AMC', 'GME', 'GME', 'AMC'],
+        'Mentions': [1, 2, 1, 9, 3]
+    })
+
+def test_thresholds_come_from_config_after_loading(monkeypatch):
+    engine = TrendingEngine.from_frame(_frame(), min_mentions=1, min_std=1.0)
+    assert list(engine.ranking()['Symbol']) == ['GME', 'AMC']
+
+    monkeypatch.setitem(TRENDING_CONFIG, 'min_mentions', 5)
+    monkeypatch.setitem(TRENDING_CONFIG, 'min_std', 100.0)
+    restored = TrendingEngine.from_bytes(engine.to_bytes())
+    assert (restored.min_mentions, restored.min_std) == (5, 100.0)
+    ranking = restored.ranking()
+    assert list(ranking['Symbol']) == ['GME']
+    # Der z-Score wird mit der aktuellen Untergrenze der Standardabweichung berechnet
+    assert ranking['ZScore'].iloc[0] == round((9 - engine.baseline[0]) / 100.0, 2)
+
+def test_incompatible_state_is_rejected():
+    engine = TrendingEngine.from_frame(_frame())
+    data = engine.to_bytes()
+    assert TrendingEngine.from_bytes(data).sessions == engine.sessions
+
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, settings=np.array([10.0, 1.0, 1.0, 3.0]))
+    assert TrendingEngine.from_bytes(buffer.getvalue()) is None
@@ -0,0 +1,124 @@
+"""
+Top-k-Auswahl ohne vollständige Sortierung.
+Alle Top-N-Abfragen in Crawler, Analyse und GUI laufen über diese Funktionen:
+heapq/nlargest für Dicts und pandas, argpartition für NumPy-Arrays. TopKCounter
+führt die Top-k eines Zählers beim Hochzählen fortlaufend mit.
+"""
+
+import heapq
+from operator import itemgetter
+import numpy as np
+
+def top_items(counts, limit=None):
+    """
+    Die (Schlüssel, Wert)-Paare mit den größten Werten, absteigend sortiert.
+    Bei Gleichstand bleibt die Einfügereihenfolge erhalten; limit=None gibt alle Paare zurück.
+    """
+    if limit is None or limit >= len(counts):
+        return sorted(counts.items(), key=itemgetter(1), reverse=True)
+    return heapq.nlargest(limit, counts.items(), key=itemgetter(1))
+
+def top_series(series, limit):
+    """Die limit größten Werte einer pandas-Series, absteigend (bei Gleichstand in Index-Reihenfolge)."""
+    return series.nlargest(limit)
+
+def top_indices(values, limit):
+    """
+    Positionen der limit größten Werte eines Arrays, absteigend (bei Gleichstand nach Position).
+    Gleichstände am Schnitt werden vor der Auswahl nach Position aufgelöst, da argpartition
+    dort beliebig wählt.
+    """
+    values = np.asarray(values)
+    if limit <= 0:
+        return np.array([], dtype=np.intp)
+    if len(values) > limit:
+        # Wert an der Grenze der Top-limit; alle größeren Werte sind gesetzt, die gleichen
+        # Werte werden nach Position aufgefüllt
+        cutoff = np.partition(values, len(values) - limit)[len(values) - limit]
+        above = np.flatnonzero(values > cutoff)
+        ties = np.flatnonzero(values == cutoff)[:limit - len(above)]
+        candidates = np.concatenate([above, ties])
+    else:
+        candidates = np.arange(len(values))
+    return candidates[np.lexsort((candidates, -values[candidates]))]
+
+class TopKCounter(dict):
+    """
+    Zähler (wie defaultdict(int)), der die k größten Einträge beim Schreiben mitführt.
+    Steigende Zählerstände werden in O(log k) eingeordnet; sinkt ein Eintrag der Top-k,
+    wird die Auswahl bei der nächsten Abfrage neu bestimmt. Bei Gleichstand an der Grenze
+    bleibt der Eintrag, der den Wert zuerst erreicht hat.
+    """
+
+    def __init__(self, k=50):
+        super().__init__()
+        self.k = k
+        self._top = {}
+        self._heap = []
+        self._dirty = False
+
+    def __missing__(self, key):
+        return 0
+
+    def __reduce__(self):
+        # Der Heap wird beim Entpickeln über __setitem__ neu aufgebaut
+        return type(self), (self.k,), None, None, iter(self.items())
+
+    def __setitem__(self, key, value):
+        previous = self.get(key, 0)
+        super().__setitem__(key, value)
+        if self._dirty:
+            return
+        if key in self._top:
+            if value < previous:
+                self._dirty = True
+                return
+            self._top[key] = value
+            self._push(value, key)
+        else:
+            self._offer(key, value)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        if key in self._top:
+            self._dirty = True
+
+    def _push(self, value, key):
+        heapq.heappush(self._heap, (value, key))
+        if len(self._heap) > 4 * self.k:
+            # Veraltete Einträge entfernen
+            self._heap = [(v, k) for k, v in self._top.items()]
+            heapq.heapify(self._heap)
+
+    def _min(self):
+        """Kleinster gültiger Eintrag der Top-k (veraltete Heap-Einträge werden verworfen)."""
+        while self._heap:
+            value, key = self._heap[0]
+            if self._top.get(key) == value:
+                return value, key
+            heapq.heappop(self._heap)
+        return None
+
+    def _offer(self, key, value):
+        if len(self._top) < self.k:
+            self._top[key] = value
+            self._push(value, key)
+            return
+        min_value, min_key = self._min()
+        if value > min_value:
+            heapq.heappop(self._heap)
+            del self._top[min_key]
+            self._top[key] = value
+            self._push(value, key)
+
+    def top(self, limit=None):
+        """Die limit größten Einträge als (Schlüssel, Wert)-Paare, absteigend."""
+        limit = self.k if limit is None else limit
+        if limit > self.k:
+            return top_items(self, limit)
+        if self._dirty:
+            self._top = dict(top_items(self, self.k))
+            self._heap = [(v, k) for k, v in self._top.items()]
+            heapq.heapify(self._heap)
+            self._dirty = False
+        return top_items(self._top, limit)
@@ -0,0 +1,194 @@
+"""
+Trend-Erkennung auf Basis von Abweichungen vom üblichen Erwähnungsniveau.
+Für jedes Symbol werden exponentiell gewichtete Mittelwerte (EWMA) und Varianzen
+über die Sessions geführt; eine neue Session aktualisiert den Zustand aller Symbole
+gleichzeitig als Vektoroperation.
+"""
+
+import io
+import logging
+import numpy as np
+import pandas as pd
+from config import TRENDING_CONFIG
+from topk import top_indices
+
+logger = logging.getLogger(__name__)
+
+# Zustandsvektoren, eine Position je Symbol. 'baseline' und 'spread' sind Mittelwert und
+# Standardabweichung vor der letzten Session; der z-Score wird daraus erst beim Ranking berechnet.
+STATE_ARRAYS = ('mean', 'var', 'baseline', 'spread', 'last', 'velocity', 'last_seen')
+
+class TrendingEngine:
+    def __init__(self, halflife=None, min_mentions=None, min_std=None):
+        """
+        :param halflife: Halbwertszeit der Baseline in Sessions
+        :param min_mentions: Mindestanzahl Erwähnungen in der letzten Session für das Ranking
+        :param min_std: Untergrenze der Standardabweichung für den z-Score
+        """
+        self.halflife = halflife or TRENDING_CONFIG['halflife']
+        self.min_mentions = min_mentions if min_mentions is not None else TRENDING_CONFIG['min_mentions']
+        self.min_std = min_std or TRENDING_CONFIG['min_std']
+        self.alpha = 1 - 0.5 ** (1 / self.halflife)
+        self.symbols = []
+        self._positions = {}
+        for name in STATE_ARRAYS:
+            setattr(self, name, np.zeros(0))
+        self.last_seen = np.array([], dtype='datetime64[ns]')
+        self.last_update = None
+        self.sessions = 0
+
+    @classmethod
+    def from_frame(cls, frame, **kwargs):
+        """Erstellt den Zustand aus einer vollständigen Fakt-Tabelle."""
+        engine = cls(**kwargs)
+        engine.update_frame(frame)
+        return engine
+
+    def _ensure_symbols(self, symbols):
+        """Ergänzt unbekannte Symbole und gibt die Positionen aller übergebenen Symbole zurück."""
+        new_symbols = [s for s in dict.fromkeys(symbols) if s not in self._positions]
+        if new_symbols:
+            for symbol in new_symbols:
+                self._positions[symbol] = len(self.symbols)
+                self.symbols.append(symbol)
+            for name in STATE_ARRAYS:
+                current = getattr(self, name)
+                padding = np.full(len(new_symbols), np.datetime64('NaT'), dtype='datetime64[ns]') \
+                    if name == 'last_seen' else np.zeros(len(new_symbols))
+                setattr(self, name, np.concatenate([current, padding]))
+        return np.fromiter((self._positions[s] for s in symbols), dtype=np.int64, count=len(symbols))
+
+    def _fold(self, counts, timestamp):
+        """Übernimmt einen Session-Vektor (eine Position je bekanntem Symbol)."""
+        alpha = self.alpha
+        deviation = counts - self.mean
+        self.baseline = self.mean.copy()
+        self.spread = np.sqrt(self.var)
+        self.velocity = alpha * (counts - self.last) + (1 - alpha) * self.velocity
+        self.mean = self.mean + alpha * deviation
+        self.var = (1 - alpha) * (self.var + alpha * deviation ** 2)
+        self.last = counts
+        self.last_seen[counts > 0] = timestamp
+        self.last_update = timestamp
+        self.sessions += 1
+
+    def update(self, symbols, counts, timestamp):
+        """
+        Übernimmt eine neue Session.
+
+        :param symbols: Symbole der Session
+        :param counts: Erwähnungen je Symbol
+        :param timestamp: Crawl-Zeitpunkt der Session
+        :return: False, wenn die Session älter als der bisherige Zustand ist
+        """
+        timestamp = pd.Timestamp(timestamp)
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.tz_convert('UTC').tz_localize(None)
+        timestamp = np.datetime64(timestamp, 'ns')
+        if self.last_update is not None and timestamp <= self.last_update:
+            return False
+        positions = self._ensure_symbols(list(symbols))
+        vector = np.zeros(len(self.symbols))
+        vector[positions] = counts
+        self._fold(vector, timestamp)
+        return True
+
+    def update_frame(self, frame):
+        """
+        Übernimmt alle Sessions einer Fakt-Tabelle in zeitlicher Reihenfolge.
+        Die Sessions werden als Matrix (Session x Symbol) aufgebaut und zeilenweise
+        eingerechnet, jede Zeile als Vektoroperation über alle Symbole.
+
+        :return: False, wenn die Tabelle Sessions enthält, die älter als der bisherige Zustand sind
+        """
+        if frame is None or frame.empty:
+            return True
+        date_times = frame['DateTime'].dt.tz_convert('UTC').dt.tz_localize(None).to_numpy('datetime64[ns]')
+        if self.last_update is not None and date_times.min() <= self.last_update:
+            return False
+
+        session_codes, session_times = pd.factorize(date_times, sort=True)
+        symbols = frame['Symbol'].astype(str).to_numpy()
+        symbol_codes, unique_symbols = pd.factorize(symbols)
+        positions = self._ensure_symbols(list(unique_symbols))
+
+        matrix = np.zeros((len(session_times), len(self.symbols)))
+        np.add.at(matrix, (session_codes, positions[symbol_codes]), frame['Mentions'].to_numpy())
+        for row, timestamp in zip(matrix, session_times):
+            self._fold(row, np.datetime64(timestamp, 'ns'))
+        return True
+
+    @property
+    def zscore(self):
+        """Abweichung der letzten Session von der Baseline in Standardabweichungen."""
+        return (self.last - self.baseline) / np.maximum(self.spread, self.min_std)
+
+    def ranking(self, limit=10, since=None):
+        """
+        Gibt die Symbole mit der stärksten Abweichung in der letzten Session zurück.
+
+        :param limit: Anzahl der Symbole
+        :param since: Nur Symbole, die seit diesem Zeitpunkt erwähnt wurden
+        :return: DataFrame mit Symbol, Mentions, Baseline, ZScore, Velocity
+        """
+        columns = ['Symbol', 'Mentions', 'Baseline', 'ZScore', 'Velocity']
+        mask = self.last >= max(self.min_mentions, 1)
+        if since is not None:
+            since = pd.Timestamp(since)
+            if since.tzinfo is not None:
+                since = since.tz_convert('UTC').tz_localize(None)
+            since = np.datetime64(since, 'ns')
+            mask &= self.last_seen >= since
+        candidates = np.flatnonzero(mask)
+        if not len(candidates):
+            return pd.DataFrame(columns=columns)
+
+        zscore = self.zscore[candidates]
+        top = top_indices(zscore, limit)
+        order = candidates[top]
+        return pd.DataFrame({
+            'Symbol': [self.symbols[i] for i in order],
+            'Mentions': self.last[order].astype(np.int64),
+            'Baseline': self.baseline[order].round(2),
+            'ZScore': zscore[top].round(2),
+            'Velocity': self.velocity[order].round(2)
+        }, columns=columns)
+
+    def to_bytes(self):
+        """
+        Serialisiert den EWMA-Zustand (npz). min_mentions und min_std werden nicht gespeichert,
+        sondern beim Laden aus TRENDING_CONFIG übernommen.
+        """
+        buffer = io.BytesIO()
+        last_update = self.last_update if self.last_update is not None else np.datetime64('NaT', 'ns')
+        np.savez_compressed(
+            buffer,
+            symbols=np.array(self.symbols, dtype=str),
+            settings=np.array([self.halflife, self.sessions], dtype=float),
+            last_update=np.array([last_update], dtype='datetime64[ns]'),
+            **{name: getattr(self, name) for name in STATE_ARRAYS}
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data, **kwargs):
+        """
+        Stellt einen mit to_bytes gespeicherten Zustand wieder her.
+
+        :param kwargs: min_mentions und min_std (Standard: TRENDING_CONFIG)
+        :return: TrendingEngine oder None bei einem älteren, nicht kompatiblen Format
+        """
+        with np.load(io.BytesIO(data)) as state:
+            if any(name not in state.files for name in STATE_ARRAYS) or len(state['settings']) != 2:
+                logger.warning("Trend-Zustand in älterem Format, wird neu aufgebaut.")
+                return None
+            halflife, sessions = state['settings']
+            engine = cls(halflife=halflife, **kwargs)
+            engine.symbols = state['symbols'].tolist()
+            engine._positions = {symbol: i for i, symbol in enumerate(engine.symbols)}
+            for name in STATE_ARRAYS:
+                setattr(engine, name, state[name].copy())
+            last_update = state['last_update'][0]
+            engine.last_update = None if np.isnat(last_update) else last_update
+            engine.sessions = int(sessions)
+        return engine